@@ -1,25 +1,137 @@
 from fastapi import APIRouter, Depends, Query
-from pydantic import BaseModel
 from typing import Optional
-from database import get_db_connection
+from replicas import get_read_connection
 from fastapi.responses import JSONResponse
+from profiling import ProfiledRoute
+from sorting import ORDER_BY_PATTERN, TOP_K_LIMIT, is_indexed, order_by_clause
+from date_filters import (DateRangeFilters, HISTOGRAM_FIELD_PATTERN, HISTOGRAM_PATTERN,
+                          add_date_range, histogram_bucket)
+from page_cache import page_cache, page_signature
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 # Request schema
-class SearchFilters(BaseModel):
+class SearchFilters(DateRangeFilters):
     status: Optional[str] = None
     issuetype: Optional[str] = None
     assignee: Optional[str] = None
     reporter: Optional[str] = None
     issue_key: Optional[str] = None
 
+# Display names come from scalar subqueries rather than joins, so a user
+# present in several directories cannot duplicate an issue row. Without
+# duplicates there is nothing to de-duplicate with ROW_NUMBER, and an ORDER BY
+# on a jiraissue column can stop after the requested page instead of sorting
+# every match.
+SELECT_COLUMNS = """
+    SELECT ji.issuenum, ji.summary, ji.description, js.pname AS status,
+           pr.pname AS priority,
+           (SELECT MIN(u.display_name) FROM cwd_user u
+             WHERE u.lower_user_name = LOWER(ji.assignee)) AS assignee,
+           (SELECT MIN(u.display_name) FROM cwd_user u
+             WHERE u.lower_user_name = LOWER(ji.reporter)) AS reporter,
+           ji.created, ji.updated,
+           p.pkey AS project_key, p.pname AS project_name, it.pname AS issue_type,
+           ji.id
+"""
+RESULT_COLUMN_COUNT = 13
+
+FROM_CLAUSE = """
+    FROM jiraissue ji
+    JOIN project p ON ji.project = p.id
+    LEFT JOIN issuetype it ON ji.issuetype = it.id
+    LEFT JOIN issuestatus js ON ji.issuestatus = js.id
+    LEFT JOIN priority pr ON ji.priority = pr.id
+    WHERE 1=1
+"""
+
+def build_where(filters: SearchFilters):
+    base_query = FROM_CLAUSE
+    params = {}
+
+    if filters.status:
+        base_query += " AND js.pname = :status"
+        params["status"] = filters.status
+
+    if filters.issuetype:
+        base_query += " AND it.pname = :issuetype"
+        params["issuetype"] = filters.issuetype
+
+    if filters.assignee:
+        base_query += """ AND EXISTS (SELECT 1 FROM cwd_user u
+                            WHERE u.lower_user_name = LOWER(ji.assignee)
+                              AND u.display_name = :assignee)"""
+        params["assignee"] = filters.assignee
+
+    if filters.reporter:
+        base_query += """ AND EXISTS (SELECT 1 FROM cwd_user u
+                            WHERE u.lower_user_name = LOWER(ji.reporter)
+                              AND u.display_name = :reporter)"""
+        params["reporter"] = filters.reporter
+
+    if filters.issue_key:
+        base_query += " AND (p.pkey || '-' || ji.issuenum) = :issue_key"
+        params["issue_key"] = filters.issue_key
+
+    base_query = add_date_range(base_query, params, filters)
+    return base_query, params
+
+def build_page_query(filters: SearchFilters, order_by, offset, limit,
+                     histogram=None, histogram_field="updated"):
+    from_where, params = build_where(filters)
+
+    # Apply ordering and pagination
+    page_query = SELECT_COLUMNS + from_where + f"""
+        ORDER BY {order_by_clause(order_by)}
+        OFFSET {offset} ROWS FETCH NEXT {limit} ROWS ONLY
+    """
+    if not histogram:
+        return page_query, params
+
+    # Page rows and histogram buckets in one statement: the first branch
+    # carries the page (seq keeps its order), the second one row per bucket.
+    bucket = histogram_bucket(histogram, histogram_field)
+    null_columns = ", ".join(["NULL"] * RESULT_COLUMN_COUNT)
+    query = f"""
+        SELECT 'row' AS kind, ROWNUM AS seq, q.*,
+               CAST(NULL AS DATE) AS bucket, CAST(NULL AS NUMBER) AS bucket_count
+        FROM ({page_query}) q
+        UNION ALL
+        SELECT 'bucket', NULL, {null_columns}, {bucket}, COUNT(*)
+        {from_where}
+        GROUP BY {bucket}
+        ORDER BY 1 DESC, 2, {RESULT_COLUMN_COUNT + 3}
+    """
+    return query, params
+
+def row_to_issue(row):
+    (issuenum, summary, description, status, priority, assignee_name, reporter_name,
+     created, updated, project_key, project_name, issue_type, issue_id) = row
+
+    return {
+        "issue_key": f"{project_key}-{issuenum}",
+        "summary": summary,
+        "description": description,
+        "status": status,
+        "priority": priority,
+        "created": created.date().isoformat() if created else None,
+        "updated": updated.date().isoformat() if updated else None,
+        "project_key": project_key,
+        "project_name": project_name,
+        "issue_type": issue_type,
+        "assignee": assignee_name,
+        "reporter": reporter_name
+    }
+
 @router.post("/search-issues")
 def search_issues(
     filters: SearchFilters,
     page: int = Query(1, gt=0),
     page_size: int = Query(10, gt=0, le=100),  # max 100 items per page
-    conn=Depends(get_db_connection)
+    order_by: Optional[str] = Query(None, pattern=ORDER_BY_PATTERN),
+    histogram: Optional[str] = Query(None, pattern=HISTOGRAM_PATTERN),  # issues per day/week
+    histogram_field: str = Query("updated", pattern=HISTOGRAM_FIELD_PATTERN),
+    conn=Depends(get_read_connection)
 ):
     try:
         cursor = conn.cursor()
@@ -27,80 +139,57 @@ def search_issues(
         # Calculate offset
         offset = (page - 1) * page_size
 
-        # Base query with ROW_NUMBER to eliminate duplicates
-        base_query = f"""
-            SELECT * FROM (
-                SELECT ji.issuenum, ji.summary, ji.description, js.pname AS status,
-                       jp.pname AS priority, assignee.display_name AS assignee,
-                       reporter.display_name AS reporter, ji.created, ji.updated,
-                       p.pkey AS project_key, p.pname AS project_name, it.pname AS issue_type,
-                       ji.id, ROW_NUMBER() OVER (PARTITION BY ji.id ORDER BY ji.id) AS rn
-                FROM jiraissue ji
-                JOIN project p ON ji.project = p.id
-                LEFT JOIN issuetype it ON ji.issuetype = it.id
-                LEFT JOIN issuestatus js ON ji.issuestatus = js.id
-                LEFT JOIN priority jp ON ji.priority = jp.id
-                LEFT JOIN cwd_user assignee ON assignee.lower_user_name = LOWER(ji.assignee)
-                LEFT JOIN cwd_user reporter ON reporter.lower_user_name = LOWER(ji.reporter)
-                WHERE 1=1
-        """
-
-        params = {}
-
-        if filters.status:
-            base_query += " AND js.pname = :status"
-            params["status"] = filters.status
-
-        if filters.issuetype:
-            base_query += " AND it.pname = :issuetype"
-            params["issuetype"] = filters.issuetype
-
-        if filters.assignee:
-            base_query += " AND assignee.display_name = :assignee"
-            params["assignee"] = filters.assignee
-
-        if filters.reporter:
-            base_query += " AND reporter.display_name = :reporter"
-            params["reporter"] = filters.reporter
-
-        if filters.issue_key:
-            base_query += " AND (p.pkey || '-' || ji.issuenum) = :issue_key"
-            params["issue_key"] = filters.issue_key
-
-        # Close the subquery and apply row filtering and pagination
-        base_query += f"""
-            ) WHERE rn = 1
-            OFFSET {offset} ROWS FETCH NEXT {page_size} ROWS ONLY
-        """
-
-        cursor.execute(base_query, params)
+        # Sorts without a supporting index are only allowed as a bounded top-k
+        if not is_indexed(order_by) and offset + page_size > TOP_K_LIMIT:
+            return JSONResponse(
+                content={"error": f"Sorting by {order_by} is limited to the first {TOP_K_LIMIT} results"},
+                status_code=400
+            )
+
+        if not histogram:
+            # Plain page requests are served from a prefetched window of
+            # pages, so the following Next clicks do not hit the database.
+            def fetch_window(start, limit):
+                query, params = build_page_query(filters, order_by, start, limit)
+                cursor.execute(query, params)
+                return [row_to_issue(row) for row in cursor.fetchall()]
+
+            row_limit = None if is_indexed(order_by) else TOP_K_LIMIT
+            issues, cached = page_cache.get_page(page_signature(filters, order_by, page_size),
+                                                 offset, page_size, fetch_window, row_limit)
+            content = {
+                "page": page,
+                "page_size": page_size,
+                "order_by": order_by,
+                "results": issues
+            }
+            return JSONResponse(content=content, headers={"X-Page-Cache": "hit" if cached else "miss"})
+
+        query, params = build_page_query(filters, order_by, offset, page_size,
+                                         histogram, histogram_field)
+        cursor.execute(query, params)
         rows = cursor.fetchall()
 
         issues = []
+        buckets = []
         for row in rows:
-            (issuenum, summary, description, status, priority, assignee_name, reporter_name,
-             created, updated, project_key, project_name, issue_type, issue_id, rn) = row
-
-            issues.append({
-                "issue_key": f"{project_key}-{issuenum}",
-                "summary": summary,
-                "description": description,
-                "status": status,
-                "priority": priority,
-                "created": created.date().isoformat() if created else None,
-                "updated": updated.date().isoformat() if updated else None,
-                "project_key": project_key,
-                "project_name": project_name,
-                "issue_type": issue_type,
-                "assignee": assignee_name,
-                "reporter": reporter_name
-            })
-
-        return JSONResponse(content={
+            if row[0] == "row":
+                issues.append(row_to_issue(row[2:2 + RESULT_COLUMN_COUNT]))
+            else:
+                bucket, count = row[-2], row[-1]
+                buckets.append({
+                    "bucket": bucket.date().isoformat() if hasattr(bucket, "date") else str(bucket),
+                    "count": int(count)
+                })
+
+        content = {
             "page": page,
             "page_size": page_size,
-            "results": issues
-        })
+            "order_by": order_by,
+            "results": issues,
+            "histogram": {"unit": histogram, "field": histogram_field, "buckets": buckets}
+        }
+        return JSONResponse(content=content)
 
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
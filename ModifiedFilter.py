@@ -1,13 +1,20 @@
-from fastapi import APIRouter, Depends
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from typing import Optional
-from database import get_db_connection
+from replicas import get_read_connection
 from fastapi.responses import JSONResponse
+from profiling import ProfiledRoute
+from admission import ClientDisconnected, admit, run_cancellable
+from sorting import ORDER_BY_PATTERN, TOP_K_LIMIT, is_indexed, order_by_clause
+from date_filters import DateRangeFilters, add_date_range
+from memory_budget import BudgetExceeded, fetch_within_budget, track
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
+
+class SortLimitExceeded(Exception):
+    pass
 
 # Define request schema
-class SearchFilters(BaseModel):
+class SearchFilters(DateRangeFilters):
     project_key: Optional[str] = None
     status: Optional[str] = None
     issuetype: Optional[str] = None
@@ -15,76 +22,127 @@ class SearchFilters(BaseModel):
     reporter: Optional[str] = None
     issue_key: Optional[str] = None  # New input
 
+def build_search_query(filters: SearchFilters):
+    # Base query
+    base_query = """
+        SELECT ji.issuenum, ji.pkey, ji.summary, iss.name AS status, pr.pname AS priority,
+               ji.created, ji.updated, p.pname AS project, it.pname AS issue_type,
+               assignee.display_name AS assignee_name, reporter.display_name AS reporter_name,
+               ji.id AS issue_id
+        FROM jiraissue ji
+        JOIN project p ON ji.project = p.id
+        JOIN issuetype it ON ji.issuetype = it.id
+        JOIN issuestatus iss ON ji.issuestatus = iss.id
+        LEFT JOIN priority pr ON ji.priority = pr.id
+        LEFT JOIN cwd_user assignee ON assignee.lower_user_name = LOWER(ji.assignee)
+        LEFT JOIN cwd_user reporter ON reporter.lower_user_name = LOWER(ji.reporter)
+        WHERE 1=1
+    """
+
+    params = {}
+
+    if filters.project_key:
+        base_query += " AND p.pkey = :project_key"
+        params["project_key"] = filters.project_key
+
+    if filters.status:
+        base_query += " AND iss.name = :status"
+        params["status"] = filters.status
+
+    if filters.issuetype:
+        base_query += " AND it.pname = :issuetype"
+        params["issuetype"] = filters.issuetype
+
+    if filters.assignee:
+        base_query += " AND assignee.display_name = :assignee"
+        params["assignee"] = filters.assignee
+
+    if filters.reporter:
+        base_query += " AND reporter.display_name = :reporter"
+        params["reporter"] = filters.reporter
+
+    if filters.issue_key:
+        base_query += " AND (p.pkey || '-' || ji.issuenum) = :issue_key"
+        params["issue_key"] = filters.issue_key
+
+    base_query = add_date_range(base_query, params, filters)
+    return base_query, params
+
+def row_to_issue(row):
+    (issuenum, pkey, summary, status, priority, created, updated, project, issue_type,
+     assignee_name, reporter_name, issue_id) = row
+
+    return {
+        "issuenum": issuenum,
+        "pkey": pkey,
+        "summary": summary,
+        "status": status,
+        "priority": priority,
+        "created": created.date().isoformat() if created else None,
+        "updated": updated.date().isoformat() if updated else None,
+        "project": project,
+        "issue_type": issue_type,
+        "assignee": assignee_name,
+        "reporter": reporter_name
+    }
+
+def build_fetch_query(filters: SearchFilters, order_by: Optional[str] = None):
+    base_query, params = build_search_query(filters)
+    if order_by:
+        base_query += f" ORDER BY {order_by_clause(order_by)}"
+        # Without an index the database has to sort every match; capping the
+        # result lets it keep only the top k rows while sorting. One extra
+        # row tells fetch_issues the result would have been cut off.
+        if not is_indexed(order_by):
+            base_query += f" FETCH FIRST {TOP_K_LIMIT + 1} ROWS ONLY"
+    return base_query, params
+
+def fetch_issues(conn, filters: SearchFilters, order_by: Optional[str] = None, budget=None):
+    cursor = conn.cursor()
+    base_query, params = build_fetch_query(filters, order_by)
+    cursor.execute(base_query, params)
+    if budget is None:
+        issues = [row_to_issue(row) for row in cursor.fetchall()]
+    else:
+        # Unpaginated: rows are fetched in batches and charged to the request's
+        # budget, so an oversized result stops early instead of exhausting memory.
+        try:
+            issues = fetch_within_budget(cursor, budget, row_to_issue)
+        finally:
+            cursor.close()
+    # A top-k sort can't return the whole result, and a silently truncated
+    # list would look complete.
+    if not is_indexed(order_by) and len(issues) > TOP_K_LIMIT:
+        raise SortLimitExceeded(
+            f"Sorting by {order_by} is limited to the first {TOP_K_LIMIT} results; "
+            f"narrow the filters or sort by an indexed field"
+        )
+    return issues
+
 @router.post("/search-issues")
-def search_issues(filters: SearchFilters, conn=Depends(get_db_connection)):
+async def search_issues(
+    filters: SearchFilters,
+    request: Request,
+    order_by: Optional[str] = Query(None, pattern=ORDER_BY_PATTERN),
+    conn=Depends(get_read_connection)
+):
     try:
-        cursor = conn.cursor()
-
-        # Base query
-        base_query = """
-            SELECT ji.issuenum, ji.pkey, ji.summary, iss.name AS status, pr.pname AS priority,
-                   ji.created, ji.updated, p.pname AS project, it.pname AS issue_type,
-                   assignee.display_name AS assignee_name, reporter.display_name AS reporter_name,
-                   ji.id AS issue_id
-            FROM jiraissue ji
-            JOIN project p ON ji.project = p.id
-            JOIN issuetype it ON ji.issuetype = it.id
-            JOIN issuestatus iss ON ji.issuestatus = iss.id
-            LEFT JOIN priority pr ON ji.priority = pr.id
-            LEFT JOIN cwd_user assignee ON assignee.lower_user_name = LOWER(ji.assignee)
-            LEFT JOIN cwd_user reporter ON reporter.lower_user_name = LOWER(ji.reporter)
-            WHERE 1=1
-        """
-
-        params = {}
-
-        if filters.project_key:
-            base_query += " AND p.pkey = :project_key"
-            params["project_key"] = filters.project_key
-
-        if filters.status:
-            base_query += " AND iss.name = :status"
-            params["status"] = filters.status
-
-        if filters.issuetype:
-            base_query += " AND it.pname = :issuetype"
-            params["issuetype"] = filters.issuetype
-
-        if filters.assignee:
-            base_query += " AND assignee.display_name = :assignee"
-            params["assignee"] = filters.assignee
-
-        if filters.reporter:
-            base_query += " AND reporter.display_name = :reporter"
-            params["reporter"] = filters.reporter
-
-        if filters.issue_key:
-            base_query += " AND (p.pkey || '-' || ji.issuenum) = :issue_key"
-            params["issue_key"] = filters.issue_key
-
-        cursor.execute(base_query, params)
-        rows = cursor.fetchall()
-
-        issues = []
-        for row in rows:
-            (issuenum, pkey, summary, status, priority, created, updated, project, issue_type,
-             assignee_name, reporter_name, issue_id) = row
-
-            issues.append({
-                "issuenum": issuenum,
-                "pkey": pkey,
-                "summary": summary,
-                "status": status,
-                "priority": priority,
-                "created": created.date().isoformat() if created else None,
-                "updated": updated.date().isoformat() if updated else None,
-                "project": project,
-                "issue_type": issue_type,
-                "assignee": assignee_name,
-                "reporter": reporter_name
-            })
+        # Heavy (unselective) searches share a small pool of slots; when the
+        # queue for them is full the caller gets a 429 with Retry-After.
+        async with admit(filters):
+            with track("ModifiedFilter.search_issues") as budget:
+                issues = await run_cancellable(request, conn, fetch_issues, filters, order_by, budget)
 
         return JSONResponse(content=issues)
 
+    except HTTPException:
+        raise
+    except SortLimitExceeded as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+    except BudgetExceeded as e:
+        return JSONResponse(content={"error": str(e)}, status_code=413)
+    except ClientDisconnected:
+        # Nobody is listening any more; 499 only shows up in access logs.
+        return Response(status_code=499)
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
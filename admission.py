@@ -0,0 +1,118 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+
+from profiling import sampled
+
+# === CONFIGURATION START ===
+HEAVY_QUERY_SLOTS = int(os.getenv("SEARCH_HEAVY_SLOTS", "2"))    # concurrent heavy queries
+HEAVY_QUEUE_DEPTH = int(os.getenv("SEARCH_HEAVY_QUEUE", "4"))    # heavy queries allowed to wait
+LIGHT_QUERY_SLOTS = int(os.getenv("SEARCH_LIGHT_SLOTS", "16"))
+LIGHT_QUEUE_DEPTH = int(os.getenv("SEARCH_LIGHT_QUEUE", "64"))
+QUEUE_WAIT_SECONDS = 10                                           # give up waiting for a slot after this
+STATEMENT_TIMEOUT_MS = int(os.getenv("SEARCH_STATEMENT_TIMEOUT_MS", "30000"))
+RETRY_AFTER_SECONDS = 5
+DISCONNECT_POLL_SECONDS = 0.5
+# === CONFIGURATION END ===
+
+# Filters that pin the result to a handful of rows. Anything else (or no
+# filter at all) may scan most of jiraissue and is treated as heavy.
+SELECTIVE_FILTERS = ("issue_key", "project_key", "assignee", "reporter")
+
+
+class ClientDisconnected(Exception):
+    pass
+
+
+def estimate_cost(filters):
+    values = filters.model_dump() if hasattr(filters, "model_dump") else filters.dict()
+    if any(values.get(name) for name in SELECTIVE_FILTERS):
+        return "light"
+    return "heavy"
+
+
+class AdmissionLane:
+    def __init__(self, name, slots, queue_depth):
+        self.name = name
+        self.slots = slots
+        self.queue_depth = queue_depth
+        self.running = 0
+        self.waiting = 0
+        self._semaphore = None
+
+    def _overloaded(self):
+        return HTTPException(
+            status_code=429,
+            detail=f"Too many {self.name} searches in progress, retry later",
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+        )
+
+    @asynccontextmanager
+    async def admit(self):
+        # Created lazily so the semaphore binds to the server's event loop.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.slots)
+        if self.running + self.waiting >= self.slots + self.queue_depth:
+            raise self._overloaded()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), QUEUE_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            raise self._overloaded()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+
+
+lanes = {
+    "heavy": AdmissionLane("heavy", HEAVY_QUERY_SLOTS, HEAVY_QUEUE_DEPTH),
+    "light": AdmissionLane("light", LIGHT_QUERY_SLOTS, LIGHT_QUEUE_DEPTH),
+}
+
+
+def admit(filters):
+    return lanes[estimate_cost(filters)].admit()
+
+
+def set_statement_timeout(conn, timeout_ms=STATEMENT_TIMEOUT_MS):
+    # python-oracledb aborts any round trip that exceeds call_timeout. Returns
+    # the previous timeout so a pooled connection can be handed back as it
+    # was (None when the driver has no call timeout).
+    if not hasattr(conn, "call_timeout"):
+        return None
+    previous = conn.call_timeout
+    conn.call_timeout = timeout_ms
+    return previous
+
+
+def restore_statement_timeout(conn, previous):
+    if previous is not None:
+        conn.call_timeout = previous
+
+
+async def run_cancellable(request: Request, conn, func, *args):
+    """Run blocking DB work in the threadpool and cancel the statement on the
+    server if the HTTP client goes away before it finishes."""
+    previous_timeout = set_statement_timeout(conn)
+    try:
+        task = asyncio.ensure_future(run_in_threadpool(sampled(func), conn, *args))
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                with suppress(Exception):
+                    conn.cancel()
+                with suppress(Exception):
+                    await task
+                raise ClientDisconnected()
+    finally:
+        restore_statement_timeout(conn, previous_timeout)
@@ -0,0 +1,180 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+
+from Filter import SearchFilters, SELECT_COLUMNS, RESULT_COLUMN_COUNT, build_page_query, build_where, row_to_issue
+from profiling import ProfiledRoute, sampled
+from replicas import acquire_read_connection
+from sorting import ORDER_BY_PATTERN, TOP_K_LIMIT, is_indexed, order_by_clause
+
+# === CONFIGURATION START ===
+MAX_BATCH_SIZE = 20
+BATCH_PARALLELISM = int(os.getenv("BATCH_SEARCH_PARALLELISM", "4"))   # concurrent connections per batch
+# === CONFIGURATION END ===
+
+# Filters that can be folded into one query: searches that only differ in one
+# of these run as a single scan with `column IN (...)` and are paged per value
+# with ROW_NUMBER.
+GROUPABLE_FILTERS = {
+    "status": "js.pname",
+    "issuetype": "it.pname",
+}
+
+_executor = ThreadPoolExecutor(max_workers=BATCH_PARALLELISM, thread_name_prefix="batch-search")
+
+
+class SearchSpec(BaseModel):
+    id: Optional[str] = None
+    filters: SearchFilters = SearchFilters()
+    page: int = Field(1, gt=0)
+    page_size: int = Field(10, gt=0, le=100)
+    order_by: Optional[str] = Field(None, pattern=ORDER_BY_PATTERN)
+
+
+class BatchSearchRequest(BaseModel):
+    searches: List[SearchSpec] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+def plan_batch(specs):
+    """Split (index, spec) pairs into merged groups and single searches.
+
+    Returns a list of ("group", field, [(index, spec), ...]) and
+    ("single", None, [(index, spec)]) units of work."""
+    buckets = {}
+    for index, spec in specs:
+        values = spec.filters.model_dump()
+        for field in GROUPABLE_FILTERS:
+            if values[field] is None:
+                continue
+            rest = {k: v for k, v in values.items() if k != field}
+            key = (field, spec.order_by, tuple(sorted((k, str(v)) for k, v in rest.items())))
+            buckets.setdefault(key, []).append((index, spec))
+            break
+        else:
+            buckets.setdefault((None, index), []).append((index, spec))
+
+    units = []
+    for key, members in buckets.items():
+        if key[0] is not None and len(members) > 1:
+            units.append(("group", key[0], members))
+        else:
+            units.extend(("single", None, [member]) for member in members)
+    return units
+
+
+def build_group_query(field, members):
+    column = GROUPABLE_FILTERS[field]
+    first = members[0][1]
+    # The shared filters come from any member with the grouped field cleared.
+    shared = first.filters.model_copy(update={field: None})
+    from_where, params = build_where(shared)
+
+    values = sorted({spec.filters.model_dump()[field] for _, spec in members})
+    value_binds = {f"batch_value_{i}": value for i, value in enumerate(values)}
+    params.update(value_binds)
+    in_list = ", ".join(":" + name for name in value_binds)
+
+    windows = []
+    for i, (_, spec) in enumerate(members):
+        value_bind = f"batch_value_{values.index(spec.filters.model_dump()[field])}"
+        params[f"batch_low_{i}"] = (spec.page - 1) * spec.page_size
+        params[f"batch_high_{i}"] = spec.page * spec.page_size
+        windows.append(f"(b.batch_value = :{value_bind} AND b.batch_rn > :batch_low_{i} "
+                       f"AND b.batch_rn <= :batch_high_{i})")
+
+    query = f"""
+        SELECT * FROM (
+            {SELECT_COLUMNS},
+               {column} AS batch_value,
+               ROW_NUMBER() OVER (PARTITION BY {column} ORDER BY {order_by_clause(first.order_by)}) AS batch_rn
+            {from_where} AND {column} IN ({in_list})
+        ) b
+        WHERE {" OR ".join(windows)}
+        ORDER BY b.batch_value, b.batch_rn
+    """
+    return query, params
+
+
+def _run_group(field, members):
+    query, params = build_group_query(field, members)
+    with acquire_read_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+
+    results = {index: [] for index, _ in members}
+    for row in rows:
+        value, rn = row[RESULT_COLUMN_COUNT], row[RESULT_COLUMN_COUNT + 1]
+        issue = row_to_issue(row[:RESULT_COLUMN_COUNT])
+        for index, spec in members:
+            if (spec.filters.model_dump()[field] == value
+                    and (spec.page - 1) * spec.page_size < rn <= spec.page * spec.page_size):
+                results[index].append(issue)
+    return results
+
+
+def _run_single(index, spec):
+    offset = (spec.page - 1) * spec.page_size
+    query, params = build_page_query(spec.filters, spec.order_by, offset, spec.page_size)
+    with acquire_read_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        return {index: [row_to_issue(row) for row in cursor.fetchall()]}
+
+
+def _response_entry(spec, results=None, error=None):
+    entry = {
+        "id": spec.id,
+        "page": spec.page,
+        "page_size": spec.page_size,
+        "order_by": spec.order_by,
+    }
+    if error is not None:
+        entry["error"] = error
+    else:
+        entry["results"] = results
+    return entry
+
+
+router = APIRouter(route_class=ProfiledRoute)
+
+@router.post("/search-issues/batch")
+def batch_search_issues(request: BatchSearchRequest):
+    try:
+        entries = [None] * len(request.searches)
+        runnable = []
+        for index, spec in enumerate(request.searches):
+            offset = (spec.page - 1) * spec.page_size
+            if not is_indexed(spec.order_by) and offset + spec.page_size > TOP_K_LIMIT:
+                entries[index] = _response_entry(
+                    spec, error=f"Sorting by {spec.order_by} is limited to the first {TOP_K_LIMIT} results"
+                )
+            else:
+                runnable.append((index, spec))
+
+        # Merged groups and the remaining single searches run concurrently,
+        # each on its own pooled connection.
+        futures = []
+        for kind, field, members in plan_batch(runnable):
+            if kind == "group":
+                futures.append((members, _executor.submit(sampled(_run_group), field, members)))
+            else:
+                futures.append((members, _executor.submit(sampled(_run_single), *members[0])))
+
+        for members, future in futures:
+            try:
+                results = future.result()
+                for index, spec in members:
+                    entries[index] = _response_entry(spec, results[index])
+            except Exception as e:
+                for index, spec in members:
+                    entries[index] = _response_entry(spec, error=str(e))
+
+        return JSONResponse(content={"results": entries})
+
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
@@ -0,0 +1,125 @@
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import pandas as pd
+import pyarrow.compute as pc
+from fastapi import APIRouter, Header, Query, Response
+
+from snapshot_responses import CACHE_CONTROL, EncodedSlice, negotiate, scoped_table
+from snapshot_store import snapshot_reader
+
+# === CONFIGURATION START ===
+DEFAULT_REGION = "NAM"
+BOOTSTRAP_PAGE_SIZE = 10          # matches usersPerPage in the dashboard
+MAX_CACHED_PAYLOADS = 16          # (snapshot version, region) payloads kept encoded
+# === CONFIGURATION END ===
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="bootstrap")
+
+
+def _records(table):
+    return json.loads(table.to_pandas().to_json(orient="records", date_format="iso"))
+
+
+def template_aggregates(region):
+    # One row per template, as the dashboard's grouped project table shows it.
+    table = scoped_table("projects", region)
+    frame = table.select(["Template Key", "Active Project Key", "Last Issue Updated"]).to_pandas()
+    frame["Template Key"] = frame["Template Key"].astype("object")
+    frame["active"] = frame["Active Project Key"].fillna("").astype(str).ne("")
+    grouped = frame.groupby("Template Key", sort=True).agg(
+        project_count=("Template Key", "size"),
+        active_project_count=("active", "sum"),
+        latest_issue_updated=("Last Issue Updated", "max"),
+    )
+    return [
+        {
+            "template": template,
+            "project_count": int(row.project_count),
+            "active_project_count": int(row.active_project_count),
+            "latest_issue_updated": row.latest_issue_updated.isoformat()
+            if pd.notna(row.latest_issue_updated) else None,
+        }
+        for template, row in grouped.iterrows()
+    ]
+
+
+def template_keys():
+    # The template dropdown lists every template, whatever the region.
+    column = snapshot_reader.table("projects").column("Template Key")
+    return sorted(str(value) for value in pc.unique(column).to_pylist() if value not in (None, ""))
+
+
+def first_page(dataset, region):
+    table = scoped_table(dataset, region)
+    return {
+        "total": table.num_rows,
+        "page_size": BOOTSTRAP_PAGE_SIZE,
+        "results": _records(table.slice(0, BOOTSTRAP_PAGE_SIZE)),
+    }
+
+
+def build_payload(version, region):
+    """Everything the dashboard needs for its first render of one region.
+    The four parts are independent, so they are built concurrently. Each
+    reads the current snapshot; get_payload caches the result under the
+    version it was built from."""
+    parts = {
+        "templates": _executor.submit(template_aggregates, region),
+        "template_keys": _executor.submit(template_keys),
+        "single_users": _executor.submit(first_page, "single_users", region),
+        "security_users": _executor.submit(first_page, "security_groups", region),
+    }
+    payload = {"version": version, "region": region}
+    payload.update({name: future.result() for name, future in parts.items()})
+    return payload
+
+
+_payloads = OrderedDict()
+_payloads_lock = threading.Lock()
+
+
+def get_payload(region):
+    version = snapshot_reader.current_version()
+    key = (version, region)
+    with _payloads_lock:
+        if key in _payloads:
+            _payloads.move_to_end(key)
+            return version, _payloads[key]
+
+    body = json.dumps(build_payload(version, region), separators=(",", ":")).encode("utf-8")
+    encoded = EncodedSlice(body)
+    if snapshot_reader.current_version() != version:
+        # A publish landed mid-build, so parts may come from the new snapshot.
+        return version, encoded
+    with _payloads_lock:
+        _payloads[key] = encoded
+        while len(_payloads) > MAX_CACHED_PAYLOADS:
+            _payloads.popitem(last=False)
+    return version, encoded
+
+
+router = APIRouter()
+
+@router.get("/bootstrap")
+def bootstrap(
+    region: Optional[str] = Query(None),
+    accept_encoding: str = Header(None),
+    if_none_match: str = Header(None),
+):
+    version, encoded = get_payload(region or DEFAULT_REGION)
+    encoding = negotiate(accept_encoding, encoded.bodies)
+    headers = {
+        "ETag": encoded.etag(encoding),
+        "Cache-Control": CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+        "X-Snapshot-Version": version,
+    }
+    if if_none_match and encoded.matches(if_none_match):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=encoded.bodies[encoding], media_type="application/json", headers=headers)
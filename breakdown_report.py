@@ -0,0 +1,103 @@
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from connections import acquire_connection
+
+# === CONFIGURATION START ===
+BREAKDOWN_OUTPUT_FILE = "jira_issue_breakdown.xlsx"  # .xlsx or .parquet
+RECENT_WINDOWS_DAYS = (30, 90)
+# === CONFIGURATION END ===
+
+
+def build_breakdown_query(now=None):
+    # One grouped aggregate over jiraissue: counts per project x status x
+    # issue type, with the recent-activity windows folded in as conditional
+    # sums so no extra pass is needed.
+    now = now or datetime.now()
+    params = {}
+    window_columns = []
+    for days in RECENT_WINDOWS_DAYS:
+        params[f"since_{days}"] = now - timedelta(days=days)
+        window_columns.append(
+            f"SUM(CASE WHEN ji.created >= :since_{days} THEN 1 ELSE 0 END) AS created_{days}d"
+        )
+        window_columns.append(
+            f"SUM(CASE WHEN ji.resolutiondate >= :since_{days} THEN 1 ELSE 0 END) AS resolved_{days}d"
+        )
+    query = f"""
+        SELECT p.pkey AS project_key, iss.pname AS status, it.pname AS issue_type,
+               COUNT(*) AS issue_count,
+               {", ".join(window_columns)}
+        FROM jiraissue ji
+        JOIN project p ON ji.project = p.id
+        JOIN issuestatus iss ON ji.issuestatus = iss.id
+        JOIN issuetype it ON ji.issuetype = it.id
+        GROUP BY p.pkey, iss.pname, it.pname
+    """
+    return query, params
+
+
+def fetch_breakdown(conn, project_keys=None):
+    query, params = build_breakdown_query()
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    columns = [d[0].lower() for d in cursor.description]
+    long_df = pd.DataFrame(cursor.fetchall(), columns=columns)
+    if project_keys is not None:
+        long_df = long_df[long_df["project_key"].isin(set(project_keys))]
+    return long_df
+
+
+def to_wide(long_df):
+    # One row per project: totals, per-status, per-type and status/type
+    # counts, then the created/resolved windows.
+    index = "project_key"
+    window_columns = [c for c in long_df.columns if c.startswith(("created_", "resolved_"))]
+    parts = [
+        long_df.groupby(index)["issue_count"].sum().rename("total_issues"),
+        long_df.pivot_table(index=index, columns="status", values="issue_count",
+                            aggfunc="sum", fill_value=0).add_prefix("status: "),
+        long_df.pivot_table(index=index, columns="issue_type", values="issue_count",
+                            aggfunc="sum", fill_value=0).add_prefix("type: "),
+    ]
+    combo = long_df.assign(combo=long_df["status"] + " / " + long_df["issue_type"])
+    parts.append(combo.pivot_table(index=index, columns="combo", values="issue_count",
+                                   aggfunc="sum", fill_value=0))
+    parts.append(long_df.groupby(index)[window_columns].sum())
+    wide = pd.concat(parts, axis=1).fillna(0).astype("int64")
+    wide.columns.name = None
+    return wide.reset_index()
+
+
+def write_breakdown(long_df, output_path):
+    wide = to_wide(long_df)
+    if output_path.lower().endswith(".parquet"):
+        wide.to_parquet(output_path, index=False)
+        stem, _ = os.path.splitext(output_path)
+        long_df.to_parquet(f"{stem}.long.parquet", index=False)
+    else:
+        with pd.ExcelWriter(output_path) as writer:
+            wide.to_excel(writer, sheet_name="Breakdown", index=False)
+            long_df.to_excel(writer, sheet_name="Long", index=False)
+    return wide
+
+
+def main(project_keys=None, output_path=BREAKDOWN_OUTPUT_FILE):
+    print("📊 Computing project x status x issue type breakdown")
+    try:
+        with acquire_connection() as conn:
+            long_df = fetch_breakdown(conn, project_keys)
+    except Exception as e:
+        print(f"❌ Error running breakdown query: {e}")
+        return
+
+    try:
+        wide = write_breakdown(long_df, output_path)
+        print(f"✅ Breakdown for {len(wide)} projects saved to {output_path}")
+    except Exception as e:
+        print(f"❌ Error writing to output file: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import inspect
+from contextlib import contextmanager
+
+from database import get_db_connection
+
+
+@contextmanager
+def acquire_connection():
+    """Open a connection outside of FastAPI's dependency injection.
+
+    get_db_connection may be a plain function or a yield-style dependency;
+    for the latter the code after its `yield` (returning the connection to
+    the pool) is run when the block exits.
+    """
+    source = get_db_connection()
+    if inspect.isgenerator(source):
+        conn = next(source)
+        try:
+            yield conn
+        finally:
+            next(source, None)
+    else:
+        try:
+            yield source
+        finally:
+            source.close()
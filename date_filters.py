@@ -0,0 +1,39 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+# filter field -> (column, operator). Plain range predicates on the raw
+# column so Oracle can use the jiraissue(created) / jiraissue(updated)
+# indexes; "_to" bounds are exclusive.
+DATE_RANGE_PREDICATES = {
+    "created_from": ("ji.created", ">="),
+    "created_to": ("ji.created", "<"),
+    "updated_from": ("ji.updated", ">="),
+    "updated_to": ("ji.updated", "<"),
+}
+
+# histogram bucket -> Oracle TRUNC format (IW = ISO week starting Monday)
+HISTOGRAM_UNITS = {"day": "DD", "week": "IW"}
+HISTOGRAM_PATTERN = "^(day|week)$"
+HISTOGRAM_FIELD_PATTERN = "^(created|updated)$"
+
+
+class DateRangeFilters(BaseModel):
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    updated_from: Optional[datetime] = None
+    updated_to: Optional[datetime] = None
+
+
+def add_date_range(base_query, params, filters):
+    for name, (column, operator) in DATE_RANGE_PREDICATES.items():
+        value = getattr(filters, name, None)
+        if value is not None:
+            base_query += f" AND {column} {operator} :{name}"
+            params[name] = value
+    return base_query
+
+
+def histogram_bucket(unit, field):
+    return f"TRUNC(ji.{field}, '{HISTOGRAM_UNITS[unit]}')"
@@ -0,0 +1,247 @@
+import csv
+import io
+import json
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import APIRouter, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from admission import RETRY_AFTER_SECONDS, restore_statement_timeout, set_statement_timeout
+from ModifiedFilter import SearchFilters, build_search_query, row_to_issue
+from replicas import acquire_read_connection
+
+# === CONFIGURATION START ===
+EXPORT_PARALLELISM = int(os.getenv("EXPORT_PARALLELISM", "4"))   # concurrent DB connections
+MAX_EXPORT_PARALLELISM = 16
+MAX_EXPORT_CONNECTIONS = int(os.getenv("EXPORT_MAX_CONNECTIONS", "16"))  # shared by all exports
+EXPORT_QUEUE_WAIT_SECONDS = 10   # give up waiting for a free export connection after this
+EXPORT_STATEMENT_TIMEOUT_MS = int(os.getenv("EXPORT_STATEMENT_TIMEOUT_MS", "300000"))  # per round trip
+PARTITIONS_PER_WORKER = 4        # more partitions than workers keeps the pool busy
+FETCH_BATCH_SIZE = 2000
+QUEUED_BATCHES_PER_PARTITION = 4 # bounds memory held for partitions not yet streamed
+MAX_IN_LIST_BINDS = 1000         # Oracle rejects longer IN lists (ORA-01795)
+PUT_POLL_SECONDS = 0.5
+# === CONFIGURATION END ===
+
+EXPORT_COLUMNS = ["issuenum", "pkey", "summary", "status", "priority", "created", "updated",
+                  "project", "issue_type", "assignee", "reporter"]
+
+_DONE = object()
+
+
+class ExportsBusy(Exception):
+    pass
+
+
+class ConnectionBudget:
+    """Database connections shared by every export in the process. An export
+    reserves all of its connections before any partition starts, so exports
+    never hold part of their pool while waiting on each other for the rest."""
+
+    def __init__(self, total):
+        self.total = total
+        self.in_use = 0
+        self._condition = threading.Condition()
+
+    def has_capacity(self):
+        with self._condition:
+            return self.in_use < self.total
+
+    def reserve(self, wanted, timeout=EXPORT_QUEUE_WAIT_SECONDS):
+        """Reserve up to `wanted` connections, waiting for at least one.
+        Returns the number granted; raises ExportsBusy on timeout."""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self.in_use < self.total, timeout):
+                raise ExportsBusy("Too many exports in progress, retry later")
+            granted = min(wanted, self.total - self.in_use)
+            self.in_use += granted
+            return granted
+
+    def release(self, count):
+        with self._condition:
+            self.in_use -= count
+            self._condition.notify_all()
+
+
+export_connections = ConnectionBudget(MAX_EXPORT_CONNECTIONS)
+
+
+def _release_when_done(futures, count):
+    # Workers may still be finishing a fetch after the consumer has gone, so
+    # the connections go back to the budget when the last worker exits.
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def done(_):
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            export_connections.release(count)
+
+    for future in futures:
+        future.add_done_callback(done)
+
+
+def plan_partitions(conn, filters, partitions, partition_by="id"):
+    """Split the filtered result into disjoint partitions.
+
+    Each partition is (predicate, params, order_by). Concatenating the
+    partitions in list order gives the same order as a single sequential
+    scan, so the merged output is deterministic.
+    """
+    base_query, params = build_search_query(filters)
+    cursor = conn.cursor()
+
+    if partition_by == "project":
+        cursor.execute(
+            f"SELECT DISTINCT ji.project FROM jiraissue ji WHERE ji.id IN "
+            f"(SELECT issue_id FROM ({base_query})) ORDER BY ji.project",
+            params,
+        )
+        project_ids = [row[0] for row in cursor.fetchall()]
+        chunk = min(max(1, -(-len(project_ids) // partitions)), MAX_IN_LIST_BINDS)
+        plans = []
+        for start in range(0, len(project_ids), chunk):
+            ids = project_ids[start:start + chunk]
+            binds = {f"part_project_{i}": pid for i, pid in enumerate(ids)}
+            predicate = f" AND ji.project IN ({', '.join(':' + name for name in binds)})"
+            plans.append((predicate, binds, " ORDER BY ji.project, ji.id"))
+        return plans
+
+    cursor.execute(f"SELECT MIN(issue_id), MAX(issue_id) FROM ({base_query})", params)
+    low, high = cursor.fetchone()
+    if low is None:
+        return []
+    span = max(1, -(-(high - low + 1) // partitions))
+    plans = []
+    for start in range(low, high + 1, span):
+        predicate = " AND ji.id BETWEEN :part_low AND :part_high"
+        plans.append((predicate, {"part_low": start, "part_high": min(start + span - 1, high)},
+                      " ORDER BY ji.id"))
+    return plans
+
+
+def _put(out, item, stop):
+    # A worker must never block on a full queue once the consumer has gone,
+    # or the pool can't be shut down; returns False when the export stopped.
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=PUT_POLL_SECONDS)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _scan_partition(filters, plan, out, stop):
+    predicate, part_params, order_by = plan
+    try:
+        base_query, params = build_search_query(filters)
+        params.update(part_params)
+        with acquire_read_connection() as conn:
+            previous_timeout = set_statement_timeout(conn, EXPORT_STATEMENT_TIMEOUT_MS)
+            try:
+                cursor = conn.cursor()
+                cursor.arraysize = FETCH_BATCH_SIZE
+                cursor.execute(base_query + predicate + order_by, params)
+                while not stop.is_set():
+                    rows = cursor.fetchmany(FETCH_BATCH_SIZE)
+                    if not rows:
+                        break
+                    if not _put(out, [row_to_issue(row) for row in rows], stop):
+                        return
+            finally:
+                restore_statement_timeout(conn, previous_timeout)
+        _put(out, _DONE, stop)
+    except Exception as e:
+        _put(out, e, stop)
+
+
+def iter_export(filters, parallelism=EXPORT_PARALLELISM, partition_by="id"):
+    """Yield batches of issues, scanning partitions concurrently on separate
+    connections and merging them back in partition order. The connections
+    come out of export_connections, so a busy server runs an export on fewer
+    of them than `parallelism` asks for."""
+    connections = export_connections.reserve(parallelism)
+    try:
+        with acquire_read_connection() as conn:
+            plans = plan_partitions(conn, filters, connections * PARTITIONS_PER_WORKER, partition_by)
+    except BaseException:
+        export_connections.release(connections)
+        raise
+    if not plans:
+        export_connections.release(connections)
+        return
+
+    stop = threading.Event()
+    outputs = [queue.Queue(maxsize=QUEUED_BATCHES_PER_PARTITION) for _ in plans]
+    # Partitions are submitted in output order, so the one being streamed is
+    # always already running and workers blocked on a full queue cannot
+    # starve it.
+    pool = ThreadPoolExecutor(max_workers=connections, thread_name_prefix="export")
+    try:
+        futures = [pool.submit(_scan_partition, filters, plan, out, stop) for plan, out in zip(plans, outputs)]
+        _release_when_done(futures, connections)
+        for out in outputs:
+            while True:
+                item = out.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+    finally:
+        # Reached on completion, on error and when the consumer closes the
+        # generator mid-stream: running workers see `stop` within one poll
+        # and queued partitions are never started.
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _stream_csv(batches):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _stream_ndjson(batches):
+    for batch in batches:
+        yield "".join(json.dumps(issue) + "\n" for issue in batch)
+
+
+router = APIRouter()
+
+@router.post("/export-issues")
+def export_issues(
+    filters: SearchFilters,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    parallelism: int = Query(EXPORT_PARALLELISM, gt=0, le=MAX_EXPORT_PARALLELISM),
+    partition_by: str = Query("id", pattern="^(id|project)$"),
+):
+    # Shed load up front while the response can still be a 429; an export
+    # that starts anyway waits up to EXPORT_QUEUE_WAIT_SECONDS for a connection.
+    if not export_connections.has_capacity():
+        return JSONResponse(content={"error": "Too many exports in progress, retry later"}, status_code=429,
+                            headers={"Retry-After": str(RETRY_AFTER_SECONDS)})
+    try:
+        batches = iter_export(filters, parallelism, partition_by)
+        if format == "csv":
+            return StreamingResponse(
+                _stream_csv(batches),
+                media_type="text/csv",
+                headers={"Content-Disposition": 'attachment; filename="issues.csv"'},
+            )
+        return StreamingResponse(_stream_ndjson(batches), media_type="application/x-ndjson")
+
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
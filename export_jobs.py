@@ -0,0 +1,293 @@
+import csv
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+from export_engine import EXPORT_COLUMNS, iter_export
+from ModifiedFilter import SearchFilters, build_search_query
+from replicas import acquire_read_connection
+
+# === CONFIGURATION START ===
+EXPORT_JOB_WORKERS = int(os.getenv("EXPORT_JOB_WORKERS", "2"))
+EXPORT_JOB_PARALLELISM = int(os.getenv("EXPORT_JOB_PARALLELISM", "2"))  # connections per job
+EXPORT_DIR = os.getenv("EXPORT_DIR", os.path.join(tempfile.gettempdir(), "issue-exports"))
+JOB_TTL_SECONDS = 6 * 60 * 60     # finished files are kept this long
+REUSE_FINISHED_SECONDS = 5 * 60   # an identical request reuses a finished job this recent
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# === CONFIGURATION END ===
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class ExportJobRequest(BaseModel):
+    filters: SearchFilters = SearchFilters()
+    format: str = "xlsx"
+    force: bool = False           # rerun even if a recent identical export finished
+
+
+class ExportJob:
+    def __init__(self, job_id, key, filters, fmt):
+        self.job_id = job_id
+        self.key = key
+        self.filters = filters
+        self.format = fmt
+        self.path = os.path.join(EXPORT_DIR, f"{job_id}.{fmt}")
+        self.status = "queued"
+        self.error = None
+        self.rows_done = 0
+        self.total_rows = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def progress(self):
+        elapsed = None
+        rows_per_sec = None
+        eta = None
+        if self.started_at:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+            if elapsed > 0:
+                rows_per_sec = round(self.rows_done / elapsed, 1)
+            if rows_per_sec and self.total_rows is not None and self.status == "running":
+                eta = round(max(self.total_rows - self.rows_done, 0) / rows_per_sec, 1)
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "format": self.format,
+            "rows_done": self.rows_done,
+            "total_rows": self.total_rows,
+            "rows_per_sec": rows_per_sec,
+            "eta_seconds": eta,
+            "elapsed_seconds": round(elapsed, 1) if elapsed is not None else None,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+# === SPILL WRITERS ===
+# Each writer appends one batch at a time so a job never holds more than a
+# batch of rows in memory.
+
+class CsvSpill:
+    def __init__(self, path):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=EXPORT_COLUMNS)
+        self._writer.writeheader()
+
+    def write(self, batch):
+        self._writer.writerows(batch)
+
+    def close(self):
+        self._file.close()
+
+
+class XlsxSpill:
+    def __init__(self, path):
+        from openpyxl import Workbook
+
+        self._path = path
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet("Issues")
+        self._sheet.append(EXPORT_COLUMNS)
+
+    def write(self, batch):
+        for issue in batch:
+            self._sheet.append([issue[column] for column in EXPORT_COLUMNS])
+
+    def close(self):
+        self._workbook.save(self._path)
+
+
+class ParquetSpill:
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.schema([(column, pa.string()) for column in EXPORT_COLUMNS])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, batch):
+        columns = {
+            column: [None if issue[column] is None else str(issue[column]) for issue in batch]
+            for column in EXPORT_COLUMNS
+        }
+        self._writer.write_table(self._pa.table(columns, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+SPILL_WRITERS = {"csv": CsvSpill, "xlsx": XlsxSpill, "parquet": ParquetSpill}
+
+
+# === JOB REGISTRY ===
+_jobs = {}
+_jobs_by_key = {}
+_jobs_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=EXPORT_JOB_WORKERS, thread_name_prefix="export-job")
+
+
+def job_key(filters, fmt):
+    payload = json.dumps({"filters": filters.model_dump(mode="json"), "format": fmt}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _count_rows(filters):
+    base_query, params = build_search_query(filters)
+    with acquire_read_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM ({base_query})", params)
+        return cursor.fetchone()[0]
+
+
+def _run_job(job):
+    job.status = "running"
+    job.started_at = time.time()
+    try:
+        job.total_rows = _count_rows(job.filters)
+        spill = SPILL_WRITERS[job.format](job.path)
+        try:
+            for batch in iter_export(job.filters, EXPORT_JOB_PARALLELISM):
+                spill.write(batch)
+                job.rows_done += len(batch)
+        finally:
+            spill.close()
+        job.status = "done"
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e)
+        if os.path.exists(job.path):
+            os.remove(job.path)
+    finally:
+        job.finished_at = time.time()
+
+
+def _expire_jobs():
+    cutoff = time.time() - JOB_TTL_SECONDS
+    for job in list(_jobs.values()):
+        if job.finished_at and job.finished_at < cutoff:
+            _jobs.pop(job.job_id, None)
+            if _jobs_by_key.get(job.key) is job:
+                del _jobs_by_key[job.key]
+            if os.path.exists(job.path):
+                os.remove(job.path)
+
+
+def _reusable(job, force):
+    # Identical queued or running jobs are always joined. A finished one is
+    # reused only briefly, since the data keeps changing underneath it.
+    if job.status in ("queued", "running"):
+        return True
+    return (not force and job.status == "done" and job.finished_at is not None
+            and time.time() - job.finished_at < REUSE_FINISHED_SECONDS)
+
+
+def submit_job(filters, fmt, force=False):
+    key = job_key(filters, fmt)
+    with _jobs_lock:
+        _expire_jobs()
+        existing = _jobs_by_key.get(key)
+        if existing and _reusable(existing, force):
+            return existing
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        job = ExportJob(uuid.uuid4().hex, key, filters, fmt)
+        _jobs[job.job_id] = job
+        _jobs_by_key[key] = job
+    _executor.submit(_run_job, job)
+    return job
+
+
+def _get_job(job_id):
+    job = _jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return job
+
+
+def _parse_range(range_header, size):
+    # Only single byte ranges ("bytes=start-end", "bytes=start-", "bytes=-suffix").
+    unit, _, spec = range_header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    start_text, _, end_text = spec.strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        else:
+            start = max(size - int(end_text), 0)
+            end = size - 1
+    except ValueError:
+        return None
+    end = min(end, size - 1)
+    if start > end:
+        raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+def _iter_file(path, start, length):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(DOWNLOAD_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+router = APIRouter(prefix="/export-jobs")
+
+@router.post("")
+def create_export_job(request: ExportJobRequest):
+    if request.format not in SPILL_WRITERS:
+        return JSONResponse(
+            content={"error": f"format must be one of {sorted(SPILL_WRITERS)}"}, status_code=400
+        )
+    job = submit_job(request.filters, request.format, request.force)
+    return JSONResponse(content=job.progress(), status_code=202)
+
+@router.get("/{job_id}")
+def get_export_job(job_id: str):
+    return JSONResponse(content=_get_job(job_id).progress())
+
+@router.get("/{job_id}/download")
+def download_export_job(job_id: str, range: str = Header(None)):
+    job = _get_job(job_id)
+    if job.status != "done":
+        return JSONResponse(content=job.progress(), status_code=409)
+
+    size = os.path.getsize(job.path)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'attachment; filename="issues-{job_id}.{job.format}"',
+    }
+    media_type = MEDIA_TYPES[job.format]
+    byte_range = _parse_range(range, size) if range else None
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(_iter_file(job.path, 0, size), media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        _iter_file(job.path, start, end - start + 1),
+        status_code=206,
+        media_type=media_type,
+        headers=headers,
+    )
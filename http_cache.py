@@ -0,0 +1,190 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# === CONFIGURATION START ===
+DEFAULT_CACHE_FILE = ".jira_http_cache.sqlite"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Responses under these paths are served from cache without contacting the
+# server until the TTL runs out; everything else is always revalidated.
+DEFAULT_TTL_RULES = {"/rest/api/2/search": 6 * 60 * 60}
+# Hit timestamps are buffered and written in one transaction, rather than
+# committing on every cache hit.
+ACCESS_FLUSH_BATCH = 100
+ACCESS_FLUSH_SECONDS = 5
+# === CONFIGURATION END ===
+
+
+class HttpCache:
+    """On-disk response cache with ETag/Last-Modified revalidation, per-path
+    TTLs and least-recently-used eviction by total body size."""
+
+    def __init__(self, path=DEFAULT_CACHE_FILE, max_bytes=DEFAULT_MAX_BYTES, ttl_rules=None):
+        self.max_bytes = max_bytes
+        self.ttl_rules = DEFAULT_TTL_RULES if ttl_rules is None else ttl_rules
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._db.commit()
+        self._lock = threading.Lock()
+        self._accessed = {}      # key -> last hit time not yet written
+        self._accessed_flushed_at = time.monotonic()
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "stored": 0, "evicted": 0,
+                      "bytes_saved": 0}
+
+    @staticmethod
+    def key(url, headers):
+        # Credentials are part of the key so one token never sees another's responses.
+        auth = (headers or {}).get("Authorization", "")
+        return hashlib.sha256(f"{url}\n{auth}".encode("utf-8")).hexdigest()
+
+    def ttl_for(self, url):
+        path = requests.utils.urlparse(url).path
+        for prefix, ttl in self.ttl_rules.items():
+            if path.startswith(prefix):
+                return ttl
+        return 0
+
+    def lookup(self, key):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, status, headers, body, etag, last_modified, stored_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row:
+                self._accessed[key] = time.time()
+                if (len(self._accessed) >= ACCESS_FLUSH_BATCH
+                        or time.monotonic() - self._accessed_flushed_at >= ACCESS_FLUSH_SECONDS):
+                    self._flush_accessed()
+                    self._db.commit()
+        return row
+
+    def _flush_accessed(self):
+        # Called with the lock held; the caller commits.
+        if self._accessed:
+            self._db.executemany("UPDATE responses SET accessed_at = ? WHERE key = ?",
+                                 [(accessed_at, key) for key, accessed_at in self._accessed.items()])
+            self._accessed.clear()
+        self._accessed_flushed_at = time.monotonic()
+
+    def touch(self, key):
+        with self._lock:
+            now = time.time()
+            self._accessed.pop(key, None)
+            self._db.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?",
+                             (now, now, key))
+            self._db.commit()
+
+    def store(self, key, response):
+        if "no-store" in response.headers.get("Cache-Control", ""):
+            return
+        body = response.content
+        now = time.time()
+        with self._lock:
+            self._accessed.pop(key, None)
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, response.url, response.status_code, json.dumps(dict(response.headers)), body,
+                 response.headers.get("ETag"), response.headers.get("Last-Modified"), now, now, len(body)),
+            )
+            self.stats["stored"] += 1
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        # Eviction order depends on accessed_at, so pending hits go in first.
+        self._flush_accessed()
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        while total > self.max_bytes:
+            row = self._db.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+            total -= row[1]
+            self.stats["evicted"] += 1
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def report(self):
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["revalidated"] + stats["misses"]
+        stats["saved_requests"] = stats["hits"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["revalidated"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._flush_accessed()
+            self._db.commit()
+            self._db.close()
+
+
+def _build_response(url, status, headers, body):
+    response = requests.Response()
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(json.loads(headers))
+    response._content = body
+    response.url = url
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+
+class CachedSession:
+    """Wraps any client with a requests-style get() (e.g. RateControlledSession)."""
+
+    def __init__(self, client, cache):
+        self.client = client
+        self.cache = cache
+
+    def get(self, url, headers=None, **kwargs):
+        headers = dict(headers or {})
+        key = self.cache.key(url, headers)
+        entry = self.cache.lookup(key)
+        if entry:
+            cached_url, status, cached_headers, body, etag, last_modified, stored_at = entry
+            if time.time() - stored_at < self.cache.ttl_for(url):
+                self.cache.count("hits")
+                self.cache.count("bytes_saved", len(body))
+                return _build_response(cached_url, status, cached_headers, body)
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        response = self.client.get(url, headers=headers, **kwargs)
+        if entry and response.status_code == 304:
+            self.cache.touch(key)
+            self.cache.count("revalidated")
+            self.cache.count("bytes_saved", len(entry[3]))
+            return _build_response(entry[0], entry[1], entry[2], entry[3])
+
+        self.cache.count("misses")
+        if response.status_code == 200:
+            self.cache.store(key, response)
+        return response
+
+    def report(self):
+        return self.client.report()
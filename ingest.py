@@ -0,0 +1,131 @@
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# === CONFIGURATION START ===
+DATA_DIR = os.getenv("DASHBOARD_DATA_DIR", "data")
+WORKBOOKS = {
+    "projects": "projects.xlsx",
+    "single_users": "single_users.xlsx",
+    "security_groups": "security_groups.xlsx",
+}
+# Columns holding Excel serial dates (what excelDateToJSDate converts in the dashboards).
+DATE_COLUMNS = {
+    "projects": ["Last Issue Updated"],
+}
+# Low-cardinality text columns stored dictionary-encoded (pandas categoricals).
+CATEGORY_COLUMNS = {
+    "projects": ["Region", "Template Key"],
+    "single_users": ["Region", "TEMPLATE_KEY"],
+    "security_groups": ["Region", "GROUP_NAME"],
+}
+# === CONFIGURATION END ===
+
+# calamine (Rust) parses xlsx several times faster than openpyxl; fall back
+# to openpyxl when python-calamine is not installed.
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = "calamine"
+except ImportError:
+    EXCEL_ENGINE = "openpyxl"
+
+EXCEL_EPOCH = np.datetime64("1899-12-30T00:00:00", "ms")
+MS_PER_DAY = 86_400_000
+
+
+def excel_serial_to_datetime(values):
+    """Convert a column of Excel serial dates to datetime64 in one vectorized
+    step. Blanks and non-numeric cells become NaT."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return pd.Series(values)
+    serial = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype="float64")
+    missing = np.isnan(serial)
+    offsets = np.rint(np.where(missing, 0, serial) * MS_PER_DAY).astype("int64")
+    dates = EXCEL_EPOCH + offsets.astype("timedelta64[ms]")
+    dates[missing] = np.datetime64("NaT")
+    return pd.Series(dates, index=getattr(values, "index", None))
+
+
+def read_workbook(path, sheet_name=0, engine=None):
+    return pd.read_excel(path, sheet_name=sheet_name, engine=engine or EXCEL_ENGINE)
+
+
+def type_frame(name, frame):
+    frame = frame.copy()
+    for column in DATE_COLUMNS.get(name, []):
+        if column in frame.columns:
+            frame[column] = excel_serial_to_datetime(frame[column])
+    for column in CATEGORY_COLUMNS.get(name, []):
+        if column in frame.columns:
+            frame[column] = frame[column].astype("category")
+    return frame
+
+
+def load_dataset(name, path=None, sheet_name=0):
+    path = path or os.path.join(DATA_DIR, WORKBOOKS[name])
+    return type_frame(name, read_workbook(path, sheet_name))
+
+
+def load_all(data_dir=DATA_DIR):
+    return {
+        name: load_dataset(name, os.path.join(data_dir, file_name))
+        for name, file_name in WORKBOOKS.items()
+    }
+
+
+# === BENCHMARK ===
+
+def _serial_to_date_per_value(serial):
+    # Same arithmetic as excelDateToJSDate, one cell at a time.
+    if serial is None or pd.isna(serial):
+        return None
+    return datetime(1970, 1, 1) + timedelta(days=int(serial - 25569))
+
+
+def make_sample_workbook(path, rows=50_000):
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({
+        "Project Key": [f"PRJ{i}" for i in range(rows)],
+        "Active Project Key": [f"PRJ{i}" if i % 3 else "" for i in range(rows)],
+        "Template Key": rng.choice([f"TPL-{i}" for i in range(40)], rows),
+        "Region": rng.choice(["NAM", "APAC"], rows),
+        "Last Issue Updated": rng.uniform(44000, 46000, rows).round(4),
+    })
+    frame.to_excel(path, index=False)
+
+
+def benchmark(path, repeat=3):
+    """Compare the newfile.py-style read (pd.read_excel + per-value date
+    conversion) with load_dataset. Returns the best time of each, in seconds."""
+    def baseline():
+        frame = pd.read_excel(path)
+        frame["Last Issue Updated"] = [_serial_to_date_per_value(v) for v in frame["Last Issue Updated"]]
+        return frame
+
+    def fast():
+        return load_dataset("projects", path)
+
+    results = {}
+    for label, func in (("pd.read_excel (openpyxl) + per-value dates", baseline),
+                        (f"ingest.load_dataset ({EXCEL_ENGINE}) + vectorized dates", fast)):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            frame = func()
+            timings.append(time.perf_counter() - start)
+        results[label] = min(timings)
+        print(f"⏱️ {label}: {min(timings):.3f}s for {len(frame)} rows")
+    return results
+
+
+if __name__ == "__main__":
+    workbook = sys.argv[1] if len(sys.argv) > 1 else os.path.join(DATA_DIR, WORKBOOKS["projects"])
+    if not os.path.exists(workbook):
+        print(f"ℹ️ {workbook} not found, generating a synthetic projects workbook")
+        os.makedirs(os.path.dirname(workbook) or ".", exist_ok=True)
+        make_sample_workbook(workbook)
+    benchmark(workbook)
@@ -0,0 +1,373 @@
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import pandas as pd
+import pyarrow as pa
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+
+from connections import acquire_connection
+from ingest import DATA_DIR, WORKBOOKS, load_dataset, type_frame
+from snapshot_store import SNAPSHOT_DIR, SnapshotReader, publish_update, snapshot_reader
+
+# === CONFIGURATION START ===
+CLOSURE_CACHE_FILE = os.getenv("MEMBERSHIP_CACHE_FILE", os.path.join(SNAPSHOT_DIR, "membership_closure.pickle"))
+ACTIVE_USERS_ONLY = True
+# === CONFIGURATION END ===
+
+SECURITY_GROUP_COLUMNS = ["USER_NAME", "DISPLAY_NAME", "EMAIL_ADDRESS", "GROUP_NAME", "Region", "TEMPLATE_KEY"]
+
+# Names are matched lower-cased, the way Jira resolves memberships; users and
+# groups with the same name in several directories are treated as one.
+MEMBERSHIP_QUERY = """
+    SELECT m.membership_type, m.lower_parent_name, m.lower_child_name
+    FROM cwd_membership m
+    WHERE m.membership_type IN ('GROUP_USER', 'GROUP_GROUP')
+"""
+GROUPS_QUERY = "SELECT g.lower_group_name, g.group_name FROM cwd_group g"
+USERS_QUERY = """
+    SELECT u.lower_user_name, u.user_name, u.display_name, u.email_address
+    FROM cwd_user u
+    {where}
+"""
+
+
+def _strongly_connected(nodes, successors):
+    """Tarjan's algorithm, iterative. Components come out children first
+    (reverse topological order), which is the order the closure needs."""
+    index = {}
+    low = {}
+    on_stack = set()
+    stack = []
+    components = []
+    counter = 0
+    for root in nodes:
+        if root in index:
+            continue
+        work = [(root, iter(successors(root)))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            advanced = False
+            for child in children:
+                if child not in index:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(successors(child))))
+                    advanced = True
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components
+
+
+class MembershipClosure:
+    """Effective (nested) group membership, kept as two indexes:
+    group -> users and user -> groups.
+
+    Built once from the direct edges; after that, edge changes only recompute
+    the changed group and the groups that contain it."""
+
+    def __init__(self):
+        self.subgroups = defaultdict(set)      # group -> direct child groups
+        self.parents = defaultdict(set)        # group -> groups that directly contain it
+        self.direct_users = defaultdict(set)   # group -> direct user members
+        self.group_users = {}                  # group -> frozenset of effective users
+        self.user_groups = defaultdict(set)    # user -> groups (effective)
+        self.edges = set()                     # (membership_type, parent, child)
+
+    # --- building ---
+
+    def rebuild(self, edges):
+        self.__init__()
+        for edge in edges:
+            self._add_edge(edge)
+        self._recompute(self._all_groups())
+        return self
+
+    def apply(self, added=(), removed=()):
+        """Apply membership edge changes; returns the groups whose effective
+        membership was recomputed."""
+        touched = set()
+        for edge in removed:
+            if edge in self.edges:
+                self._remove_edge(edge)
+                touched.add(edge[1])
+        for edge in added:
+            if edge not in self.edges:
+                self._add_edge(edge)
+                touched.add(edge[1])
+        affected = self._ancestors(touched)
+        self._recompute(affected)
+        return affected
+
+    def sync(self, edges):
+        edges = set(edges)
+        return self.apply(added=edges - self.edges, removed=self.edges - edges)
+
+    # --- queries ---
+
+    def users_in(self, group):
+        return self.group_users.get(group.lower(), frozenset())
+
+    def groups_of(self, user):
+        return frozenset(self.user_groups.get(user.lower(), ()))
+
+    # --- internals ---
+
+    def _add_edge(self, edge):
+        membership_type, parent, child = edge
+        self.edges.add(edge)
+        if membership_type == "GROUP_GROUP":
+            self.subgroups[parent].add(child)
+            self.parents[child].add(parent)
+        else:
+            self.direct_users[parent].add(child)
+
+    def _remove_edge(self, edge):
+        membership_type, parent, child = edge
+        self.edges.discard(edge)
+        if membership_type == "GROUP_GROUP":
+            self.subgroups[parent].discard(child)
+            self.parents[child].discard(parent)
+        else:
+            self.direct_users[parent].discard(child)
+
+    def _all_groups(self):
+        return set(self.subgroups) | set(self.parents) | set(self.direct_users) | set(self.group_users)
+
+    def _ancestors(self, groups):
+        seen = set(groups)
+        pending = list(groups)
+        while pending:
+            for parent in self.parents.get(pending.pop(), ()):
+                if parent not in seen:
+                    seen.add(parent)
+                    pending.append(parent)
+        return seen
+
+    def _recompute(self, groups):
+        # Groups outside `groups` keep their cached closure; a nesting cycle
+        # collapses into one component whose members share a user set.
+        successors = lambda g: [c for c in self.subgroups.get(g, ()) if c in groups]
+        for component in _strongly_connected(sorted(groups), successors):
+            members = set(component)
+            users = set()
+            for group in component:
+                users |= self.direct_users.get(group, set())
+                for child in self.subgroups.get(group, ()):
+                    if child not in members:
+                        users |= self.group_users.get(child, frozenset())
+            users = frozenset(users)
+            for group in component:
+                self._set_group_users(group, users)
+
+    def _set_group_users(self, group, users):
+        old = self.group_users.get(group, frozenset())
+        for user in old - users:
+            self.user_groups[user].discard(group)
+            if not self.user_groups[user]:
+                del self.user_groups[user]
+        for user in users - old:
+            self.user_groups[user].add(group)
+        if users:
+            self.group_users[group] = users
+        else:
+            self.group_users.pop(group, None)
+
+
+# === ENGINE ===
+# One closure per process, refreshed by diffing the membership table against
+# the edges it was built from and persisted so the next process starts warm.
+
+_closure = None
+_closure_lock = threading.Lock()
+_closure_version = None      # security_groups dataset version _closure was loaded for
+_reload_lock = threading.Lock()
+
+
+def fetch_edges(conn):
+    cursor = conn.cursor()
+    cursor.execute(MEMBERSHIP_QUERY)
+    return {(kind, parent, child) for kind, parent, child in cursor.fetchall()}
+
+
+def load_closure(path=CLOSURE_CACHE_FILE):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+
+
+def save_closure(closure, path=CLOSURE_CACHE_FILE):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        pickle.dump(closure, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
+
+
+def refresh_closure(conn, cache_path=CLOSURE_CACHE_FILE):
+    """Bring the process-wide closure up to date. Returns (closure, number of
+    groups recomputed)."""
+    global _closure
+    edges = fetch_edges(conn)
+    with _closure_lock:
+        closure = _closure or load_closure(cache_path)
+        if closure is None:
+            closure = MembershipClosure().rebuild(edges)
+            recomputed = len(closure.group_users)
+        else:
+            recomputed = len(closure.sync(edges))
+        _closure = closure
+        if recomputed:
+            save_closure(closure, cache_path)
+    return closure, recomputed
+
+
+def published_version():
+    # Version of the published security_groups dataset; a sync publishes a
+    # new one after saving the closure cache.
+    try:
+        return snapshot_reader.dataset_version("security_groups")
+    except (OSError, KeyError, pa.ArrowInvalid):
+        return None
+
+
+def get_closure():
+    """The process-wide closure, reloaded from the closure cache whenever a
+    sync has published a new security_groups dataset since it was loaded."""
+    global _closure, _closure_version
+    version = published_version()
+    if _closure is not None and version == _closure_version:
+        return _closure
+    with _reload_lock:
+        if _closure is None or version != _closure_version:
+            closure = load_closure(CLOSURE_CACHE_FILE)
+            if closure is None:
+                with acquire_connection() as conn:
+                    refresh_closure(conn, CLOSURE_CACHE_FILE)
+            else:
+                with _closure_lock:
+                    _closure = closure
+            _closure_version = version
+    return _closure
+
+
+# === SECURITY GROUPS DATASET ===
+
+def fetch_users(conn):
+    cursor = conn.cursor()
+    cursor.execute(USERS_QUERY.format(where="WHERE u.active = 1" if ACTIVE_USERS_ONLY else ""))
+    users = pd.DataFrame(cursor.fetchall(),
+                         columns=["lower_user_name", "USER_NAME", "DISPLAY_NAME", "EMAIL_ADDRESS"])
+    return users.drop_duplicates("lower_user_name").set_index("lower_user_name")
+
+
+def fetch_group_names(conn):
+    cursor = conn.cursor()
+    cursor.execute(GROUPS_QUERY)
+    return dict(cursor.fetchall())
+
+
+def load_group_metadata(snapshot_dir=SNAPSHOT_DIR, data_dir=DATA_DIR):
+    """Region (and TEMPLATE_KEY where present) per security group, from the
+    published security_groups dataset or security_groups.xlsx. These also
+    decide which groups the dataset covers."""
+    frame = None
+    try:
+        frame = SnapshotReader(snapshot_dir).table("security_groups").to_pandas()
+    except (OSError, KeyError, pa.ArrowInvalid):
+        workbook = os.path.join(data_dir, WORKBOOKS["security_groups"])
+        if os.path.exists(workbook):
+            frame = load_dataset("security_groups", workbook)
+    if frame is None or "GROUP_NAME" not in frame.columns:
+        return None
+    columns = [c for c in ("GROUP_NAME", "Region", "TEMPLATE_KEY") if c in frame.columns]
+    frame = frame[columns].astype("object").drop_duplicates()
+    frame["lower_group_name"] = frame["GROUP_NAME"].str.lower()
+    return frame.drop(columns="GROUP_NAME")
+
+
+def build_security_groups_frame(closure, users, group_names, metadata=None):
+    if metadata is None:
+        metadata = pd.DataFrame({"lower_group_name": sorted(closure.group_users)})
+    pairs = [
+        (group, user)
+        for group in metadata["lower_group_name"].unique()
+        for user in closure.group_users.get(group, ())
+    ]
+    members = pd.DataFrame(pairs, columns=["lower_group_name", "lower_user_name"])
+    members = members.join(users, on="lower_user_name", how="inner")
+    members = members.merge(metadata, on="lower_group_name", how="left")
+    members["GROUP_NAME"] = members["lower_group_name"].map(group_names).fillna(members["lower_group_name"])
+    for column in ("Region", "TEMPLATE_KEY"):
+        if column not in members.columns:
+            members[column] = ""
+        members[column] = members[column].fillna("")
+    members = members.sort_values(["GROUP_NAME", "USER_NAME"]).reset_index(drop=True)
+    return type_frame("security_groups", members[SECURITY_GROUP_COLUMNS])
+
+
+def regenerate_security_groups(snapshot_dir=SNAPSHOT_DIR, cache_path=CLOSURE_CACHE_FILE):
+    """Refresh the closure and publish a new security_groups dataset.
+    Returns (snapshot version, groups recomputed, rows)."""
+    with acquire_connection() as conn:
+        closure, recomputed = refresh_closure(conn, cache_path)
+        users = fetch_users(conn)
+        group_names = fetch_group_names(conn)
+    frame = build_security_groups_frame(closure, users, group_names, load_group_metadata(snapshot_dir))
+    version = publish_update({"security_groups": frame}, snapshot_dir)
+    return version, recomputed, len(frame)
+
+
+router = APIRouter(prefix="/membership")
+
+@router.get("/groups/{group}/users")
+def users_in_group(group: str):
+    closure = get_closure()
+    users = closure.users_in(group)
+    if not users and group.lower() not in closure.direct_users and group.lower() not in closure.subgroups:
+        raise HTTPException(status_code=404, detail="Group not found")
+    return JSONResponse(content={"group": group, "count": len(users), "users": sorted(users)})
+
+@router.get("/users/{user}/groups")
+def groups_of_user(user: str):
+    groups = get_closure().groups_of(user)
+    return JSONResponse(content={"user": user, "count": len(groups), "groups": sorted(groups)})
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    if "--full" in sys.argv[1:] and os.path.exists(CLOSURE_CACHE_FILE):
+        os.remove(CLOSURE_CACHE_FILE)
+    version, recomputed, rows = regenerate_security_groups()
+    print(f"✅ security_groups regenerated: {recomputed} groups recomputed, {rows} rows, "
+          f"published snapshot {version} in {time.perf_counter() - start:.2f}s")
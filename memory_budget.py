@@ -0,0 +1,261 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+# === CONFIGURATION START ===
+# tracemalloc slows allocations down noticeably, so it only runs when
+# SEARCH_MEMORY_TRACING=1, or for TRACE_WINDOW_SECONDS after a snapshot is
+# requested.
+MEMORY_TRACING = os.getenv("SEARCH_MEMORY_TRACING", "0") == "1"
+MEMORY_ADMIN_TOKEN = os.getenv("SEARCH_MEMORY_TOKEN", "")
+TRACEMALLOC_FRAMES = 10
+TRACE_WINDOW_SECONDS = int(os.getenv("SEARCH_MEMORY_TRACE_WINDOW", "300"))
+MAX_RESULT_ROWS = int(os.getenv("SEARCH_MAX_RESULT_ROWS", "50000"))
+MAX_RESULT_BYTES = int(os.getenv("SEARCH_MAX_RESULT_BYTES", str(256 * 1024 * 1024)))
+FETCH_BATCH_SIZE = 1000
+# Histogram buckets (bytes) for the per-request metrics.
+BYTE_BUCKETS = (1 << 16, 1 << 20, 1 << 22, 1 << 24, 1 << 26, 1 << 28, 1 << 30)
+# === CONFIGURATION END ===
+
+if MEMORY_TRACING:
+    tracemalloc.start(TRACEMALLOC_FRAMES)
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+def estimate_row_bytes(row):
+    # Shallow size of the row plus each value; good enough to stop a runaway
+    # result long before it matters, without walking nested objects.
+    return sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+
+
+class MemoryBudget:
+    """Per-request row/byte allowance, charged as rows are fetched."""
+
+    def __init__(self, max_rows=MAX_RESULT_ROWS, max_bytes=MAX_RESULT_BYTES):
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.rows = 0
+        self.bytes = 0
+
+    def charge(self, rows):
+        self.rows += len(rows)
+        self.bytes += sum(estimate_row_bytes(row) for row in rows)
+        if self.rows > self.max_rows:
+            raise BudgetExceeded(
+                f"Result exceeds the limit of {self.max_rows} rows per request; "
+                f"narrow the filters or use /export-jobs for large extracts"
+            )
+        if self.bytes > self.max_bytes:
+            raise BudgetExceeded(
+                f"Result exceeds the limit of {self.max_bytes // (1024 * 1024)} MiB per request; "
+                f"narrow the filters or use /export-jobs for large extracts"
+            )
+
+
+def fetch_within_budget(cursor, budget, convert=None):
+    """fetchmany() loop that charges every batch to the budget, so an
+    oversized result is abandoned after one batch too many rather than
+    after the whole result has been materialised."""
+    cursor.arraysize = FETCH_BATCH_SIZE
+    results = []
+    while True:
+        rows = cursor.fetchmany(FETCH_BATCH_SIZE)
+        if not rows:
+            return results
+        budget.charge(rows)
+        if convert:
+            rows = [convert(row) for row in rows]
+        results.extend(rows)
+
+
+# === METRICS ===
+
+class ByteHistogram:
+    def __init__(self, buckets=BYTE_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += value
+        self.count += 1
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.total}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+_metrics_lock = threading.Lock()
+_result_bytes = {}       # route -> ByteHistogram of bytes charged to the budget
+_budget_exceeded = {}    # route -> count
+
+
+@contextmanager
+def track(route, budget=None):
+    """Record what one request charged to its budget. Traced memory is not
+    attributed per request: tracemalloc's peak is process-wide, and resetting
+    it for one request would hide the peaks of the requests overlapping it.
+    render_metrics exports the process peak as a gauge instead."""
+    budget = budget or MemoryBudget()
+    try:
+        yield budget
+    except BudgetExceeded:
+        with _metrics_lock:
+            _budget_exceeded[route] = _budget_exceeded.get(route, 0) + 1
+        raise
+    finally:
+        with _metrics_lock:
+            _result_bytes.setdefault(route, ByteHistogram()).observe(budget.bytes)
+
+
+def resident_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        # ru_maxrss is the peak, in KiB on Linux.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def render_metrics():
+    lines = [
+        "# HELP search_request_result_bytes Estimated bytes of rows fetched per search request.",
+        "# TYPE search_request_result_bytes histogram",
+    ]
+    with _metrics_lock:
+        for route, histogram in sorted(_result_bytes.items()):
+            lines.extend(histogram.render("search_request_result_bytes", f'route="{route}"'))
+        lines.append("# HELP search_request_budget_exceeded_total Requests aborted by the row/byte budget.")
+        lines.append("# TYPE search_request_budget_exceeded_total counter")
+        for route, count in sorted(_budget_exceeded.items()):
+            lines.append(f'search_request_budget_exceeded_total{{route="{route}"}} {count}')
+    lines.append("# HELP process_resident_memory_bytes Resident set size.")
+    lines.append("# TYPE process_resident_memory_bytes gauge")
+    lines.append(f"process_resident_memory_bytes {resident_bytes()}")
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        lines.append("# TYPE tracemalloc_traced_bytes gauge")
+        lines.append(f"tracemalloc_traced_bytes {current}")
+        lines.append("# HELP tracemalloc_traced_peak_bytes Peak traced memory since tracing started.")
+        lines.append("# TYPE tracemalloc_traced_peak_bytes gauge")
+        lines.append(f"tracemalloc_traced_peak_bytes {peak}")
+    return "\n".join(lines) + "\n"
+
+
+# === ADMIN ENDPOINTS ===
+router = APIRouter(prefix="/admin/memory")
+
+_last_snapshot = None
+_snapshot_lock = threading.Lock()
+_trace_window = None     # threading.Timer that stops on-demand tracing
+
+
+def _authorized(token):
+    return bool(MEMORY_ADMIN_TOKEN) and token == MEMORY_ADMIN_TOKEN
+
+
+def start_trace_window(seconds=None):
+    """Trace allocations for a bounded window; returns the window's timer."""
+    global _trace_window
+    with _snapshot_lock:
+        if tracemalloc.is_tracing():
+            return _trace_window
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        _trace_window = threading.Timer(seconds or TRACE_WINDOW_SECONDS, stop_trace_window)
+        _trace_window.daemon = True
+        _trace_window.start()
+        return _trace_window
+
+
+def stop_trace_window():
+    global _trace_window, _last_snapshot
+    with _snapshot_lock:
+        if _trace_window is not None:
+            _trace_window.cancel()
+            _trace_window = None
+        # Always-on tracing (SEARCH_MEMORY_TRACING=1) is left alone.
+        if not MEMORY_TRACING and tracemalloc.is_tracing():
+            tracemalloc.stop()
+            # Snapshots from a finished window can't be compared with the next one.
+            _last_snapshot = None
+
+
+@router.get("/metrics")
+def memory_metrics(x_memory_token: str = Header(None)):
+    if not _authorized(x_memory_token):
+        raise HTTPException(status_code=404)
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/snapshot")
+def memory_snapshot(
+    limit: int = Query(25, gt=0, le=500),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    compare: bool = Query(False),        # diff against the previous snapshot
+    x_memory_token: str = Header(None),
+):
+    global _last_snapshot
+    if not _authorized(x_memory_token):
+        raise HTTPException(status_code=404)
+    # Held while snapshotting so the window cannot close mid-snapshot.
+    with _snapshot_lock:
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ))
+            current, peak = tracemalloc.get_traced_memory()
+            previous, _last_snapshot = _last_snapshot, snapshot
+    if not tracing:
+        start_trace_window()
+        return JSONResponse(
+            content={"tracing": True, "trace_window_seconds": TRACE_WINDOW_SECONDS,
+                     "detail": "tracemalloc started; request a snapshot again within the window once traffic has run"},
+            status_code=202,
+        )
+
+    if compare and previous is not None:
+        stats = snapshot.compare_to(previous, group_by)[:limit]
+        top = [
+            {"location": str(stat.traceback), "size": stat.size, "size_diff": stat.size_diff,
+             "count": stat.count, "count_diff": stat.count_diff}
+            for stat in stats
+        ]
+    else:
+        stats = snapshot.statistics(group_by)[:limit]
+        top = [{"location": str(stat.traceback), "size": stat.size, "count": stat.count} for stat in stats]
+
+    return JSONResponse(content={
+        "taken_at": time.time(),
+        "traced_bytes": current,
+        "traced_peak_bytes": peak,
+        "resident_bytes": resident_bytes(),
+        "group_by": group_by,
+        "compared": bool(compare and previous is not None),
+        "top": top,
+    })
@@ -1,56 +1,318 @@
-import requests
-import pandas as pd
+import csv
+import functools
+import os
+import queue
+import threading
 import urllib3
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from openpyxl import Workbook, load_workbook
+from http_cache import CachedSession, HttpCache
+from rate_control import RateControlledSession
 
 # === DISABLE SSL WARNINGS ===
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # === CONFIGURATION START ===
-BASE_URL = "https://your-jira-datacenter-instance"
-API_TOKEN = "your-api-token-here"
-EXCEL_INPUT_FILE = "projects.xlsx"           # Input Excel file with project keys
+# One entry per Jira Data Center instance. Each instance gets its own pooled,
+# rate-controlled client and worker budget, and all instances run at once.
+# Rows are routed by their "instance" column, else by their "Region" column
+# (an instance serves its own name plus any listed "regions").
+JIRA_INSTANCES = [
+    {"name": "NAM", "base_url": "https://your-nam-jira-instance", "api_token": "your-nam-api-token", "max_workers": 8},
+    {"name": "APAC", "base_url": "https://your-apac-jira-instance", "api_token": "your-apac-api-token", "max_workers": 8},
+]
+EXCEL_INPUT_FILE = "projects.xlsx"           # Input Excel (or .csv) file with project keys
+                                             # (optional "instance" or "Region" column routes a key to one instance)
 EXCEL_OUTPUT_FILE = "jira_issue_counts.xlsx" # Output Excel file
+PROGRESS_LOG_FILE = "jira_issue_counts.progress.csv"  # Append-only checkpoint log
+FSYNC_EVERY = 50                             # fsync the checkpoint log every N results
+MAX_WORKERS = 8                              # default per-instance upper bound; the rate controller adapts below it
+HTTP_CACHE_FILE = ".jira_http_cache.sqlite"  # On-disk response cache shared by all instances (None disables)
+HTTP_CACHE_MAX_BYTES = 256 * 1024 * 1024
+HTTP_CACHE_TTL_SECONDS = 6 * 60 * 60         # search counts younger than this are reused without a request
+REPORT_MODE = "count"                        # "count" (REST, one total per project) or
+                                             # "breakdown" (one DB aggregate, status x type)
 # === CONFIGURATION END ===
 
-# === AUTH HEADERS ===
-headers = {
-    "Accept": "application/json",
-    "Authorization": f"Bearer {API_TOKEN}"
-}
+LOG_COLUMNS = ["instance", "project_key", "issue_count"]
+# Jira answers a search for a project it does not host with 400 (unknown JQL
+# value) or 404; unrouted keys then move on to the next instance.
+NOT_HOSTED_STATUSES = (400, 404)
+NOT_FOUND = "Not found"
 
-def get_issue_count(base_url, headers, project_key):
+
+class ProjectNotHosted(Exception):
+    pass
+
+
+class JiraInstance:
+    def __init__(self, name, base_url, api_token, max_workers=MAX_WORKERS, regions=(), cache=None):
+        self.name = name
+        self.regions = tuple(regions)
+        self.base_url = base_url
+        self.max_workers = max_workers
+        # === AUTH HEADERS ===
+        self.headers = {
+            "Accept": "application/json",
+            "Authorization": f"Bearer {api_token}"
+        }
+        # Paces requests and retries 429/503 (honouring Retry-After), so
+        # throttling slows the run down instead of producing "Error" rows.
+        self.client = RateControlledSession(pool_size=max_workers, verify=False)
+        if cache is not None:
+            self.client = CachedSession(self.client, cache)
+
+    def fetch(self, project_key):
+        print(f"🔍 [{self.name}] Fetching issue count for project: {project_key}")
+        try:
+            return self.name, project_key, get_issue_count(self.base_url, self.headers, project_key, self.client)
+        except Exception as e:
+            print(f"⚠️ [{self.name}] Error fetching issues for {project_key}: {e}")
+            return self.name, project_key, "Error"
+
+
+def get_issue_count(base_url, headers, project_key, client):
     url = f"{base_url}/rest/api/2/search?jql=project={project_key}&maxResults=0"
-    response = requests.get(url, headers=headers, verify=False)
+    response = client.get(url, headers=headers)
+    if response.status_code in NOT_HOSTED_STATUSES:
+        raise ProjectNotHosted(f"{project_key} is not hosted on {base_url} (HTTP {response.status_code})")
     response.raise_for_status()
     return response.json().get("total", 0)
 
+def find_and_count(instances, project_key):
+    # A key with no routing is asked of each instance in turn, stopping at the
+    # first that hosts the project, so it yields one row rather than one per
+    # instance.
+    failed = False
+    for instance in instances:
+        try:
+            count = get_issue_count(instance.base_url, instance.headers, project_key, instance.client)
+            print(f"🔍 [{instance.name}] Found project {project_key}")
+            return instance.name, project_key, count
+        except ProjectNotHosted:
+            continue
+        except Exception as e:
+            print(f"⚠️ [{instance.name}] Error fetching issues for {project_key}: {e}")
+            failed = True
+    # "Error" rows are retried on the next run; a key no instance hosts is not.
+    if failed:
+        return "", project_key, "Error"
+    print(f"⚠️ Project {project_key} was not found on any instance")
+    return "", project_key, NOT_FOUND
+
+def iter_input_rows(path):
+    # Streams (route, project_key) one row at a time instead of loading the
+    # whole sheet. route is the "instance" column, else the "Region" column,
+    # else None.
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            if "project_key" not in (reader.fieldnames or []):
+                raise ValueError("Input file must contain a column named 'project_key'")
+            for row in reader:
+                if row["project_key"]:
+                    yield (row.get("instance") or row.get("Region") or None), row["project_key"].strip()
+        return
+
+    workbook = load_workbook(path, read_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, ())
+        if "project_key" not in header:
+            raise ValueError("Input file must contain a column named 'project_key'")
+        column = header.index("project_key")
+        route_columns = [header.index(name) for name in ("instance", "Region") if name in header]
+        for row in rows:
+            if column < len(row) and row[column]:
+                route = next((row[i] for i in route_columns if i < len(row) and row[i]), None)
+                yield route, str(row[column]).strip()
+    finally:
+        workbook.close()
+
+def iter_project_keys(path):
+    for _, project_key in iter_input_rows(path):
+        yield project_key
+
+def load_completed_keys(log_path):
+    # (instance, project_key) pairs with a successful count in the checkpoint
+    # log; errors are retried.
+    completed = set()
+    if not os.path.exists(log_path):
+        return completed
+    with open(log_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if row["issue_count"] != "Error":
+                completed.add((row.get("instance") or "", row["project_key"]))
+    return completed
+
+class ProgressLog:
+    def __init__(self, log_path):
+        is_new = not os.path.exists(log_path) or os.path.getsize(log_path) == 0
+        self._file = open(log_path, "a", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._pending = 0
+        if is_new:
+            self._writer.writerow(LOG_COLUMNS)
+
+    def append(self, instance, project_key, count):
+        self._writer.writerow([instance, project_key, count])
+        self._file.flush()
+        self._pending += 1
+        if self._pending >= FSYNC_EVERY:
+            os.fsync(self._file.fileno())
+            self._pending = 0
+
+    def close(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+def write_output(log_path, output_path):
+    # Rebuild the workbook from the log with a write-only (streaming) sheet.
+    # Later entries win, so a key that errored and then succeeded on a rerun
+    # appears once with its count. An unrouted key logs its error without an
+    # instance, so any later success for the project replaces it.
+    completed = load_completed_keys(log_path)
+    completed_projects = {project_key for _, project_key in completed}
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sheet1")
+    sheet.append(LOG_COLUMNS)
+    written = set()
+    with open(log_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            key = (row.get("instance") or "", row["project_key"])
+            failed = row["issue_count"] == "Error"
+            if key in written or (failed and key in completed):
+                continue
+            if failed and not key[0] and key[1] in completed_projects:
+                continue
+            count = row["issue_count"]
+            sheet.append([key[0], key[1], int(count) if count.isdigit() else count])
+            written.add(key)
+    workbook.save(output_path)
+
+_INSTANCE_DONE = object()
+
+def instance_routes(instances):
+    # Route label (instance name or Region) -> instance name.
+    routes = {}
+    for instance in instances:
+        routes[instance.name] = instance.name
+        for region in instance.regions:
+            routes[region] = instance.name
+    return routes
+
+def count_instance(instance, routes, completed, results):
+    def wanted(route, project_key):
+        return routes.get(route) == instance.name and (instance.name, project_key) not in completed
+
+    _count_keys(instance.max_workers, wanted, instance.fetch, results)
+
+def count_unrouted(instances, routes, completed, results):
+    # Keys counted on any instance in an earlier run are done.
+    completed_keys = {project_key for _, project_key in completed}
+
+    def wanted(route, project_key):
+        return route not in routes and project_key not in completed_keys
+
+    _count_keys(instances[0].max_workers, wanted, functools.partial(find_and_count, instances), results)
+
+def _count_keys(max_workers, wanted, fetch, results):
+    # Each instance (and the unrouted keys) reads the (streamed) input on its
+    # own thread so a slow instance never holds back the others; results go
+    # to the main thread.
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pending = set()
+            submitted = set()
+            for route, project_key in iter_input_rows(EXCEL_INPUT_FILE):
+                if not wanted(route, project_key) or project_key in submitted:
+                    continue
+                submitted.add(project_key)
+                pending.add(pool.submit(fetch, project_key))
+                # At most 2 * max_workers keys are in flight per thread so
+                # memory stays flat however long the input is.
+                if len(pending) >= 2 * max_workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        results.put(future.result())
+            for future in pending:
+                results.put(future.result())
+    except Exception as e:
+        results.put(e)
+    finally:
+        results.put(_INSTANCE_DONE)
+
 def main():
+    if REPORT_MODE == "breakdown":
+        from breakdown_report import main as breakdown_main
+        try:
+            project_keys = list(iter_project_keys(EXCEL_INPUT_FILE))
+        except Exception as e:
+            print(f"❌ Error reading input file: {e}")
+            return
+        breakdown_main(project_keys)
+        return
+
     try:
-        df_input = pd.read_excel(EXCEL_INPUT_FILE)
+        completed = load_completed_keys(PROGRESS_LOG_FILE)
     except Exception as e:
-        print(f"❌ Error reading Excel file: {e}")
+        print(f"❌ Error reading checkpoint log: {e}")
         return
 
-    if "project_key" not in df_input.columns:
-        print("❌ Input file must contain a column named 'project_key'")
+    if completed:
+        print(f"⏩ Resuming: {len(completed)} projects already counted")
+
+    cache = None
+    if HTTP_CACHE_FILE:
+        cache = HttpCache(HTTP_CACHE_FILE, HTTP_CACHE_MAX_BYTES,
+                          {"/rest/api/2/search": HTTP_CACHE_TTL_SECONDS})
+    instances = [JiraInstance(**config, cache=cache) for config in JIRA_INSTANCES]
+    routes = instance_routes(instances)
+    completed = frozenset(completed)
+    results = queue.Queue(maxsize=sum(2 * i.max_workers for i in instances) + 2 * instances[0].max_workers)
+    threads = [
+        threading.Thread(target=count_instance, args=(instance, routes, completed, results),
+                         name=f"count-{instance.name}", daemon=True)
+        for instance in instances
+    ]
+    threads.append(threading.Thread(target=count_unrouted, args=(instances, routes, completed, results),
+                                    name="count-unrouted", daemon=True))
+    for thread in threads:
+        thread.start()
+
+    # Only the main thread writes the log.
+    log = ProgressLog(PROGRESS_LOG_FILE)
+    failed = False
+    try:
+        running = len(threads)
+        while running:
+            item = results.get()
+            if item is _INSTANCE_DONE:
+                running -= 1
+            elif isinstance(item, Exception):
+                print(f"❌ Error reading input file: {item}")
+                failed = True
+            else:
+                log.append(*item)
+    finally:
+        log.close()
+    if failed:
         return
 
-    results = []
-    for project_key in df_input["project_key"]:
-        print(f"🔍 Fetching issue count for project: {project_key}")
-        try:
-            count = get_issue_count(BASE_URL, headers, project_key)
-        except Exception as e:
-            print(f"⚠️ Error fetching issues for {project_key}: {e}")
-            count = "Error"
-        results.append({
-            "project_key": project_key,
-            "issue_count": count
-        })
-
-    df_output = pd.DataFrame(results)
+    for instance in instances:
+        stats = instance.client.report()
+        print(f"📈 [{instance.name}] {stats['succeeded']} requests at a sustained "
+              f"{stats['sustained_rate']} req/s ({stats['throttled']} throttled and retried)")
+    if cache is not None:
+        stats = cache.report()
+        print(f"💾 Cache: {stats['hits']} hits, {stats['revalidated']} revalidated (304), "
+              f"{stats['misses']} misses; {stats['saved_requests']} requests and "
+              f"{stats['bytes_saved']} bytes saved")
+        cache.close()
+
     try:
-        df_output.to_excel(EXCEL_OUTPUT_FILE, index=False)
+        write_output(PROGRESS_LOG_FILE, EXCEL_OUTPUT_FILE)
         print(f"✅ Results saved to {EXCEL_OUTPUT_FILE}")
     except Exception as e:
         print(f"❌ Error writing to output file: {e}")
@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# === CONFIGURATION START ===
+PREFETCH_PAGES = int(os.getenv("SEARCH_PREFETCH_PAGES", "5"))        # pages fetched per query
+PAGE_CACHE_TTL_SECONDS = float(os.getenv("SEARCH_PAGE_CACHE_TTL", "30"))
+MAX_CACHED_WINDOWS = 512
+# === CONFIGURATION END ===
+
+
+def page_signature(filters, order_by, page_size):
+    payload = json.dumps(
+        {"filters": filters.model_dump(mode="json"), "order_by": order_by, "page_size": page_size},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PageWindowCache:
+    """Pages are fetched PREFETCH_PAGES at a time. A window is keyed by the
+    search signature and its first row, and the pages after the requested one
+    are served from memory until the window's TTL runs out."""
+
+    def __init__(self, pages=PREFETCH_PAGES, ttl=PAGE_CACHE_TTL_SECONDS, max_windows=MAX_CACHED_WINDOWS):
+        self.pages = pages
+        self.ttl = ttl
+        self.max_windows = max_windows
+        self.hits = 0
+        self.misses = 0
+        self._windows = OrderedDict()   # (signature, window offset) -> (expires at, rows)
+        self._lock = threading.Lock()
+
+    def window_bounds(self, offset, page_size, row_limit=None):
+        window_rows = self.pages * page_size
+        start = offset - offset % window_rows
+        if row_limit is not None:
+            window_rows = max(min(window_rows, row_limit - start), offset + page_size - start)
+        return start, window_rows
+
+    def get_page(self, signature, offset, page_size, fetch, row_limit=None):
+        """Return (rows of the requested page, True if served from cache).
+        fetch(start, limit) loads a whole window; row_limit caps how deep a
+        window may reach (the top-k bound of non-indexed sorts)."""
+        start, window_rows = self.window_bounds(offset, page_size, row_limit)
+        key = (signature, start)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._windows.get(key)
+            if entry is not None and entry[0] > now:
+                self._windows.move_to_end(key)
+                self.hits += 1
+                rows = entry[1]
+                return rows[offset - start:offset - start + page_size], True
+            self.misses += 1
+
+        rows = fetch(start, window_rows)
+        with self._lock:
+            self._windows[key] = (now + self.ttl, rows)
+            self._windows.move_to_end(key)
+            while len(self._windows) > self.max_windows:
+                self._windows.popitem(last=False)
+        return rows[offset - start:offset - start + page_size], False
+
+    def clear(self):
+        with self._lock:
+            self._windows.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "windows": len(self._windows),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else None,
+        }
+
+
+page_cache = PageWindowCache()
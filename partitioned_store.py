@@ -0,0 +1,237 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import quote
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from snapshot_store import snapshot_reader
+
+# === CONFIGURATION START ===
+PARTITION_DIR = os.getenv("DASHBOARD_PARTITION_DIR", "partitions")
+MAX_CACHED_PARTITIONS = 512     # partition tables kept in memory, keyed by content hash
+# === CONFIGURATION END ===
+
+# Columns each dataset is sliced and partitioned by: (region column, template column).
+SLICE_COLUMNS = {
+    "projects": ("Region", "Template Key"),
+    "single_users": ("Region", "TEMPLATE_KEY"),
+    "security_groups": ("Region", None),
+}
+MANIFEST_FILE = "manifest.json"
+NULL_PARTITION = "__null__"
+# Stable keys scoped slices are ordered by, on the partitioned path and when
+# filtering the full table alike. They are the builders' own sort orders
+# (projects_builder sorts by Project Key, membership by group and user), so a
+# partition holds only its own rows and an insert elsewhere leaves it intact.
+ORDER_COLUMNS = {
+    "projects": ["Project Key"],
+    "single_users": ["PROJECT_KEY", "User SOE ID"],
+    "security_groups": ["GROUP_NAME", "USER_NAME"],
+}
+
+
+def _partition_name(column, value):
+    return f"{column}={NULL_PARTITION if value is None else quote(str(value), safe='')}"
+
+
+def _decoded(column):
+    if pa.types.is_dictionary(column.type):
+        return pa.chunked_array([chunk.dictionary_decode() for chunk in column.chunks], column.type.value_type)
+    return column
+
+
+def _table_hash(table):
+    # Hash decoded values without schema metadata: a partition taken from a
+    # dictionary column keeps the whole dataset's dictionary, and the pandas
+    # metadata records the whole frame's index, so both change whenever any
+    # other partition does.
+    table = pa.table([_decoded(column) for column in table.columns], names=table.column_names)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return hashlib.sha256(sink.getvalue()).hexdigest()
+
+
+def sort_rows(dataset, table):
+    """Order a scoped slice by the dataset's ORDER_COLUMNS, then Region and
+    Template so ties across partitions are deterministic. Datasets missing
+    their key columns are ordered by all their columns instead."""
+    slice_columns = [column for column in SLICE_COLUMNS[dataset] if column]
+    keys = [column for column in ORDER_COLUMNS[dataset] if column in table.column_names]
+    if not keys:
+        keys = [column for column in table.column_names if column not in slice_columns]
+    keys += [column for column in slice_columns if column in table.column_names]
+    if not keys or table.num_rows < 2:
+        return table
+    # Arrow can't sort dictionary columns, so sort on their decoded values.
+    sort_table = pa.table([_decoded(table.column(column)) for column in keys], names=keys)
+    indices = pc.sort_indices(sort_table, sort_keys=[(column, "ascending") for column in keys])
+    return table.take(indices)
+
+
+def split_partitions(dataset, table):
+    """Yield (region, template, table) for each Region (and Template, where
+    the dataset has one) present in the table. Partitions hold only their own
+    rows, in source order."""
+    region_column, template_column = SLICE_COLUMNS[dataset]
+    keys = [region_column] + ([template_column] if template_column else [])
+    frame = table.select(keys).to_pandas()
+    for column in keys:
+        frame[column] = frame[column].astype("object")
+    groups = frame.groupby(keys, dropna=False, sort=True).indices
+    for key, indices in groups.items():
+        key = key if isinstance(key, tuple) else (key,)
+        region = None if key[0] != key[0] else key[0]        # NaN -> None
+        template = None
+        if template_column:
+            template = None if key[1] != key[1] else key[1]
+        yield region, template, table.take(pa.array(indices))
+
+
+def load_manifest(dataset, partition_dir=PARTITION_DIR):
+    path = os.path.join(partition_dir, dataset, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {"version": None, "partitions": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_manifest(dataset, manifest, partition_dir):
+    path = os.path.join(partition_dir, dataset, MANIFEST_FILE)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temp_path, path)
+
+
+def sync_partitions(dataset, table, version=None, partition_dir=PARTITION_DIR):
+    """Write the dataset as Region/Template Parquet partitions. Partitions
+    whose content hash is unchanged are left alone, so an update to one
+    region only rewrites that region's files. `version` is the dataset version the partitions are synced to. Returns
+    (written, removed)."""
+    region_column, template_column = SLICE_COLUMNS[dataset]
+    dataset_dir = os.path.join(partition_dir, dataset)
+    os.makedirs(dataset_dir, exist_ok=True)
+    manifest = load_manifest(dataset, partition_dir)
+    old_partitions = manifest["partitions"]
+    partitions = {}
+    written = 0
+
+    for region, template, part in split_partitions(dataset, table):
+        parts = [_partition_name(region_column, region)]
+        if template_column:
+            parts.append(_partition_name(template_column, template))
+        relative_path = os.path.join(*parts, "part.parquet")
+        digest = _table_hash(part)
+        partitions[relative_path] = {
+            "region": region,
+            "template": template,
+            "rows": part.num_rows,
+            "hash": digest,
+        }
+        previous = old_partitions.get(relative_path)
+        if previous and previous["hash"] == digest:
+            continue
+        path = os.path.join(dataset_dir, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        pq.write_table(part, temp_path)
+        os.replace(temp_path, path)
+        written += 1
+
+    removed = 0
+    for relative_path in set(old_partitions) - set(partitions):
+        shutil.rmtree(os.path.dirname(os.path.join(dataset_dir, relative_path)), ignore_errors=True)
+        removed += 1
+
+    _save_manifest(dataset, {"version": version, "partitions": partitions}, partition_dir)
+    return written, removed
+
+
+def sync_published(tables, dataset_versions, partition_dir=PARTITION_DIR):
+    """Sync the partitioned datasets among `tables` (name -> Table) after a
+    publish. Datasets whose partitions are already at their dataset version,
+    i.e. carried over unchanged, are skipped."""
+    results = {}
+    for dataset, table in tables.items():
+        if dataset not in SLICE_COLUMNS:
+            continue
+        if load_manifest(dataset, partition_dir)["version"] == dataset_versions[dataset]:
+            continue
+        results[dataset] = sync_partitions(dataset, table, dataset_versions[dataset], partition_dir)
+    return results
+
+
+def sync_from_snapshot(datasets=None, partition_dir=PARTITION_DIR):
+    version = snapshot_reader.current_version()
+    results = {}
+    for dataset in datasets or SLICE_COLUMNS:
+        results[dataset] = sync_partitions(dataset, snapshot_reader.table(dataset),
+                                           snapshot_reader.dataset_version(dataset), partition_dir)
+    return version, results
+
+
+class PartitionReader:
+    """Reads only the partitions a Region/Template scope needs. Partition
+    tables are cached by content hash, so unchanged partitions survive a
+    resync and switching back to a region is a memory lookup."""
+
+    def __init__(self, partition_dir=PARTITION_DIR, max_cached=MAX_CACHED_PARTITIONS):
+        self.partition_dir = partition_dir
+        self.max_cached = max_cached
+        self._tables = OrderedDict()
+        self._lock = threading.Lock()
+
+    def manifest(self, dataset):
+        return load_manifest(dataset, self.partition_dir)
+
+    def prune(self, manifest, region=None, template=None):
+        return [
+            (relative_path, entry) for relative_path, entry in sorted(manifest["partitions"].items())
+            if (region is None or entry["region"] == region)
+            and (template is None or entry["template"] == template)
+        ]
+
+    def _partition(self, dataset, relative_path, digest):
+        with self._lock:
+            if digest in self._tables:
+                self._tables.move_to_end(digest)
+                return self._tables[digest]
+        table = pq.read_table(os.path.join(self.partition_dir, dataset, relative_path))
+        with self._lock:
+            self._tables[digest] = table
+            while len(self._tables) > self.max_cached:
+                self._tables.popitem(last=False)
+        return table
+
+    def read(self, dataset, region=None, template=None, manifest=None):
+        manifest = manifest or self.manifest(dataset)
+        if SLICE_COLUMNS[dataset][1] is None:
+            template = None
+        tables = [
+            self._partition(dataset, relative_path, entry["hash"])
+            for relative_path, entry in self.prune(manifest, region, template)
+        ]
+        if not tables:
+            return None
+        table = tables[0] if len(tables) == 1 else pa.concat_tables(tables, promote_options="permissive")
+        return sort_rows(dataset, table)
+
+
+partition_reader = PartitionReader()
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    version, results = sync_from_snapshot(sys.argv[1:] or None)
+    for dataset, (written, removed) in results.items():
+        print(f"📦 {dataset}: {written} partitions written, {removed} removed")
+    print(f"✅ Partitions synced to snapshot {version} in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,248 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import re
+import sys
+import uuid
+from datetime import datetime, timezone
+
+import Filter
+import ModifiedFilter
+from sorting import ORDER_BY_OPTIONS
+
+# === CONFIGURATION START ===
+PLAN_AUDIT_FILE = os.getenv("PLAN_AUDIT_FILE", "plan_audit.json")
+COST_REGRESSION_RATIO = 1.5     # flag a variant whose estimated cost grows by this factor
+SAMPLE_TEXT = "PLAN-AUDIT"      # bind value for text filters (plans are built without bind peeking)
+SAMPLE_DATE = datetime(2024, 1, 1)
+# === CONFIGURATION END ===
+
+# Router name -> (SearchFilters class, builder(filters, order_by) -> (sql, params))
+ROUTERS = {
+    "modified": (ModifiedFilter.SearchFilters, ModifiedFilter.build_fetch_query),
+    "filter": (Filter.SearchFilters, lambda filters, order_by: Filter.build_page_query(filters, order_by, 0, 10)),
+}
+# Date bounds are toggled as a pair so each range counts as one filter.
+DATE_RANGES = {
+    "created": ("created_from", "created_to"),
+    "updated": ("updated_from", "updated_to"),
+}
+
+ORACLE_PLAN_QUERY = """
+    SELECT id, parent_id, depth, operation, options, object_name, cost, cardinality,
+           access_predicates, filter_predicates
+    FROM plan_table
+    WHERE statement_id = :statement_id
+    ORDER BY id
+"""
+
+
+# === VARIANTS ===
+
+def filter_toggles(filters_class):
+    date_fields = {name for pair in DATE_RANGES.values() for name in pair}
+    toggles = [name for name in filters_class.model_fields if name not in date_fields]
+    return toggles + list(DATE_RANGES)
+
+
+def iter_variants(routers=None, order_bys=(None,)):
+    """Yield (variant id, router, active filters, order_by, sql, params) for
+    every combination of filters each router can generate."""
+    for router in routers or ROUTERS:
+        filters_class, build = ROUTERS[router]
+        toggles = filter_toggles(filters_class)
+        for order_by in order_bys:
+            for size in range(len(toggles) + 1):
+                for active in itertools.combinations(toggles, size):
+                    values = {}
+                    for name in active:
+                        if name in DATE_RANGES:
+                            for field in DATE_RANGES[name]:
+                                values[field] = SAMPLE_DATE
+                        else:
+                            values[name] = SAMPLE_TEXT
+                    sql, params = build(filters_class(**values), order_by)
+                    variant_id = f"{router}:{'+'.join(active) or 'none'}:{order_by or 'default'}"
+                    yield variant_id, router, list(active), order_by, sql, params
+
+
+# === EXPLAIN ===
+
+def explain_oracle(conn, sql, params):
+    statement_id = f"audit-{uuid.uuid4().hex[:16]}"
+    cursor = conn.cursor()
+    cursor.execute(f"EXPLAIN PLAN SET STATEMENT_ID = '{statement_id}' FOR {sql}", params)
+    cursor.execute(ORACLE_PLAN_QUERY, {"statement_id": statement_id})
+    columns = [d[0].lower() for d in cursor.description]
+    steps = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    cursor.execute("DELETE FROM plan_table WHERE statement_id = :statement_id", {"statement_id": statement_id})
+    conn.commit()
+
+    plan = [
+        {
+            "id": step["id"],
+            "parent_id": step["parent_id"],
+            "step": " ".join(filter(None, (step["operation"], step["options"], step["object_name"]))),
+            "cost": step["cost"],
+            "cardinality": step["cardinality"],
+            "access": step["access_predicates"],
+            "filter": step["filter_predicates"],
+        }
+        for step in steps
+    ]
+    full_scans = [
+        s["step"] for s in plan
+        if s["step"].startswith("TABLE ACCESS FULL") or s["step"].startswith("INDEX FULL SCAN")
+        or s["step"].startswith("INDEX FAST FULL SCAN")
+    ]
+    cost = plan[0]["cost"] if plan else None
+    return plan, full_scans, cost
+
+
+_OFFSET_FETCH = re.compile(r"OFFSET\s+(\d+)\s+ROWS\s+FETCH\s+NEXT\s+(\d+)\s+ROWS\s+ONLY", re.I)
+_FETCH_FIRST = re.compile(r"FETCH\s+FIRST\s+(\d+)\s+ROWS\s+ONLY", re.I)
+
+
+def to_sqlite(sql):
+    # Row-limiting clauses are the only Oracle-only syntax the builders emit.
+    sql = _OFFSET_FETCH.sub(lambda m: f"LIMIT {m.group(2)} OFFSET {m.group(1)}", sql)
+    return _FETCH_FIRST.sub(lambda m: f"LIMIT {m.group(1)}", sql)
+
+
+def explain_sqlite(conn, sql, params):
+    cursor = conn.cursor()
+    cursor.execute(f"EXPLAIN QUERY PLAN {to_sqlite(sql)}", params)
+    plan = [
+        {"id": row[0], "parent_id": row[1], "step": row[3], "cost": None, "cardinality": None}
+        for row in cursor.fetchall()
+    ]
+    # "SCAN ji" is a full table scan; "SCAN ji USING INDEX ..." walks an index.
+    full_scans = [s["step"] for s in plan if s["step"].startswith("SCAN ") and " USING " not in s["step"]]
+    return plan, full_scans, None
+
+
+EXPLAINERS = {"oracle": explain_oracle, "sqlite": explain_sqlite}
+
+
+def plan_signature(plan):
+    # Shape only: costs and cardinalities move with statistics on every run.
+    shape = "\n".join(f"{s['parent_id']}|{s['step']}" for s in plan)
+    return hashlib.sha256(shape.encode("utf-8")).hexdigest()[:16]
+
+
+# === AUDIT ===
+
+def run_audit(conn, dialect, routers=None, order_bys=(None,)):
+    explain = EXPLAINERS[dialect]
+    variants = {}
+    for variant_id, router, active, order_by, sql, params in iter_variants(routers, order_bys):
+        try:
+            plan, full_scans, cost = explain(conn, sql, params)
+            error = None
+        except Exception as e:
+            plan, full_scans, cost, error = [], [], None, str(e)
+        variants[variant_id] = {
+            "router": router,
+            "filters": active,
+            "order_by": order_by,
+            "sql_hash": hashlib.sha256(sql.encode("utf-8")).hexdigest()[:16],
+            "cost": cost,
+            "full_scans": full_scans,
+            "signature": plan_signature(plan),
+            "plan": plan,
+            "error": error,
+        }
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "dialect": dialect,
+        "variants": variants,
+    }
+
+
+def compare(previous, current):
+    """Findings of the current run, judged against the previous one."""
+    findings = []
+    before = (previous or {}).get("variants", {})
+    for variant_id, record in current["variants"].items():
+        if record["error"]:
+            findings.append(("error", variant_id, record["error"]))
+            continue
+        old = before.get(variant_id)
+        new_scans = set(record["full_scans"]) - set(old["full_scans"]) if old else set()
+        if new_scans:
+            findings.append(("new_full_scan", variant_id, ", ".join(sorted(new_scans))))
+        elif record["full_scans"]:
+            findings.append(("full_scan", variant_id, ", ".join(record["full_scans"])))
+        if old is None:
+            continue
+        if old["signature"] != record["signature"]:
+            findings.append(("plan_changed", variant_id, f"{old['signature']} -> {record['signature']}"))
+        if old["cost"] and record["cost"] and record["cost"] >= old["cost"] * COST_REGRESSION_RATIO:
+            findings.append(("cost_regression", variant_id, f"{old['cost']} -> {record['cost']}"))
+    return findings
+
+
+# Findings that fail the run (exit status 1). Full scans that were already
+# there last time are reported but do not fail it.
+REGRESSIONS = ("error", "new_full_scan", "plan_changed", "cost_regression")
+
+
+def load_previous(path=PLAN_AUDIT_FILE):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_audit(audit, path=PLAN_AUDIT_FILE):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(audit, f, indent=2, default=str)
+    os.replace(temp_path, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Capture and compare query plans of every search SQL variant.")
+    parser.add_argument("--dialect", choices=sorted(EXPLAINERS), default=os.getenv("PLAN_AUDIT_DIALECT", "oracle"))
+    parser.add_argument("--sqlite", help="SQLite database to explain against instead of get_db_connection "
+                                         "(tests/fixtures/jira_schema.sql builds a minimal one)")
+    parser.add_argument("--router", choices=sorted(ROUTERS), action="append")
+    parser.add_argument("--all-orders", action="store_true", help="also audit every order_by option")
+    parser.add_argument("--output", default=PLAN_AUDIT_FILE)
+    args = parser.parse_args(argv)
+
+    order_bys = (None, *ORDER_BY_OPTIONS) if args.all_orders else (None,)
+    previous = load_previous(args.output)
+    if args.sqlite:
+        import sqlite3
+
+        conn = sqlite3.connect(args.sqlite)
+        try:
+            audit = run_audit(conn, "sqlite", args.router, order_bys)
+        finally:
+            conn.close()
+    else:
+        from connections import acquire_connection
+
+        with acquire_connection() as conn:
+            audit = run_audit(conn, args.dialect, args.router, order_bys)
+
+    findings = compare(previous, audit)
+    save_audit(audit, args.output)
+
+    print(f"📋 Explained {len(audit['variants'])} SQL variants ({audit['dialect']}), plans saved to {args.output}")
+    icons = {"error": "❌", "full_scan": "⚠️", "new_full_scan": "🚨", "plan_changed": "🔀", "cost_regression": "📈"}
+    for kind, variant_id, detail in findings:
+        print(f"{icons[kind]} {kind}: {variant_id}: {detail}")
+    regressions = [f for f in findings if f[0] in REGRESSIONS]
+    if regressions:
+        print(f"🚨 {len(regressions)} plan regressions since the previous run")
+        return 1
+    print("✅ No plan regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+import asyncio
+import contextvars
+import functools
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict, deque
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.routing import APIRoute
+
+# === CONFIGURATION START ===
+# Everything here is off unless SEARCH_PROFILING=1 is set, so the module is
+# safe to ship in production builds.
+PROFILING_ENABLED = os.getenv("SEARCH_PROFILING", "0") == "1"
+PROFILING_TOKEN = os.getenv("SEARCH_PROFILING_TOKEN", "")
+PROFILE_HEADER = "X-Profile"
+REQUEST_SAMPLE_INTERVAL = 0.005      # 200 Hz while a single request is profiled
+ROLLING_SAMPLE_INTERVAL = 0.1        # 10 Hz background sampler
+ROLLING_BUCKET_SECONDS = 60          # one bucket of stacks per minute
+ROLLING_BUCKETS = 15                 # keep the last 15 minutes
+MAX_STACK_DEPTH = 64
+MAX_STORED_PROFILES = 20
+# === CONFIGURATION END ===
+
+
+def _collapse(frame):
+    # Root-first "file:func;file:func" string, the collapsed-stack format
+    # understood by flamegraph.pl and speedscope.
+    parts = []
+    while frame is not None and len(parts) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{code.co_firstlineno}")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+def to_collapsed(stacks):
+    return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+
+
+def to_speedscope(stacks, name, interval):
+    frames = []
+    frame_index = {}
+    samples = []
+    weights = []
+    for stack, count in stacks.items():
+        sample = []
+        for part in stack.split(";"):
+            if part not in frame_index:
+                frame_index[part] = len(frames)
+                file_name, func, line = part.rsplit(":", 2)
+                frames.append({"name": func, "file": file_name, "line": int(line)})
+            sample.append(frame_index[part])
+        samples.append(sample)
+        weights.append(count * interval)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        }],
+        "name": name,
+        "exporter": "excelDataInReact profiling",
+    }
+
+
+class RequestSampler:
+    """Samples only the threads running one request: its event loop thread
+    while the request's own task is the one executing, and the threads it
+    hands work to (see `sampled`). Other requests running the same endpoint
+    at the same time are not sampled."""
+
+    def __init__(self, interval=REQUEST_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self._task = None               # (loop thread ident, loop, task)
+        self._workers = Counter()       # thread ident -> calls in progress
+        self._workers_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def add_worker(self, thread_id):
+        with self._workers_lock:
+            self._workers[thread_id] += 1
+
+    def remove_worker(self, thread_id):
+        with self._workers_lock:
+            self._workers[thread_id] -= 1
+            if self._workers[thread_id] <= 0:
+                del self._workers[thread_id]
+
+    def watch_current_task(self):
+        # Call from the request's task on its event loop.
+        self._task = (threading.get_ident(), asyncio.get_running_loop(), asyncio.current_task())
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            with self._workers_lock:
+                workers = set(self._workers)
+            frames = sys._current_frames()
+            if self._task is not None:
+                loop_thread, loop, task = self._task
+                # The loop thread interleaves every request on it; count it
+                # only while this request's task is the one running.
+                if loop_thread in frames and asyncio.current_task(loop) is task:
+                    workers.add(loop_thread)
+            for thread_id, frame in frames.items():
+                if thread_id != own and thread_id in workers:
+                    self.stacks[_collapse(frame)] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+class RollingSampler:
+    """Low-frequency sampler of every thread, kept as a ring of per-minute buckets."""
+
+    def __init__(self, interval=ROLLING_SAMPLE_INTERVAL):
+        self.interval = interval
+        self._buckets = deque(maxlen=ROLLING_BUCKETS)
+        self._bucket_start = 0.0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="rolling-profiler", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            time.sleep(self.interval)
+            now = time.monotonic()
+            with self._lock:
+                if not self._buckets or now - self._bucket_start >= ROLLING_BUCKET_SECONDS:
+                    self._buckets.append(Counter())
+                    self._bucket_start = now
+                bucket = self._buckets[-1]
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id != own:
+                        bucket[_collapse(frame)] += 1
+
+    def snapshot(self, minutes=ROLLING_BUCKETS):
+        with self._lock:
+            buckets = list(self._buckets)[-minutes:]
+        merged = Counter()
+        for bucket in buckets:
+            merged.update(bucket)
+        return merged
+
+
+rolling_sampler = RollingSampler()
+_active_sampler = contextvars.ContextVar("active_sampler", default=None)
+_request_profiles = OrderedDict()
+_request_profiles_lock = threading.Lock()
+
+if PROFILING_ENABLED:
+    rolling_sampler.start()
+
+
+def _authorized(token):
+    return PROFILING_ENABLED and bool(PROFILING_TOKEN) and token == PROFILING_TOKEN
+
+
+def _store_profile(path, stacks):
+    profile_id = uuid.uuid4().hex
+    with _request_profiles_lock:
+        _request_profiles[profile_id] = (path, stacks)
+        while len(_request_profiles) > MAX_STORED_PROFILES:
+            _request_profiles.popitem(last=False)
+    return profile_id
+
+
+def _run_sampled(sampler, func, args, kwargs):
+    thread_id = threading.get_ident()
+    sampler.add_worker(thread_id)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        sampler.remove_worker(thread_id)
+
+
+def sampled(func):
+    """Wrap blocking work that an endpoint runs on another thread (threadpool,
+    executor) so the profiler of the current request samples that thread too.
+    Call it in the request's context; without an active profile it returns
+    func unchanged."""
+    sampler = _active_sampler.get()
+    if sampler is None:
+        return func
+
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        return _run_sampled(sampler, func, args, kwargs)
+
+    return run
+
+
+def _sampled_endpoint(endpoint):
+    # FastAPI runs sync endpoints on its threadpool with a copy of the
+    # request's context, so the active sampler (if any) is visible there.
+    @functools.wraps(endpoint)
+    def run(*args, **kwargs):
+        sampler = _active_sampler.get()
+        if sampler is None:
+            return endpoint(*args, **kwargs)
+        return _run_sampled(sampler, endpoint, args, kwargs)
+
+    return run
+
+
+class ProfiledRoute(APIRoute):
+    """Route class that profiles a single request when it carries
+    `X-Profile: <token>`. Without the header the handler is untouched."""
+
+    def __init__(self, path, endpoint, **kwargs):
+        if not asyncio.iscoroutinefunction(endpoint):
+            endpoint = _sampled_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def profiled_handler(request: Request):
+            if not _authorized(request.headers.get(PROFILE_HEADER)):
+                return await handler(request)
+            with RequestSampler() as sampler:
+                sampler.watch_current_task()
+                token = _active_sampler.set(sampler)
+                try:
+                    response = await handler(request)
+                finally:
+                    _active_sampler.reset(token)
+            profile_id = _store_profile(request.url.path, sampler.stacks)
+            response.headers["X-Profile-Id"] = profile_id
+            return response
+
+        return profiled_handler
+
+
+# === ADMIN ENDPOINTS ===
+router = APIRouter(prefix="/admin/profile")
+
+
+def _render(stacks, name, interval, fmt):
+    if fmt == "collapsed":
+        return PlainTextResponse(to_collapsed(stacks))
+    return JSONResponse(content=to_speedscope(stacks, name, interval))
+
+
+@router.get("/rolling")
+def dump_rolling_profile(
+    minutes: int = Query(ROLLING_BUCKETS, gt=0, le=ROLLING_BUCKETS),
+    format: str = Query("speedscope", pattern="^(speedscope|collapsed)$"),
+    x_profile: str = Header(None),
+):
+    if not _authorized(x_profile):
+        raise HTTPException(status_code=404)
+    stacks = rolling_sampler.snapshot(minutes)
+    return _render(stacks, f"rolling-{minutes}m", ROLLING_SAMPLE_INTERVAL, format)
+
+
+@router.get("/requests/{profile_id}")
+def get_request_profile(
+    profile_id: str,
+    format: str = Query("speedscope", pattern="^(speedscope|collapsed)$"),
+    x_profile: str = Header(None),
+):
+    if not _authorized(x_profile):
+        raise HTTPException(status_code=404)
+    with _request_profiles_lock:
+        entry = _request_profiles.get(profile_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    path, stacks = entry
+    return _render(stacks, path, REQUEST_SAMPLE_INTERVAL, format)
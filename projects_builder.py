@@ -0,0 +1,157 @@
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from connections import acquire_connection
+from ingest import DATA_DIR, WORKBOOKS, load_dataset, type_frame
+from snapshot_store import SNAPSHOT_DIR, SnapshotReader, publish_update
+
+# === CONFIGURATION START ===
+STATE_FILE = os.getenv("PROJECTS_STATE_FILE", os.path.join(SNAPSHOT_DIR, "projects_state.parquet"))
+ACTIVE_WINDOW_DAYS = 180       # a project is active if an issue was updated this recently
+WATERMARK_OVERLAP = timedelta(minutes=5)  # re-read this much before the watermark (clock skew, late commits)
+# === CONFIGURATION END ===
+
+PROJECT_COLUMNS = ["Project Key", "Project Name", "Active Project Key", "Active Project Name",
+                   "Template Key", "Region", "Last Issue Updated", "Issue Count"]
+
+STATE_SCHEMA = pa.schema([
+    ("project_id", pa.int64()),
+    ("last_issue_updated", pa.timestamp("us")),
+    ("issue_count", pa.int64()),
+])
+
+PROJECTS_QUERY = """
+    SELECT p.id, p.pkey, p.pname, pc.cname
+    FROM project p
+    LEFT JOIN nodeassociation na ON na.source_node_id = p.id
+         AND na.source_node_entity = 'Project' AND na.association_type = 'ProjectCategory'
+    LEFT JOIN projectcategory pc ON pc.id = na.sink_node_id
+"""
+
+# One grouped aggregate for every project (full) or only the projects that
+# have an issue updated since the watermark (incremental). The inner query
+# is a range scan on the jiraissue(updated) index.
+ACTIVITY_QUERY = """
+    SELECT ji.project, MAX(ji.updated) AS last_issue_updated, COUNT(*) AS issue_count
+    FROM jiraissue ji
+    {where}
+    GROUP BY ji.project
+"""
+CHANGED_PROJECTS = "WHERE ji.project IN (SELECT DISTINCT c.project FROM jiraissue c WHERE c.updated >= :watermark)"
+
+
+def load_state(path=STATE_FILE):
+    if not os.path.exists(path):
+        return None, None
+    table = pq.read_table(path)
+    watermark = (table.schema.metadata or {}).get(b"watermark")
+    state = table.to_pandas().set_index("project_id")
+    return state, pd.Timestamp(watermark.decode("utf-8")) if watermark else None
+
+
+def save_state(state, watermark, path=STATE_FILE):
+    table = pa.Table.from_pandas(state.reset_index(), schema=STATE_SCHEMA, preserve_index=False)
+    if watermark is not None:
+        table = table.replace_schema_metadata({b"watermark": watermark.isoformat().encode("utf-8")})
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.tmp"
+    pq.write_table(table, temp_path)
+    os.replace(temp_path, path)
+
+
+def fetch_projects(conn):
+    cursor = conn.cursor()
+    cursor.execute(PROJECTS_QUERY)
+    projects = pd.DataFrame(cursor.fetchall(), columns=["project_id", "pkey", "pname", "category"])
+    return projects.drop_duplicates("project_id").set_index("project_id")
+
+
+def fetch_activity(conn, since=None):
+    cursor = conn.cursor()
+    if since is None:
+        cursor.execute(ACTIVITY_QUERY.format(where=""))
+    else:
+        cursor.execute(ACTIVITY_QUERY.format(where=CHANGED_PROJECTS),
+                       {"watermark": (since - WATERMARK_OVERLAP).to_pydatetime()})
+    activity = pd.DataFrame(cursor.fetchall(), columns=["project_id", "last_issue_updated", "issue_count"])
+    activity["last_issue_updated"] = pd.to_datetime(activity["last_issue_updated"])
+    activity["issue_count"] = activity["issue_count"].astype("int64")
+    return activity.set_index("project_id")
+
+
+def load_metadata(snapshot_dir=SNAPSHOT_DIR, data_dir=DATA_DIR):
+    """Template Key / Region per Project Key, taken from the published
+    projects dataset or, before the first publish, from projects.xlsx."""
+    columns = ["Project Key", "Template Key", "Region"]
+    frame = None
+    try:
+        frame = SnapshotReader(snapshot_dir).table("projects").select(columns).to_pandas()
+    except (OSError, KeyError, pa.ArrowInvalid):
+        workbook = os.path.join(data_dir, WORKBOOKS["projects"])
+        if os.path.exists(workbook):
+            frame = load_dataset("projects", workbook)[columns]
+    if frame is None:
+        return pd.DataFrame(columns=columns[1:])
+    # Blank cells count as missing so the category fallback still applies.
+    frame = frame.astype({"Template Key": "object", "Region": "object"}).replace("", None)
+    return frame.drop_duplicates("Project Key", keep="last").set_index("Project Key")
+
+
+def build_projects_frame(projects, state, metadata, now=None):
+    now = now or datetime.now()
+    frame = projects.join(state, how="left")
+    frame = frame.join(metadata, on="pkey", how="left")
+    active = frame["last_issue_updated"] >= pd.Timestamp(now - timedelta(days=ACTIVE_WINDOW_DAYS))
+    # Region falls back to the project category when no metadata row exists.
+    region = frame["Region"].where(frame["Region"].notna(), frame["category"])
+    out = pd.DataFrame({
+        "Project Key": frame["pkey"],
+        "Project Name": frame["pname"],
+        "Active Project Key": frame["pkey"].where(active, ""),
+        "Active Project Name": frame["pname"].where(active, ""),
+        "Template Key": frame["Template Key"].fillna(""),
+        "Region": region.fillna(""),
+        "Last Issue Updated": frame["last_issue_updated"],
+        "Issue Count": frame["issue_count"].fillna(0).astype("int64"),
+    })
+    out = out.sort_values("Project Key").reset_index(drop=True)
+    return type_frame("projects", out)[PROJECT_COLUMNS]
+
+
+def refresh(full=False, snapshot_dir=SNAPSHOT_DIR, state_path=STATE_FILE):
+    """Recompute the aggregates of projects touched since the last run and
+    publish a new projects dataset. Returns (snapshot version, changed count)."""
+    state, watermark = (None, None) if full else load_state(state_path)
+    with acquire_connection() as conn:
+        projects = fetch_projects(conn)
+        activity = fetch_activity(conn, watermark if state is not None else None)
+
+    if state is None or full:
+        state = activity
+    else:
+        state = pd.concat([state.drop(activity.index, errors="ignore"), activity])
+    # Deleted projects drop out of the state as well as the dataset.
+    state = state[state.index.isin(projects.index)]
+    if not activity.empty:
+        newest = activity["last_issue_updated"].max()
+        watermark = newest if watermark is None else max(watermark, newest)
+
+    frame = build_projects_frame(projects, state, load_metadata(snapshot_dir))
+    version = publish_update({"projects": frame}, snapshot_dir)
+    save_state(state, watermark, state_path)
+    return version, len(activity)
+
+
+if __name__ == "__main__":
+    full = "--full" in sys.argv[1:]
+    start = time.perf_counter()
+    version, changed = refresh(full=full)
+    mode = "full rebuild" if full else "incremental refresh"
+    print(f"✅ Projects dataset {mode}: {changed} projects recomputed, "
+          f"published snapshot {version} in {time.perf_counter() - start:.2f}s")
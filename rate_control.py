@@ -0,0 +1,192 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# === CONFIGURATION START ===
+INITIAL_RATE = 10.0          # requests/second per endpoint before the server tells us otherwise
+BURST = 10                   # token bucket capacity
+INITIAL_CONCURRENCY = 4
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 32
+DECREASE_FACTOR = 0.5        # multiplicative decrease on 429/503
+MAX_RETRIES = 8
+DEFAULT_BACKOFF_SECONDS = 2.0
+MAX_BACKOFF_SECONDS = 120.0
+THROTTLE_STATUSES = (429, 503)
+# === CONFIGURATION END ===
+
+
+def parse_retry_after(value):
+    # Retry-After is either delay-seconds or an HTTP date.
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def set_rate(self, rate, burst=None):
+        with self._lock:
+            self.rate = max(rate, 0.01)
+            if burst:
+                self.burst = burst
+                self._tokens = min(self._tokens, burst)
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AimdLimiter:
+    """Concurrency limit that grows by one per window of successes and is
+    cut multiplicatively whenever the server throttles us."""
+
+    def __init__(self, initial=INITIAL_CONCURRENCY):
+        self.limit = float(initial)
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, throttled):
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(MIN_CONCURRENCY, self.limit * DECREASE_FACTOR)
+            else:
+                self.limit = min(MAX_CONCURRENCY, self.limit + 1.0 / self.limit)
+            self._condition.notify_all()
+
+
+class EndpointController:
+    def __init__(self):
+        self.bucket = TokenBucket(INITIAL_RATE, BURST)
+        self.limiter = AimdLimiter()
+        self.cooldown_until = 0.0
+        self.backoff = DEFAULT_BACKOFF_SECONDS
+        self._lock = threading.Lock()
+
+    def wait_for_cooldown(self):
+        delay = self.cooldown_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def on_response(self, response):
+        headers = response.headers
+        throttled = response.status_code in THROTTLE_STATUSES
+        with self._lock:
+            # Jira Data Center advertises its token bucket with these headers.
+            fill_rate = headers.get("X-RateLimit-FillRate")
+            interval = headers.get("X-RateLimit-Interval-Seconds")
+            limit = headers.get("X-RateLimit-Limit")
+            if fill_rate and interval:
+                try:
+                    self.bucket.set_rate(float(fill_rate) / float(interval),
+                                         int(limit) if limit else None)
+                except ValueError:
+                    pass
+
+            delay = parse_retry_after(headers.get("Retry-After"))
+            if throttled:
+                if delay is None:
+                    delay = self.backoff
+                    self.backoff = min(self.backoff * 2, MAX_BACKOFF_SECONDS)
+            else:
+                self.backoff = DEFAULT_BACKOFF_SECONDS
+                if headers.get("X-RateLimit-Remaining") == "0" and delay is None:
+                    delay = 1.0 / self.bucket.rate
+            if delay:
+                self.cooldown_until = max(self.cooldown_until, time.monotonic() + delay)
+        return throttled
+
+
+class RateControlledSession:
+    """requests.Session wrapper that paces calls per endpoint path and
+    retries throttled responses instead of surfacing them as errors."""
+
+    def __init__(self, pool_size=MAX_CONCURRENCY, verify=True):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.verify = verify
+        self._endpoints = {}
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self.requests_sent = 0
+        self.succeeded = 0
+        self.throttled = 0
+
+    def _controller(self, url):
+        path = urlparse(url).path
+        with self._lock:
+            if path not in self._endpoints:
+                self._endpoints[path] = EndpointController()
+            return self._endpoints[path]
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("verify", self.verify)
+        controller = self._controller(url)
+        for _ in range(MAX_RETRIES + 1):
+            controller.wait_for_cooldown()
+            controller.bucket.acquire()
+            controller.limiter.acquire()
+            throttled = True
+            try:
+                response = self.session.get(url, **kwargs)
+                throttled = controller.on_response(response)
+            finally:
+                controller.limiter.release(throttled)
+            with self._lock:
+                self.requests_sent += 1
+                if throttled:
+                    self.throttled += 1
+                else:
+                    self.succeeded += 1
+            if not throttled:
+                return response
+        return response
+
+    def report(self):
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        with self._lock:
+            endpoints = {
+                path: {"rate": round(c.bucket.rate, 2), "concurrency": int(c.limiter.limit)}
+                for path, c in self._endpoints.items()
+            }
+            return {
+                "requests_sent": self.requests_sent,
+                "succeeded": self.succeeded,
+                "throttled": self.throttled,
+                "sustained_rate": round(self.succeeded / elapsed, 2),
+                "endpoints": endpoints,
+            }
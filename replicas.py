@@ -0,0 +1,263 @@
+import itertools
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from connections import acquire_connection
+
+# === CONFIGURATION START ===
+# Comma-separated DSNs of read replicas (e.g. Active Data Guard standbys).
+# With none configured every read goes to the primary via get_db_connection.
+REPLICA_DSNS = [dsn.strip() for dsn in os.getenv("JIRA_DB_REPLICAS", "").split(",") if dsn.strip()]
+REPLICA_USER = os.getenv("JIRA_DB_USER", "")
+REPLICA_PASSWORD = os.getenv("JIRA_DB_PASSWORD", "")
+REPLICA_POOL_SIZE = int(os.getenv("JIRA_DB_REPLICA_POOL_SIZE", "8"))
+REPLICA_SELECTION = os.getenv("JIRA_DB_REPLICA_SELECTION", "least_loaded")  # or "round_robin"
+MAX_REPLICA_LAG_SECONDS = float(os.getenv("JIRA_DB_MAX_REPLICA_LAG", "30"))
+HEALTH_CHECK_INTERVAL = 15       # seconds between lag/health probes
+EVICTION_SECONDS = 60            # how long a failing replica is skipped
+FAILURES_BEFORE_EVICTION = 3     # consecutive query failures that evict a replica
+LAG_QUERY = "SELECT value FROM v$dataguard_stats WHERE name = 'apply lag'"
+# === CONFIGURATION END ===
+
+# Driver errors caused by the query itself (bad SQL, bad binds), which the
+# primary would raise too. Any other error from a replica query counts
+# against the replica.
+CALLER_ERRORS = ("ProgrammingError", "IntegrityError", "DataError", "NotSupportedError")
+
+_LAG_PATTERN = re.compile(r"^\+?(\d+) (\d+):(\d+):(\d+(?:\.\d+)?)$")
+
+
+def parse_lag(value):
+    # Data Guard reports lag as an interval string, e.g. "+00 00:00:03".
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if hasattr(value, "total_seconds"):
+        return value.total_seconds()
+    match = _LAG_PATTERN.match(str(value).strip())
+    if not match:
+        return None
+    days, hours, minutes, seconds = match.groups()
+    return int(days) * 86400 + int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+class Replica:
+    def __init__(self, name, dsn=None, pool=None):
+        self.name = name
+        self.dsn = dsn
+        self._pool = pool
+        self.in_flight = 0
+        self.lag_seconds = None
+        self.consecutive_failures = 0
+        self.evicted_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            import oracledb
+
+            self._pool = oracledb.create_pool(user=REPLICA_USER, password=REPLICA_PASSWORD,
+                                              dsn=self.dsn, min=1, max=REPLICA_POOL_SIZE)
+        return self._pool
+
+    def eligible(self, now):
+        if now < self.evicted_until:
+            return False
+        return self.lag_seconds is None or self.lag_seconds <= MAX_REPLICA_LAG_SECONDS
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= FAILURES_BEFORE_EVICTION:
+                self.evicted_until = time.monotonic() + EVICTION_SECONDS
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+
+    def check(self):
+        try:
+            conn = self.pool.acquire()
+            try:
+                cursor = conn.cursor()
+                cursor.execute(LAG_QUERY)
+                row = cursor.fetchone()
+            finally:
+                self.pool.release(conn)
+            self.lag_seconds = parse_lag(row[0] if row else None)
+            self.consecutive_failures = 0
+            self.evicted_until = 0.0
+        except Exception:
+            # A replica that cannot answer the probe is taken out immediately.
+            self.evicted_until = time.monotonic() + EVICTION_SECONDS
+
+    def status(self):
+        return {
+            "name": self.name,
+            "in_flight": self.in_flight,
+            "lag_seconds": self.lag_seconds,
+            "evicted": time.monotonic() < self.evicted_until,
+            "eligible": self.eligible(time.monotonic()),
+        }
+
+
+def counts_against_replica(error):
+    return type(error).__name__ not in CALLER_ERRORS
+
+
+class TrackedCursor:
+    """Cursor proxy that reports failed driver calls to its connection."""
+
+    def __init__(self, cursor, conn):
+        object.__setattr__(self, "_cursor", cursor)
+        object.__setattr__(self, "_conn", conn)
+
+    def _call(self, method, *args, **kwargs):
+        try:
+            return getattr(self._cursor, method)(*args, **kwargs)
+        except Exception as e:
+            self._conn.record_error(e)
+            raise
+
+    def execute(self, *args, **kwargs):
+        return self._call("execute", *args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        return self._call("executemany", *args, **kwargs)
+
+    def fetchone(self):
+        return self._call("fetchone")
+
+    def fetchmany(self, *args, **kwargs):
+        return self._call("fetchmany", *args, **kwargs)
+
+    def fetchall(self):
+        return self._call("fetchall")
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._cursor, name, value)
+
+
+class TrackedConnection:
+    """Connection proxy handed out for a replica. Query failures are recorded
+    here even when the caller catches them (the routers turn errors into 500
+    responses), so a replica that accepts connections but fails queries is
+    still taken out of rotation."""
+
+    def __init__(self, conn):
+        object.__setattr__(self, "_conn", conn)
+        object.__setattr__(self, "failed", False)
+        object.__setattr__(self, "_cancelled", False)
+
+    def record_error(self, error):
+        # Errors after a cancel() are the cancellation itself.
+        if not self._cancelled and counts_against_replica(error):
+            object.__setattr__(self, "failed", True)
+
+    def cursor(self, *args, **kwargs):
+        return TrackedCursor(self._conn.cursor(*args, **kwargs), self)
+
+    def cancel(self):
+        object.__setattr__(self, "_cancelled", True)
+        return self._conn.cancel()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+
+class ReplicaRouter:
+    def __init__(self, replicas, selection=REPLICA_SELECTION):
+        self.replicas = list(replicas)
+        self.selection = selection
+        self._round_robin = itertools.count()
+        self._lock = threading.Lock()
+        self._checker = None
+
+    def start_health_checks(self):
+        if self._checker is None and self.replicas:
+            self._checker = threading.Thread(target=self._check_loop, name="replica-health", daemon=True)
+            self._checker.start()
+
+    def _check_loop(self):
+        while True:
+            for replica in self.replicas:
+                replica.check()
+            time.sleep(HEALTH_CHECK_INTERVAL)
+
+    def choose(self):
+        now = time.monotonic()
+        candidates = [replica for replica in self.replicas if replica.eligible(now)]
+        if not candidates:
+            return None
+        with self._lock:
+            if self.selection == "round_robin":
+                replica = candidates[next(self._round_robin) % len(candidates)]
+            else:
+                replica = min(candidates, key=lambda r: r.in_flight)
+            replica.in_flight += 1
+        return replica
+
+    def release(self, replica):
+        with self._lock:
+            replica.in_flight -= 1
+
+
+replica_router = ReplicaRouter(Replica(f"replica-{i}", dsn) for i, dsn in enumerate(REPLICA_DSNS))
+replica_router.start_health_checks()
+
+
+@contextmanager
+def acquire_read_connection():
+    """Connection for read-only search/count queries: a healthy replica that
+    is within the lag budget, otherwise the primary."""
+    replica = replica_router.choose()
+    if replica is None:
+        with acquire_connection() as conn:
+            yield conn
+        return
+
+    try:
+        conn = replica.pool.acquire()
+    except Exception:
+        replica_router.release(replica)
+        replica.record_failure()
+        with acquire_connection() as conn:
+            yield conn
+        return
+
+    tracked = TrackedConnection(conn)
+    try:
+        yield tracked
+    except Exception as e:
+        # Reached when the error propagates, e.g. through the FastAPI
+        # dependency; errors the caller handled were seen by the proxy.
+        if type(e).__name__ in ("OperationalError", "InterfaceError"):
+            tracked.record_error(e)
+        raise
+    finally:
+        replica.pool.release(conn)
+        replica_router.release(replica)
+        if tracked.failed:
+            replica.record_failure()
+        else:
+            replica.record_success()
+
+
+def get_read_connection():
+    # FastAPI dependency form of acquire_read_connection.
+    with acquire_read_connection() as conn:
+        yield conn
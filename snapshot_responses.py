@@ -0,0 +1,158 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import pyarrow.compute as pc
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+
+from partitioned_store import SLICE_COLUMNS, partition_reader, sort_rows
+from snapshot_store import snapshot_reader
+
+# === CONFIGURATION START ===
+CACHE_CONTROL = "public, max-age=0, must-revalidate"   # always revalidate, but 304s are cheap
+MAX_CACHED_SLICES = 256
+GZIP_LEVEL = 9            # compression runs once per slice and version, so favour ratio over speed
+BROTLI_QUALITY = 9
+ZSTD_LEVEL = 12
+# === CONFIGURATION END ===
+
+# Optional encoders: a missing package simply drops that encoding.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Server preference when the client accepts several encodings.
+ENCODING_PREFERENCE = ("zstd", "br", "gzip", "identity")
+ETAG_SUFFIXES = {"identity": "", "gzip": "-gz", "br": "-br", "zstd": "-zstd"}
+
+
+def slice_table(table, dataset, region=None, template=None):
+    region_column, template_column = SLICE_COLUMNS[dataset]
+    condition = None
+    if region:
+        condition = pc.field(region_column) == region
+    if template and template_column:
+        template_condition = pc.field(template_column) == template
+        condition = template_condition if condition is None else condition & template_condition
+    return table if condition is None else sort_rows(dataset, table.filter(condition))
+
+
+class EncodedSlice:
+    def __init__(self, body):
+        self.digest = hashlib.sha256(body).hexdigest()[:32]
+        self.bodies = {"identity": body, "gzip": gzip.compress(body, GZIP_LEVEL, mtime=0)}
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+        if zstandard is not None:
+            self.bodies["zstd"] = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+
+    def etag(self, encoding):
+        # Each encoding is a distinct representation, so each gets its own strong ETag.
+        return f'"{self.digest}{ETAG_SUFFIXES[encoding]}"'
+
+    def matches(self, if_none_match):
+        if if_none_match.strip() == "*":
+            return True
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return any(self.etag(encoding) in tags for encoding in self.bodies)
+
+
+def scoped_table(dataset, region=None, template=None):
+    if region or template:
+        # Partitions synced from this version of the dataset let a scoped
+        # slice read only its own Region/Template files instead of filtering
+        # the whole dataset.
+        manifest = partition_reader.manifest(dataset)
+        if manifest["version"] == snapshot_reader.dataset_version(dataset):
+            table = partition_reader.read(dataset, region, template, manifest)
+            return snapshot_reader.table(dataset).slice(0, 0) if table is None else table
+    return slice_table(snapshot_reader.table(dataset), dataset, region, template)
+
+
+_slices = OrderedDict()
+_slices_lock = threading.Lock()
+
+
+def get_slice(dataset, region=None, template=None):
+    version = snapshot_reader.current_version()
+    key = (version, dataset, region, template)
+    with _slices_lock:
+        if key in _slices:
+            _slices.move_to_end(key)
+            return version, _slices[key]
+
+    table = scoped_table(dataset, region, template)
+    body = table.to_pandas().to_json(orient="records", date_format="iso").encode("utf-8")
+    encoded = EncodedSlice(body)
+    with _slices_lock:
+        _slices[key] = encoded
+        while len(_slices) > MAX_CACHED_SLICES:
+            _slices.popitem(last=False)
+    return version, encoded
+
+
+def warm_slices(dataset):
+    # Pre-encode every region and region/template slice of the current snapshot.
+    region_column, template_column = SLICE_COLUMNS[dataset]
+    table = snapshot_reader.table(dataset)
+    get_slice(dataset)
+    for region in table[region_column].unique().to_pylist():
+        get_slice(dataset, region)
+        if template_column:
+            region_table = slice_table(table, dataset, region)
+            for template in region_table[template_column].unique().to_pylist():
+                get_slice(dataset, region, template)
+
+
+def negotiate(accept_encoding, available):
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.lower()] = quality
+    for encoding in ENCODING_PREFERENCE:
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return "identity"
+
+
+router = APIRouter(prefix="/snapshot")
+
+@router.get("/{dataset}")
+def get_snapshot_slice(
+    dataset: str,
+    region: Optional[str] = Query(None),
+    template: Optional[str] = Query(None),
+    accept_encoding: str = Header(None),
+    if_none_match: str = Header(None),
+):
+    if dataset not in SLICE_COLUMNS:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset {dataset}")
+
+    version, encoded = get_slice(dataset, region, template)
+    encoding = negotiate(accept_encoding, encoded.bodies)
+    headers = {
+        "ETag": encoded.etag(encoding),
+        "Cache-Control": CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+        "X-Snapshot-Version": version,
+    }
+    if if_none_match and encoded.matches(if_none_match):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=encoded.bodies[encoding], media_type="application/json", headers=headers)
@@ -0,0 +1,162 @@
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime, timezone
+
+import pyarrow as pa
+
+# === CONFIGURATION START ===
+SNAPSHOT_DIR = os.getenv("DASHBOARD_SNAPSHOT_DIR", "snapshots")
+KEEP_SNAPSHOTS = 3        # older versions are removed after a publish
+# === CONFIGURATION END ===
+
+CURRENT_LINK = "current"
+VERSION_PREFIX = "v-"
+
+
+def _write_table(path, table):
+    # Uncompressed IPC file format, so readers can memory-map it and use the
+    # buffers in place.
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+
+
+def publish_snapshot(datasets, snapshot_dir=SNAPSHOT_DIR, version=None, dataset_versions=None,
+                     partition_dir=None):
+    """Write every dataset (name -> DataFrame or pyarrow Table) into a new
+    version directory, then swap the `current` symlink to it in one rename.
+    Readers see either the old snapshot or the new one, never a mix.
+
+    Each dataset also records the version its content was first published
+    in; `dataset_versions` keeps that of datasets carried over unchanged, so
+    per-dataset caches and partitions survive publishes of other datasets."""
+    # Versions sort chronologically, which is what old-version cleanup relies on.
+    version = version or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f") + "-" + uuid.uuid4().hex[:8]
+    dataset_versions = {name: (dataset_versions or {}).get(name) or version for name in datasets}
+    os.makedirs(snapshot_dir, exist_ok=True)
+    version_dir = os.path.join(snapshot_dir, VERSION_PREFIX + version)
+    staging_dir = version_dir + ".tmp"
+    os.makedirs(staging_dir)
+
+    tables = {}
+    for name, data in datasets.items():
+        table = data if isinstance(data, pa.Table) else pa.Table.from_pandas(data, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[b"snapshot_version"] = version.encode("utf-8")
+        metadata[b"dataset_version"] = dataset_versions[name].encode("utf-8")
+        tables[name] = table.replace_schema_metadata(metadata)
+        _write_table(os.path.join(staging_dir, f"{name}.arrow"), tables[name])
+    os.rename(staging_dir, version_dir)
+
+    link = os.path.join(snapshot_dir, CURRENT_LINK)
+    temp_link = f"{link}.{uuid.uuid4().hex}"
+    os.symlink(os.path.basename(version_dir), temp_link)
+    os.replace(temp_link, link)
+
+    _remove_old_versions(snapshot_dir, os.path.basename(version_dir))
+    _sync_partitions(tables, dataset_versions, partition_dir)
+    return version
+
+
+def _sync_partitions(tables, dataset_versions, partition_dir):
+    # Until a dataset's partitions carry its new dataset version, scoped reads
+    # fall back to filtering the full table, so a failed sync only costs speed.
+    from partitioned_store import PARTITION_DIR, sync_published
+
+    try:
+        for dataset, (written, removed) in sync_published(tables, dataset_versions,
+                                                          partition_dir or PARTITION_DIR).items():
+            print(f"📦 {dataset}: {written} partitions written, {removed} removed")
+    except Exception as e:
+        print(f"⚠️ Partition sync failed, scoped reads will filter the full snapshot: {e}")
+
+
+def publish_update(datasets, snapshot_dir=SNAPSHOT_DIR, partition_dir=None):
+    """Publish a new version that replaces only the given datasets; every
+    other dataset is carried over from the current snapshot."""
+    merged = {}
+    dataset_versions = {}
+    if os.path.islink(os.path.join(snapshot_dir, CURRENT_LINK)):
+        reader = SnapshotReader(snapshot_dir)
+        current_dir = os.path.join(snapshot_dir, VERSION_PREFIX + reader.current_version())
+        for entry in sorted(os.listdir(current_dir)):
+            name, ext = os.path.splitext(entry)
+            if ext == ".arrow" and name not in datasets:
+                merged[name] = reader.table(name)
+                dataset_versions[name] = reader.dataset_version(name)
+    merged.update(datasets)
+    return publish_snapshot(merged, snapshot_dir, dataset_versions=dataset_versions,
+                            partition_dir=partition_dir)
+
+
+def _remove_old_versions(snapshot_dir, keep_current):
+    # Workers that still have an old file mapped keep their view; the data is
+    # only released once they remap.
+    versions = sorted(
+        entry for entry in os.listdir(snapshot_dir)
+        if entry.startswith(VERSION_PREFIX) and not entry.endswith(".tmp")
+    )
+    for entry in versions[:-KEEP_SNAPSHOTS]:
+        if entry != keep_current:
+            shutil.rmtree(os.path.join(snapshot_dir, entry), ignore_errors=True)
+
+
+class SnapshotReader:
+    """Per-process view of the current snapshot. Tables are memory-mapped
+    read-only, so every worker shares the same page-cache pages instead of
+    holding its own parsed copy."""
+
+    def __init__(self, snapshot_dir=SNAPSHOT_DIR):
+        self.snapshot_dir = snapshot_dir
+        self._version = None
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def current_version(self):
+        target = os.readlink(os.path.join(self.snapshot_dir, CURRENT_LINK))
+        return target[len(VERSION_PREFIX):]
+
+    def table(self, name):
+        version = self.current_version()
+        with self._lock:
+            if version != self._version:
+                self._tables = {}
+                self._version = version
+            if name not in self._tables:
+                path = os.path.join(self.snapshot_dir, VERSION_PREFIX + version, f"{name}.arrow")
+                source = pa.memory_map(path, "r")
+                self._tables[name] = pa.ipc.open_file(source).read_all()
+            return self._tables[name]
+
+    def dataset_version(self, name):
+        # Version the dataset's content was published in; snapshots written
+        # before datasets were versioned separately fall back to their own.
+        metadata = self.table(name).schema.metadata or {}
+        version = metadata.get(b"dataset_version") or metadata.get(b"snapshot_version")
+        return version.decode("utf-8") if version else self.current_version()
+
+    def frame(self, name):
+        # pandas conversion copies; prefer table() for large scans.
+        return self.table(name).to_pandas()
+
+    @property
+    def version(self):
+        return self._version or self.current_version()
+
+
+snapshot_reader = SnapshotReader()
+
+
+def publish_from_workbooks(data_dir=None, snapshot_dir=SNAPSHOT_DIR):
+    from ingest import DATA_DIR, load_all
+
+    return publish_snapshot(load_all(data_dir or DATA_DIR), snapshot_dir)
+
+
+if __name__ == "__main__":
+    version = publish_from_workbooks()
+    print(f"✅ Published dashboard snapshot {version} to {SNAPSHOT_DIR}")
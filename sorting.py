@@ -0,0 +1,34 @@
+# Sort options shared by the search routers.
+#
+# Indexed orders can be answered by walking a jiraissue index and stopping
+# after the requested page (Oracle's COUNT STOPKEY). That needs an index on
+# exactly the ORDER BY columns, tie-breaker included:
+#
+#     CREATE INDEX issue_updated_id ON jiraissue (updated, id);
+#     CREATE INDEX issue_created_id ON jiraissue (created, id);
+#
+# (Oracle walks them backwards for DESC.) Anything else has to sort every
+# matching row, so it is only offered as a bounded top-k.
+
+# name -> (ORDER BY clause, backed by an index)
+ORDER_BY_OPTIONS = {
+    "updated": ("ji.updated DESC, ji.id DESC", True),    # jiraissue(updated, id)
+    "created": ("ji.created DESC, ji.id DESC", True),    # jiraissue(created, id)
+    # Spans project and jiraissue, so no single index returns rows in order.
+    "issue_key": ("p.pkey, ji.issuenum", False),
+    "priority": ("pr.sequence, ji.id", False),
+}
+DEFAULT_ORDER_BY = "ji.id"
+ORDER_BY_PATTERN = "^(" + "|".join(ORDER_BY_OPTIONS) + ")$"
+
+TOP_K_LIMIT = 1000   # deepest row a non-indexed sort may reach
+
+
+def order_by_clause(order_by):
+    if not order_by:
+        return DEFAULT_ORDER_BY
+    return ORDER_BY_OPTIONS[order_by][0]
+
+
+def is_indexed(order_by):
+    return not order_by or ORDER_BY_OPTIONS[order_by][1]
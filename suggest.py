@@ -0,0 +1,239 @@
+import hashlib
+import heapq
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from fastapi import APIRouter, Query
+from fastapi.responses import JSONResponse
+
+from replicas import acquire_read_connection
+from snapshot_store import snapshot_reader
+
+# === CONFIGURATION START ===
+SUGGEST_LIMIT = 10
+MAX_SUGGEST_LIMIT = 50
+SNAPSHOT_REFRESH_SECONDS = 30    # snapshot-backed fields only rebuild when the version changes
+DB_REFRESH_SECONDS = int(os.getenv("SUGGEST_DB_REFRESH_SECONDS", "120"))  # change-marker poll
+CACHED_PREFIX_LENGTH = 2         # results for prefixes this short are memoised per index
+# === CONFIGURATION END ===
+
+# Cheap change markers for the database-backed fields: the GROUP BY scans
+# below only re-run when one of these moves. Both read an index, not the
+# table (MAX via a min/max scan of the updated index, COUNT via the primary
+# key). Any issue created, edited (status, type, assignee...) or deleted
+# changes the issue marker.
+ISSUE_CHANGE_MARKER = "SELECT COUNT(*), MAX(updated) FROM jiraissue"
+USER_CHANGE_MARKER = "SELECT COUNT(*), MAX(updated_date) FROM cwd_user"
+
+STATUS_COUNTS_QUERY = """
+    SELECT js.pname, COUNT(ji.id)
+    FROM issuestatus js
+    LEFT JOIN jiraissue ji ON ji.issuestatus = js.id
+    GROUP BY js.pname
+"""
+ISSUETYPE_COUNTS_QUERY = """
+    SELECT it.pname, COUNT(ji.id)
+    FROM issuetype it
+    LEFT JOIN jiraissue ji ON ji.issuetype = it.id
+    GROUP BY it.pname
+"""
+# Display names ranked by how many issues they hold in that role. The issue
+# counts are grouped first so cwd_user is joined once per user, not per issue.
+USER_COUNTS_QUERY = """
+    SELECT u.display_name, COALESCE(SUM(c.issue_count), 0)
+    FROM cwd_user u
+    LEFT JOIN (SELECT LOWER(ji.{role}) AS lower_user_name, COUNT(*) AS issue_count
+               FROM jiraissue ji
+               WHERE ji.{role} IS NOT NULL
+               GROUP BY LOWER(ji.{role})) c ON c.lower_user_name = u.lower_user_name
+    WHERE u.active = 1
+    GROUP BY u.display_name
+"""
+
+
+class PrefixIndex:
+    """Sorted-array prefix index. Every value is filed under its whole
+    (case-folded) text and under each later word, so "jo" finds both "John
+    Smith" and "Mary Jones"; a lookup is two bisects plus a top-N over the
+    matching slice."""
+
+    def __init__(self, counts):
+        self.counts = dict(counts)
+        self.values = sorted(self.counts, key=str.casefold)
+        entries = sorted(
+            (token, value)
+            for value in self.counts
+            for token in self._tokens(value)
+        )
+        self._keys = [token for token, _ in entries]
+        self._entries = [value for _, value in entries]
+        self._memo = {}
+        # The empty prefix matches everything; rank it once up front.
+        self._top = heapq.nlargest(MAX_SUGGEST_LIMIT, self.values, key=self.counts.__getitem__)
+
+    @staticmethod
+    def _tokens(value):
+        folded = value.casefold()
+        tokens = {folded}
+        words = folded.split()
+        for i in range(1, len(words)):
+            tokens.add(" ".join(words[i:]))
+        return tokens
+
+    def suggest(self, prefix, limit=SUGGEST_LIMIT):
+        prefix = prefix.casefold()
+        if not prefix:
+            return [{"value": value, "count": self.counts[value]} for value in self._top[:limit]]
+        memo_key = (prefix, limit)
+        if len(prefix) <= CACHED_PREFIX_LENGTH and memo_key in self._memo:
+            return self._memo[memo_key]
+        start = bisect_left(self._keys, prefix)
+        end = bisect_left(self._keys, prefix + "\U0010ffff", start)
+        # dict.fromkeys de-duplicates values found under several tokens while
+        # keeping key order, which breaks frequency ties alphabetically.
+        matches = dict.fromkeys(self._entries[start:end])
+        result = heapq.nlargest(limit, matches, key=self.counts.__getitem__)
+        result = [{"value": value, "count": self.counts[value]} for value in result]
+        if len(prefix) <= CACHED_PREFIX_LENGTH:
+            self._memo[memo_key] = result
+        return result
+
+
+# === SOURCES ===
+# Each source returns {value: frequency} for one field.
+
+def _snapshot_counts(dataset, column):
+    table = snapshot_reader.table(dataset)
+    if column not in table.column_names:
+        return {}
+    counts = table.column(column).value_counts()
+    return {
+        str(item["values"]): item["counts"]
+        for item in counts.to_pylist()
+        if item["values"] not in (None, "")
+    }
+
+
+def _db_counts(query):
+    with acquire_read_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query)
+        return {value: int(count) for value, count in cursor.fetchall() if value}
+
+
+def _db_marker(*queries):
+    with acquire_read_connection() as conn:
+        cursor = conn.cursor()
+        marker = []
+        for query in queries:
+            cursor.execute(query)
+            marker.append(tuple(cursor.fetchone()))
+        return tuple(marker)
+
+
+class SuggestField:
+    def __init__(self, name, load, refresh_seconds, version=None):
+        self.name = name
+        self.load = load
+        self.refresh_seconds = refresh_seconds
+        self.version = version          # cheap change marker; None means hash the loaded counts
+        self.index = None
+        self.fingerprint = None
+        self.refreshed_at = 0.0
+
+    def due(self, now):
+        return self.index is None or now - self.refreshed_at >= self.refresh_seconds
+
+    def refresh(self):
+        # Fields are rebuilt only when their source actually changed.
+        marker = self.version() if self.version else None
+        if marker is not None and marker == self.fingerprint and self.index is not None:
+            self.refreshed_at = time.monotonic()
+            return False
+        counts = self.load()
+        if marker is None:
+            marker = hashlib.sha256(repr(sorted(counts.items())).encode("utf-8")).hexdigest()
+        changed = marker != self.fingerprint or self.index is None
+        if changed:
+            self.index = PrefixIndex(counts)
+            self.fingerprint = marker
+        self.refreshed_at = time.monotonic()
+        return changed
+
+
+FIELDS = {
+    field.name: field for field in (
+        SuggestField("template", lambda: _snapshot_counts("projects", "Template Key"),
+                     SNAPSHOT_REFRESH_SECONDS, snapshot_reader.current_version),
+        SuggestField("region", lambda: _snapshot_counts("projects", "Region"),
+                     SNAPSHOT_REFRESH_SECONDS, snapshot_reader.current_version),
+        SuggestField("status", lambda: _db_counts(STATUS_COUNTS_QUERY), DB_REFRESH_SECONDS,
+                     lambda: _db_marker(ISSUE_CHANGE_MARKER)),
+        SuggestField("issuetype", lambda: _db_counts(ISSUETYPE_COUNTS_QUERY), DB_REFRESH_SECONDS,
+                     lambda: _db_marker(ISSUE_CHANGE_MARKER)),
+        SuggestField("assignee", lambda: _db_counts(USER_COUNTS_QUERY.format(role="assignee")),
+                     DB_REFRESH_SECONDS, lambda: _db_marker(ISSUE_CHANGE_MARKER, USER_CHANGE_MARKER)),
+        SuggestField("reporter", lambda: _db_counts(USER_COUNTS_QUERY.format(role="reporter")),
+                     DB_REFRESH_SECONDS, lambda: _db_marker(ISSUE_CHANGE_MARKER, USER_CHANGE_MARKER)),
+    )
+}
+FIELD_PATTERN = "^(" + "|".join(FIELDS) + ")$"
+
+_refresher = None
+_refresh_lock = threading.Lock()
+
+
+def _refresh_loop():
+    while True:
+        now = time.monotonic()
+        for field in FIELDS.values():
+            if field.due(now):
+                try:
+                    with _refresh_lock:
+                        field.refresh()
+                except Exception:
+                    pass    # keep serving the previous index
+        time.sleep(min(SNAPSHOT_REFRESH_SECONDS, DB_REFRESH_SECONDS))
+
+
+def get_index(name):
+    """Index for a field; built inline the first time, then kept current by a
+    background thread so requests only ever read."""
+    global _refresher
+    field = FIELDS[name]
+    if field.index is None:
+        with _refresh_lock:
+            if field.index is None:
+                field.refresh()
+    if _refresher is None:
+        _refresher = threading.Thread(target=_refresh_loop, name="suggest-refresh", daemon=True)
+        _refresher.start()
+    return field.index
+
+
+router = APIRouter(prefix="/suggest")
+
+@router.get("")
+def suggest(
+    field: str = Query(..., pattern=FIELD_PATTERN),
+    prefix: str = Query("", max_length=100),
+    limit: int = Query(SUGGEST_LIMIT, gt=0, le=MAX_SUGGEST_LIMIT),
+):
+    try:
+        return JSONResponse(content={
+            "field": field,
+            "prefix": prefix,
+            "suggestions": get_index(field).suggest(prefix, limit),
+        })
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+@router.get("/values")
+def distinct_values(field: str = Query(..., pattern=FIELD_PATTERN)):
+    # Sorted distinct values, e.g. for the template dropdown.
+    try:
+        return JSONResponse(content={"field": field, "values": get_index(field).values})
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
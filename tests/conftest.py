@@ -0,0 +1,167 @@
+import os
+import sqlite3
+import sys
+import types
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCHEMA = os.path.join(os.path.dirname(__file__), "fixtures", "jira_schema.sql")
+sys.path.insert(0, ROOT)
+
+# The `database` module (get_db_connection) is deployment-specific and not
+# part of this repo. Tests hand connections to the code under test directly.
+try:
+    import database  # noqa: F401
+except ImportError:
+    database = types.ModuleType("database")
+
+    def get_db_connection():
+        raise RuntimeError("no database configured for tests")
+
+    database.get_db_connection = get_db_connection
+    sys.modules["database"] = database
+
+
+ISSUE_COUNT = 200
+BASE_TIME = datetime(2026, 1, 1)
+
+
+def create_jira_db(path, issues=ISSUE_COUNT):
+    conn = sqlite3.connect(path)
+    with open(SCHEMA, encoding="utf-8") as f:
+        conn.executescript(f.read())
+    conn.executemany("INSERT INTO project VALUES (?, ?, ?, 1)",
+                     [(i, f"P{i}", f"Project {i}") for i in range(1, 6)])
+    conn.executemany("INSERT INTO issuetype VALUES (?, ?)", enumerate(["Bug", "Task", "Story"], 1))
+    conn.executemany("INSERT INTO issuestatus VALUES (?, ?, ?)",
+                     [(i, name, name) for i, name in enumerate(["Open", "In Progress", "Done"], 1)])
+    conn.executemany("INSERT INTO priority VALUES (?, ?, ?)",
+                     [(i, name, i) for i, name in enumerate(["High", "Medium", "Low"], 1)])
+    conn.executemany("INSERT INTO cwd_user VALUES (?, ?, ?, ?, ?, 1, 1, NULL)",
+                     [(i, f"user{i}", f"USER{i}", f"User {i}", f"user{i}@example.com") for i in range(1, 6)])
+    conn.executemany(
+        "INSERT INTO jiraissue VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL)",
+        [
+            (i, i, f"P{i % 5 + 1}-{i}", i % 5 + 1, i % 3 + 1, i % 3 + 1, i % 3 + 1,
+             f"user{i % 5 + 1}", f"USER{(i + 1) % 5 + 1}", f"Summary {i}", "",
+             BASE_TIME + timedelta(hours=i), BASE_TIME + timedelta(hours=3 * i))
+            for i in range(1, issues + 1)
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+
+def connect(path):
+    return sqlite3.connect(path, check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES)
+
+
+class OracleSyntaxCursor:
+    """Runs the routers' Oracle row-limiting clauses (OFFSET/FETCH) on SQLite."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, sql, params=None):
+        from plan_audit import to_sqlite
+
+        return self._cursor.execute(to_sqlite(sql), params or {})
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        if name == "_cursor":
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._cursor, name, value)
+
+
+class OracleSyntaxConnection:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self):
+        return OracleSyntaxCursor(self._conn.cursor())
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+@pytest.fixture
+def jira_db(tmp_path):
+    path = str(tmp_path / "jira.db")
+    create_jira_db(path)
+    return path
+
+
+@pytest.fixture
+def read_connection(jira_db):
+    """Stand-in for replicas.acquire_read_connection backed by jira_db."""
+
+    @contextmanager
+    def acquire():
+        conn = connect(jira_db)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    return acquire
+
+
+REGIONS = ["NAM", "EMEA", "APAC"]
+TEMPLATES = ["SCRUM", "KANBAN"]
+
+
+def snapshot_datasets(rows=60):
+    """Dashboard datasets shaped like ingest.load_all() output, with regions
+    and templates interleaved so partitions never hold contiguous rows."""
+    import pandas as pd
+
+    projects = pd.DataFrame({
+        "Project Key": [f"P{i}" for i in range(rows)],
+        "Active Project Key": [f"P{i}" if i % 4 else None for i in range(rows)],
+        "Region": pd.Categorical([REGIONS[i % 3] for i in range(rows)]),
+        "Template Key": pd.Categorical([TEMPLATES[(i // 3) % 2] for i in range(rows)]),
+        "Last Issue Updated": pd.date_range("2026-01-01", periods=rows, freq="D"),
+    })
+    single_users = pd.DataFrame({
+        "PROJECT_KEY": [f"P{i % 10}" for i in range(rows)],
+        "User SOE ID": [f"user{i}" for i in range(rows)],
+        "Region": pd.Categorical([REGIONS[(i * 7) % 3] for i in range(rows)]),
+        "TEMPLATE_KEY": pd.Categorical([TEMPLATES[i % 2] for i in range(rows)]),
+    })
+    security_groups = pd.DataFrame({
+        "GROUP_NAME": [f"group{i % 10}" for i in range(rows)],
+        "USER_NAME": [f"user{i}" for i in range(rows)],
+        "Region": pd.Categorical([REGIONS[(i * 5) % 3] for i in range(rows)]),
+    })
+    return {"projects": projects, "single_users": single_users, "security_groups": security_groups}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """A published snapshot (and its partitions) in tmp_path, wired into the
+    modules that read the process-wide snapshot. Returns (snapshot_dir,
+    partition_dir, reader)."""
+    from collections import OrderedDict
+
+    import bootstrap
+    import snapshot_responses
+    from partitioned_store import PartitionReader
+    from snapshot_store import SnapshotReader, publish_snapshot
+
+    snapshot_dir = str(tmp_path / "snapshots")
+    partition_dir = str(tmp_path / "partitions")
+    reader = SnapshotReader(snapshot_dir)
+    monkeypatch.setattr(snapshot_responses, "snapshot_reader", reader)
+    monkeypatch.setattr(snapshot_responses, "partition_reader", PartitionReader(partition_dir))
+    monkeypatch.setattr(snapshot_responses, "_slices", OrderedDict())
+    monkeypatch.setattr(bootstrap, "snapshot_reader", reader)
+    monkeypatch.setattr(bootstrap, "_payloads", OrderedDict())
+    publish_snapshot(snapshot_datasets(), snapshot_dir, partition_dir=partition_dir)
+    return snapshot_dir, partition_dir, reader
@@ -0,0 +1,20 @@
+-- Minimal slice of the Jira schema the search routers query, with the
+-- indexes the sort options and date-range filters rely on.
+CREATE TABLE project (id INTEGER PRIMARY KEY, pkey TEXT, pname TEXT, projectcategory INTEGER);
+CREATE TABLE issuetype (id INTEGER PRIMARY KEY, pname TEXT);
+CREATE TABLE issuestatus (id INTEGER PRIMARY KEY, name TEXT, pname TEXT);
+CREATE TABLE priority (id INTEGER PRIMARY KEY, pname TEXT, sequence INTEGER);
+CREATE TABLE cwd_user (
+    id INTEGER PRIMARY KEY, lower_user_name TEXT, user_name TEXT, display_name TEXT,
+    email_address TEXT, directory_id INTEGER, active INTEGER, updated_date TIMESTAMP
+);
+CREATE TABLE jiraissue (
+    id INTEGER PRIMARY KEY, issuenum INTEGER, pkey TEXT, project INTEGER, issuetype INTEGER,
+    issuestatus INTEGER, priority INTEGER, assignee TEXT, reporter TEXT, summary TEXT,
+    description TEXT, created TIMESTAMP, updated TIMESTAMP, resolutiondate TIMESTAMP
+);
+CREATE UNIQUE INDEX project_pkey ON project (pkey);
+CREATE INDEX cwd_user_lower_name ON cwd_user (lower_user_name);
+CREATE INDEX issue_project_num ON jiraissue (project, issuenum);
+CREATE INDEX issue_updated_id ON jiraissue (updated, id);
+CREATE INDEX issue_created_id ON jiraissue (created, id);
@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+import admission
+
+
+class FakeConnection:
+    def __init__(self):
+        self.call_timeout = 0
+
+
+class FakeRequest:
+    async def is_disconnected(self):
+        return False
+
+
+def test_run_cancellable_restores_call_timeout():
+    conn = FakeConnection()
+    seen = []
+
+    def work(conn, value):
+        seen.append(conn.call_timeout)
+        return value * 2
+
+    assert asyncio.run(admission.run_cancellable(FakeRequest(), conn, work, 21)) == 42
+    assert seen == [admission.STATEMENT_TIMEOUT_MS]
+    assert conn.call_timeout == 0
+
+
+def test_run_cancellable_restores_call_timeout_on_error():
+    conn = FakeConnection()
+    conn.call_timeout = 5000
+
+    def work(conn):
+        raise RuntimeError("ORA-03156: OCI call timed out")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(admission.run_cancellable(FakeRequest(), conn, work))
+    assert conn.call_timeout == 5000
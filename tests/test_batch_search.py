@@ -0,0 +1,85 @@
+from contextlib import contextmanager
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import batch_search
+from batch_search import SearchSpec, build_group_query, plan_batch
+from conftest import OracleSyntaxConnection
+
+
+@pytest.fixture
+def oracle_connection(monkeypatch, read_connection):
+    @contextmanager
+    def acquire():
+        with read_connection() as conn:
+            yield OracleSyntaxConnection(conn)
+
+    monkeypatch.setattr(batch_search, "acquire_read_connection", acquire)
+    return acquire
+
+
+def _spec(**kwargs):
+    page = kwargs.pop("page", 1)
+    page_size = kwargs.pop("page_size", 10)
+    order_by = kwargs.pop("order_by", None)
+    return SearchSpec(filters=kwargs, page=page, page_size=page_size, order_by=order_by)
+
+
+def test_plan_batch_groups_searches_differing_in_one_filter():
+    specs = list(enumerate([
+        _spec(status="Open"),
+        _spec(status="Done", page=2),
+        _spec(status="Open", order_by="priority"),      # another order: not merged
+        _spec(issuetype="Bug", reporter="User 2"),
+        _spec(issuetype="Task", reporter="User 2"),
+        _spec(issuetype="Story", reporter="User 3"),    # other shared filters
+        _spec(),                                         # nothing to group on
+    ]))
+    units = plan_batch(specs)
+
+    groups = sorted((field, [index for index, _ in members]) for kind, field, members in units if kind == "group")
+    singles = sorted(members[0][0] for kind, _, members in units if kind == "single")
+    assert groups == [("issuetype", [3, 4]), ("status", [0, 1])]
+    assert singles == [2, 5, 6]
+
+
+def test_group_query_pages_each_value_like_a_single_search(oracle_connection):
+    members = list(enumerate([
+        _spec(status="Open", page_size=7),
+        _spec(status="Open", page=3, page_size=7),
+        _spec(status="Done", page=2, page_size=7),
+        _spec(status="In Progress", page=11, page_size=7),   # past the last match
+    ]))
+    query, params = build_group_query("status", members)
+    assert "ROW_NUMBER() OVER (PARTITION BY js.pname" in query
+    assert sorted(value for name, value in params.items() if name.startswith("batch_value_")) == \
+        ["Done", "In Progress", "Open"]
+
+    grouped = batch_search._run_group("status", members)
+    for index, spec in members:
+        assert grouped[index] == batch_search._run_single(index, spec)[index]
+    assert len(grouped[0]) == 7 and grouped[3] == []
+
+
+@pytest.mark.parametrize("order_by", [None, "updated", "created", "priority", "issue_key"])
+def test_batch_endpoint_matches_single_searches(oracle_connection, order_by):
+    specs = [
+        _spec(status="Open", page=2, page_size=5, order_by=order_by),
+        _spec(status="Done", page_size=5, order_by=order_by),
+        _spec(issuetype="Bug", page=3, page_size=4, order_by=order_by),
+        _spec(issuetype="Story", page_size=4, order_by=order_by),
+        _spec(assignee="User 3", page_size=6, order_by=order_by),
+    ]
+    app = FastAPI()
+    app.include_router(batch_search.router)
+    body = {"searches": [spec.model_dump(mode="json") for spec in specs]}
+    response = TestClient(app).post("/search-issues/batch", json=body)
+    assert response.status_code == 200
+
+    entries = response.json()["results"]
+    for index, spec in enumerate(specs):
+        expected = batch_search._run_single(index, spec)[index]
+        assert expected, f"search {index} matched nothing"
+        assert entries[index]["results"] == expected
@@ -0,0 +1,29 @@
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import bootstrap
+import snapshot_responses
+from conftest import REGIONS
+
+
+def test_first_pages_match_snapshot_slices(store):
+    app = FastAPI()
+    app.include_router(bootstrap.router)
+    app.include_router(snapshot_responses.router)
+    client = TestClient(app)
+
+    for region in REGIONS:
+        payload = client.get("/bootstrap", params={"region": region}).json()
+        for part, dataset in (("single_users", "single_users"), ("security_users", "security_groups")):
+            rows = client.get(f"/snapshot/{dataset}", params={"region": region}).json()
+            assert payload[part]["total"] == len(rows)
+            assert payload[part]["results"] == rows[:bootstrap.BOOTSTRAP_PAGE_SIZE]
+
+
+def test_template_keys_cover_every_region(store):
+    _, _, reader = store
+    payload = json.loads(bootstrap.get_payload("NAM")[1].bodies["identity"])
+    assert payload["version"] == reader.current_version()
+    assert payload["template_keys"] == ["KANBAN", "SCRUM"]
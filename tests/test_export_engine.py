@@ -0,0 +1,152 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+
+import export_engine
+from ModifiedFilter import SearchFilters
+
+
+def _export_threads():
+    return [t for t in threading.enumerate() if t.name.startswith("export") and t.is_alive()]
+
+
+def _wait_for_workers(timeout=5):
+    deadline = time.monotonic() + timeout
+    while _export_threads() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return _export_threads()
+
+
+@pytest.fixture
+def small_batches(monkeypatch, read_connection):
+    monkeypatch.setattr(export_engine, "acquire_read_connection", read_connection)
+    monkeypatch.setattr(export_engine, "FETCH_BATCH_SIZE", 5)
+    monkeypatch.setattr(export_engine, "QUEUED_BATCHES_PER_PARTITION", 1)
+    monkeypatch.setattr(export_engine, "PUT_POLL_SECONDS", 0.05)
+
+
+def test_export_matches_sequential_order(small_batches):
+    issues = [issue for batch in export_engine.iter_export(SearchFilters(), parallelism=3) for issue in batch]
+    assert [issue["issuenum"] for issue in issues] == list(range(1, 201))
+
+
+def test_closing_mid_stream_releases_workers(small_batches):
+    batches = export_engine.iter_export(SearchFilters(), parallelism=2)
+    assert next(batches)
+
+    closer = threading.Thread(target=batches.close)
+    closer.start()
+    closer.join(timeout=5)
+    assert not closer.is_alive(), "closing the export blocked on a worker"
+    assert _wait_for_workers() == []
+
+
+def test_worker_error_is_raised_and_workers_stop(small_batches, read_connection, monkeypatch):
+    class FailingCursor:
+        def __init__(self, cursor):
+            self._cursor = cursor
+
+        def execute(self, sql, params=None):
+            if ":part_low" in sql and params["part_low"] > 1:
+                raise RuntimeError("ORA-01555: snapshot too old")
+            return self._cursor.execute(sql, params or {})
+
+        def __getattr__(self, name):
+            return getattr(self._cursor, name)
+
+    class FailingConnection:
+        def __init__(self, conn):
+            self._conn = conn
+
+        def cursor(self):
+            return FailingCursor(self._conn.cursor())
+
+    @contextmanager
+    def acquire():
+        with read_connection() as conn:
+            yield FailingConnection(conn)
+
+    monkeypatch.setattr(export_engine, "acquire_read_connection", acquire)
+    with pytest.raises(RuntimeError, match="ORA-01555"):
+        for _ in export_engine.iter_export(SearchFilters(), parallelism=2):
+            pass
+    assert _wait_for_workers() == []
+
+
+def test_project_partitions_cap_in_list(read_connection, monkeypatch):
+    monkeypatch.setattr(export_engine, "MAX_IN_LIST_BINDS", 2)
+    with read_connection() as conn:
+        plans = export_engine.plan_partitions(conn, SearchFilters(), 1, partition_by="project")
+    assert all(len(binds) <= 2 for _, binds, _ in plans)
+    assert sorted(pid for _, binds, _ in plans for pid in binds.values()) == [1, 2, 3, 4, 5]
+
+
+def _wait_for_release(timeout=5):
+    deadline = time.monotonic() + timeout
+    while export_engine.export_connections.in_use and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return export_engine.export_connections.in_use
+
+
+def test_exports_share_a_connection_budget(small_batches, read_connection, monkeypatch):
+    monkeypatch.setattr(export_engine, "export_connections", export_engine.ConnectionBudget(3))
+    open_connections = []
+    peak = []
+    lock = threading.Lock()
+
+    @contextmanager
+    def counting():
+        with lock:
+            open_connections.append(1)
+            peak.append(len(open_connections))
+        try:
+            with read_connection() as conn:
+                yield conn
+        finally:
+            with lock:
+                open_connections.pop()
+
+    monkeypatch.setattr(export_engine, "acquire_read_connection", counting)
+    results = []
+
+    def export():
+        batches = export_engine.iter_export(SearchFilters(), parallelism=3)
+        results.append([issue["issuenum"] for batch in batches for issue in batch])
+
+    threads = [threading.Thread(target=export) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert results == [list(range(1, 201))] * 3
+    assert max(peak) <= 3
+    assert _wait_for_release() == 0
+
+
+def test_closed_export_returns_its_connections(small_batches):
+    batches = export_engine.iter_export(SearchFilters(), parallelism=2)
+    assert next(batches)
+    assert export_engine.export_connections.in_use == 2
+    batches.close()
+    assert _wait_for_workers() == []
+    assert _wait_for_release() == 0
+
+
+def test_export_is_shed_when_no_connection_is_free(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    budget = export_engine.ConnectionBudget(1)
+    budget.reserve(1)
+    monkeypatch.setattr(export_engine, "export_connections", budget)
+    app = FastAPI()
+    app.include_router(export_engine.router)
+
+    response = TestClient(app).post("/export-issues", json={})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == str(export_engine.RETRY_AFTER_SECONDS)
+    with pytest.raises(export_engine.ExportsBusy):
+        budget.reserve(1, timeout=0.05)
@@ -0,0 +1,65 @@
+import csv
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import export_engine
+import export_jobs
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch, read_connection):
+    monkeypatch.setattr(export_engine, "acquire_read_connection", read_connection)
+    monkeypatch.setattr(export_jobs, "acquire_read_connection", read_connection)
+    monkeypatch.setattr(export_jobs, "EXPORT_DIR", str(tmp_path))
+    app = FastAPI()
+    app.include_router(export_jobs.router)
+    return TestClient(app)
+
+
+def _wait_until_finished(client, job_id):
+    deadline = time.monotonic() + 10
+    while (progress := client.get(f"/export-jobs/{job_id}").json())["status"] in ("queued", "running"):
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    return progress
+
+
+def test_export_job_with_date_range(client):
+    body = {"filters": {"updated_from": "2026-01-10T00:00:00", "updated_to": "2026-01-20T00:00:00"},
+            "format": "csv"}
+    response = client.post("/export-jobs", json=body)
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    # The same request maps to the same job.
+    assert client.post("/export-jobs", json=body).json()["job_id"] == job_id
+
+    progress = _wait_until_finished(client, job_id)
+    assert progress["status"] == "done", progress["error"]
+
+    download = client.get(f"/export-jobs/{job_id}/download")
+    rows = list(csv.DictReader(download.text.splitlines()))
+    # updated = 2026-01-01 + 3h * id, so ids 72..151 fall in [Jan 10, Jan 20).
+    assert [int(row["issuenum"]) for row in rows] == list(range(72, 152))
+    assert progress["total_rows"] == len(rows)
+
+
+def test_finished_job_is_reused_only_while_fresh(client, monkeypatch):
+    body = {"filters": {"project_key": "P2"}, "format": "csv"}
+    job_id = client.post("/export-jobs", json=body).json()["job_id"]
+    progress = _wait_until_finished(client, job_id)
+    assert progress["status"] == "done" and progress["finished_at"]
+
+    assert client.post("/export-jobs", json=body).json()["job_id"] == job_id
+    forced = client.post("/export-jobs", json={**body, "force": True}).json()["job_id"]
+    assert forced != job_id
+    assert _wait_until_finished(client, forced)["status"] == "done"
+
+    monkeypatch.setattr(export_jobs, "REUSE_FINISHED_SECONDS", 0)
+    rerun = client.post("/export-jobs", json=body).json()["job_id"]
+    assert rerun not in (job_id, forced)
+    assert _wait_until_finished(client, rerun)["status"] == "done"
+    # Older runs stay downloadable until they expire.
+    assert client.get(f"/export-jobs/{job_id}/download").status_code == 200
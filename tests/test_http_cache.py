@@ -0,0 +1,41 @@
+import requests
+
+from http_cache import HttpCache
+
+
+def _response(url, body):
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = body
+    return response
+
+
+def test_hits_are_persisted(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = HttpCache(path)
+    cache.store("a", _response("https://jira/a", b"a"))
+    cache._db.execute("UPDATE responses SET accessed_at = 1")
+    cache._db.commit()
+
+    assert cache.lookup("a")
+    cache.close()
+
+    reopened = HttpCache(path)
+    assert reopened._db.execute("SELECT accessed_at FROM responses WHERE key = 'a'").fetchone()[0] > 1
+    reopened.close()
+
+
+def test_eviction_keeps_recently_hit_entries(tmp_path):
+    cache = HttpCache(str(tmp_path / "cache.sqlite"), max_bytes=20)
+    cache.store("old-but-hot", _response("https://jira/hot", b"x" * 10))
+    cache.store("cold", _response("https://jira/cold", b"y" * 10))
+    cache._db.execute("UPDATE responses SET accessed_at = CASE key WHEN 'old-but-hot' THEN 1 ELSE 2 END")
+    cache._db.commit()
+
+    assert cache.lookup("old-but-hot")
+    cache.store("new", _response("https://jira/new", b"z" * 10))
+
+    keys = {row[0] for row in cache._db.execute("SELECT key FROM responses")}
+    assert keys == {"old-but-hot", "new"}
+    cache.close()
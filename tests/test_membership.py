@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+import membership
+from membership import MembershipClosure, save_closure
+from snapshot_store import SnapshotReader, publish_update
+
+
+def _publish(snapshot_dir, partition_dir, closure, cache_path):
+    # What a sync does: save the closure cache, then publish security_groups.
+    save_closure(closure, cache_path)
+    frame = pd.DataFrame({"GROUP_NAME": sorted(closure.group_users), "Region": "NAM"})
+    publish_update({"security_groups": frame}, snapshot_dir, partition_dir=partition_dir)
+
+
+@pytest.fixture
+def synced(tmp_path, monkeypatch):
+    snapshot_dir = str(tmp_path / "snapshots")
+    partition_dir = str(tmp_path / "partitions")
+    cache_path = str(tmp_path / "closure.pickle")
+    monkeypatch.setattr(membership, "snapshot_reader", SnapshotReader(snapshot_dir))
+    monkeypatch.setattr(membership, "CLOSURE_CACHE_FILE", cache_path)
+    monkeypatch.setattr(membership, "_closure", None)
+    monkeypatch.setattr(membership, "_closure_version", None)
+    return lambda closure: _publish(snapshot_dir, partition_dir, closure, cache_path)
+
+
+def test_closure_resolves_nested_groups():
+    closure = MembershipClosure().rebuild({
+        ("GROUP_USER", "devs", "alice"),
+        ("GROUP_GROUP", "staff", "devs"),
+        ("GROUP_USER", "staff", "bob"),
+    })
+    assert closure.users_in("Staff") == {"alice", "bob"}
+    assert closure.groups_of("alice") == {"devs", "staff"}
+
+
+def test_web_process_sees_a_later_sync(synced):
+    closure = MembershipClosure().rebuild({("GROUP_USER", "devs", "alice")})
+    synced(closure)
+    assert membership.get_closure().users_in("devs") == {"alice"}
+
+    closure.apply(added={("GROUP_USER", "devs", "bob")})
+    synced(closure)
+    assert membership.get_closure().users_in("devs") == {"alice", "bob"}
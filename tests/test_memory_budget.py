@@ -0,0 +1,63 @@
+import time
+import tracemalloc
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import memory_budget
+
+TOKEN = "memory-token"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(memory_budget, "MEMORY_ADMIN_TOKEN", TOKEN)
+    monkeypatch.setattr(memory_budget, "MEMORY_TRACING", False)
+    app = FastAPI()
+    app.include_router(memory_budget.router)
+    yield TestClient(app)
+    memory_budget.stop_trace_window()
+
+
+def test_admin_endpoints_require_token(client):
+    assert client.get("/admin/memory/metrics").status_code == 404
+    assert client.get("/admin/memory/snapshot").status_code == 404
+    assert not tracemalloc.is_tracing()
+
+    response = client.get("/admin/memory/metrics", headers={"X-Memory-Token": TOKEN})
+    assert response.status_code == 200
+    assert "process_resident_memory_bytes" in response.text
+
+
+def test_snapshot_traces_only_for_a_bounded_window(client, monkeypatch):
+    monkeypatch.setattr(memory_budget, "TRACE_WINDOW_SECONDS", 0.5)
+    headers = {"X-Memory-Token": TOKEN}
+
+    assert client.get("/admin/memory/snapshot", headers=headers).status_code == 202
+    assert tracemalloc.is_tracing()
+    response = client.get("/admin/memory/snapshot", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["top"]
+
+    deadline = time.monotonic() + 5
+    while tracemalloc.is_tracing() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not tracemalloc.is_tracing()
+
+
+def test_track_leaves_the_process_peak_to_the_gauge(client, monkeypatch):
+    monkeypatch.setattr(tracemalloc, "reset_peak", lambda: pytest.fail("track() reset the process peak"))
+    memory_budget.start_trace_window()
+
+    with memory_budget.track("test.big") as budget:
+        budget.charge([("x" * 100,)])
+        block = bytearray(8 * 1024 * 1024)
+        del block
+    with memory_budget.track("test.small"):
+        pass
+
+    response = client.get("/admin/memory/metrics", headers={"X-Memory-Token": TOKEN})
+    gauges = dict(line.split() for line in response.text.splitlines() if line.startswith("tracemalloc_"))
+    assert int(gauges["tracemalloc_traced_peak_bytes"]) >= 8 * 1024 * 1024
+    assert 'search_request_result_bytes_count{route="test.big"} 1' in response.text
@@ -0,0 +1,41 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import ModifiedFilter
+from conftest import OracleSyntaxConnection, connect
+from replicas import get_read_connection
+
+
+def _client(jira_db):
+    def read_connection():
+        conn = connect(jira_db)
+        try:
+            yield OracleSyntaxConnection(conn)
+        finally:
+            conn.close()
+
+    app = FastAPI()
+    app.include_router(ModifiedFilter.router)
+    app.dependency_overrides[get_read_connection] = read_connection
+    return TestClient(app)
+
+
+def test_unindexed_sort_rejects_results_past_the_top_k_limit(jira_db, monkeypatch):
+    monkeypatch.setattr(ModifiedFilter, "TOP_K_LIMIT", 50)
+    client = _client(jira_db)
+
+    # 200 matches: returning the first 50 would look like the whole result.
+    response = client.post("/search-issues", json={}, params={"order_by": "issue_key"})
+    assert response.status_code == 400
+    assert "limited to the first 50 results" in response.json()["error"]
+
+    response = client.post("/search-issues", json={"project_key": "P1"}, params={"order_by": "priority"})
+    assert response.status_code == 200
+    assert len(response.json()) == 40
+
+
+def test_indexed_sort_is_not_capped(jira_db, monkeypatch):
+    monkeypatch.setattr(ModifiedFilter, "TOP_K_LIMIT", 50)
+    response = _client(jira_db).post("/search-issues", json={}, params={"order_by": "updated"})
+    assert response.status_code == 200
+    assert len(response.json()) == 200
@@ -0,0 +1,108 @@
+import json
+import queue
+
+import requests
+from openpyxl import load_workbook
+
+import newfile
+
+HOSTED = {"NAM": {"P1": 3, "P4": 1}, "APAC": {"P2": 5, "P3": 7}}
+
+
+class FakeClient:
+    failing = frozenset()      # project keys answered with a 500
+
+    def __init__(self, name):
+        self.name = name
+        self.requested = []
+
+    def get(self, url, headers=None):
+        project_key = url.split("project=")[1].split("&")[0]
+        self.requested.append(project_key)
+        response = requests.Response()
+        response.url = url
+        if project_key in self.failing:
+            response.status_code = 500
+        elif project_key in HOSTED[self.name]:
+            response.status_code = 200
+            response._content = json.dumps({"total": HOSTED[self.name][project_key]}).encode()
+        else:
+            response.status_code = 400
+            response._content = b'{"errorMessages": ["The value does not exist for the field project."]}'
+        return response
+
+
+def _instances():
+    instances = [
+        newfile.JiraInstance("NAM", "https://nam", "token", max_workers=2, regions=["NA"]),
+        newfile.JiraInstance("APAC", "https://apac", "token", max_workers=2),
+    ]
+    for instance in instances:
+        instance.client = FakeClient(instance.name)
+    return instances
+
+
+def _run(instances, completed=frozenset()):
+    routes = newfile.instance_routes(instances)
+    results = queue.Queue()
+    for instance in instances:
+        newfile.count_instance(instance, routes, completed, results)
+    newfile.count_unrouted(instances, routes, completed, results)
+    items = []
+    while not results.empty():
+        item = results.get()
+        if item is not newfile._INSTANCE_DONE:
+            items.append(item)
+    return items
+
+
+def test_rows_are_routed_by_instance_region_or_lookup(tmp_path, monkeypatch):
+    path = tmp_path / "projects.csv"
+    path.write_text("project_key,instance,Region\nP1,NAM,\nP2,,APAC\nP4,,NA\nP3,,\nP9,,\n", encoding="utf-8")
+    monkeypatch.setattr(newfile, "EXCEL_INPUT_FILE", str(path))
+    instances = _instances()
+
+    assert sorted(_run(instances)) == [
+        ("", "P9", newfile.NOT_FOUND),
+        ("APAC", "P2", 5),
+        ("APAC", "P3", 7),
+        ("NAM", "P1", 3),
+        ("NAM", "P4", 1),
+    ]
+    # Routed keys go to one instance; unrouted ones stop at the first host.
+    assert sorted(instances[0].client.requested) == ["P1", "P3", "P4", "P9"]
+    assert sorted(instances[1].client.requested) == ["P2", "P3", "P9"]
+
+
+def test_unrouted_keys_counted_earlier_are_skipped(tmp_path, monkeypatch):
+    path = tmp_path / "projects.csv"
+    path.write_text("project_key\nP1\nP3\n", encoding="utf-8")
+    monkeypatch.setattr(newfile, "EXCEL_INPUT_FILE", str(path))
+
+    assert _run(_instances(), frozenset({("APAC", "P3")})) == [("NAM", "P1", 3)]
+
+
+def test_rerun_replaces_unrouted_error_with_success(tmp_path, monkeypatch):
+    path = tmp_path / "projects.csv"
+    path.write_text("project_key\nP1\nP3\n", encoding="utf-8")
+    monkeypatch.setattr(newfile, "EXCEL_INPUT_FILE", str(path))
+    log_path = str(tmp_path / "progress.csv")
+
+    monkeypatch.setattr(FakeClient, "failing", frozenset({"P3"}))
+    log = newfile.ProgressLog(log_path)
+    for item in _run(_instances()):
+        log.append(*item)
+    log.close()
+    assert newfile.load_completed_keys(log_path) == {("NAM", "P1")}
+
+    monkeypatch.setattr(FakeClient, "failing", frozenset())
+    log = newfile.ProgressLog(log_path)
+    for item in _run(_instances(), frozenset(newfile.load_completed_keys(log_path))):
+        log.append(*item)
+    log.close()
+
+    output_path = str(tmp_path / "counts.xlsx")
+    newfile.write_output(log_path, output_path)
+    rows = list(load_workbook(output_path).worksheets[0].iter_rows(values_only=True))
+    assert rows[0] == tuple(newfile.LOG_COLUMNS)
+    assert sorted(rows[1:]) == [("APAC", "P3", 7), ("NAM", "P1", 3)]
@@ -0,0 +1,123 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import Filter
+from conftest import OracleSyntaxConnection, OracleSyntaxCursor, connect
+from page_cache import PageWindowCache
+from replicas import get_read_connection
+
+
+class Rows:
+    """fetch(start, limit) over rows 0..total-1 that records each call."""
+
+    def __init__(self, total=1000):
+        self.total = total
+        self.calls = []
+
+    def __call__(self, start, limit):
+        self.calls.append((start, limit))
+        return list(range(start, min(start + limit, self.total)))
+
+
+def test_window_bounds_align_to_prefetched_pages():
+    cache = PageWindowCache(pages=5)
+    assert cache.window_bounds(0, 10) == (0, 50)
+    assert cache.window_bounds(40, 10) == (0, 50)
+    assert cache.window_bounds(50, 10) == (50, 50)
+    assert cache.window_bounds(75, 25) == (0, 125)
+
+
+def test_window_bounds_stop_at_the_top_k_limit():
+    cache = PageWindowCache(pages=5)
+    # The last window before the limit is trimmed to end exactly at it.
+    assert cache.window_bounds(960, 30, row_limit=1000) == (900, 100)
+    assert cache.window_bounds(900, 100, row_limit=1000) == (500, 500)
+    assert cache.window_bounds(0, 10, row_limit=1000) == (0, 50)
+
+
+def test_pages_in_a_window_are_hits():
+    cache = PageWindowCache(pages=5)
+    fetch = Rows()
+    assert cache.get_page("sig", 0, 10, fetch) == (list(range(0, 10)), False)
+    assert cache.get_page("sig", 10, 10, fetch) == (list(range(10, 20)), True)
+    assert cache.get_page("sig", 40, 10, fetch) == (list(range(40, 50)), True)
+    assert cache.get_page("sig", 50, 10, fetch) == (list(range(50, 60)), False)
+    assert cache.get_page("other", 10, 10, fetch) == (list(range(10, 20)), False)
+    assert fetch.calls == [(0, 50), (50, 50), (0, 50)]
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 3
+
+
+def test_expired_and_evicted_windows_are_refetched():
+    fetch = Rows()
+    expired = PageWindowCache(pages=5, ttl=0)
+    expired.get_page("sig", 0, 10, fetch)
+    assert expired.get_page("sig", 10, 10, fetch)[1] is False
+
+    small = PageWindowCache(pages=5, max_windows=1)
+    small.get_page("a", 0, 10, fetch)
+    small.get_page("b", 0, 10, fetch)
+    assert small.get_page("a", 0, 10, fetch)[1] is False
+    assert small.stats()["windows"] == 1
+
+
+def test_top_k_window_never_reads_past_the_limit():
+    cache = PageWindowCache(pages=5)
+    fetch = Rows(total=5000)
+    rows, cached = cache.get_page("sig", 960, 30, fetch, row_limit=1000)
+    assert rows == list(range(960, 990)) and not cached
+    assert cache.get_page("sig", 930, 30, fetch, row_limit=1000) == (list(range(930, 960)), True)
+    assert fetch.calls == [(900, 100)]
+
+
+def _client(jira_db, executed):
+    class RecordingCursor(OracleSyntaxCursor):
+        def execute(self, sql, params=None):
+            executed.append(sql)
+            return super().execute(sql, params)
+
+    class RecordingConnection(OracleSyntaxConnection):
+        def cursor(self):
+            return RecordingCursor(self._conn.cursor())
+
+    def read_connection():
+        conn = connect(jira_db)
+        try:
+            yield RecordingConnection(conn)
+        finally:
+            conn.close()
+
+    app = FastAPI()
+    app.include_router(Filter.router)
+    app.dependency_overrides[get_read_connection] = read_connection
+    return TestClient(app)
+
+
+def test_search_pages_come_from_the_cached_window(jira_db, monkeypatch):
+    monkeypatch.setattr(Filter, "page_cache", PageWindowCache(pages=5))
+    executed = []
+    client = _client(jira_db, executed)
+
+    first = client.post("/search-issues", json={}, params={"page": 1, "page_size": 10, "order_by": "updated"})
+    second = client.post("/search-issues", json={}, params={"page": 2, "page_size": 10, "order_by": "updated"})
+    assert (first.headers["X-Page-Cache"], second.headers["X-Page-Cache"]) == ("miss", "hit")
+    assert len(executed) == 1 and "FETCH NEXT 50 ROWS ONLY" in executed[0]
+    keys = [issue["issue_key"] for issue in first.json()["results"] + second.json()["results"]]
+    # updated grows with the issue id, so the newest issues come first.
+    assert keys == [f"P{i % 5 + 1}-{i}" for i in range(200, 180, -1)]
+
+
+def test_unindexed_sort_windows_respect_the_top_k_limit(jira_db, monkeypatch):
+    monkeypatch.setattr(Filter, "page_cache", PageWindowCache(pages=5))
+    monkeypatch.setattr(Filter, "TOP_K_LIMIT", 50)
+    executed = []
+    client = _client(jira_db, executed)
+
+    response = client.post("/search-issues", json={}, params={"page": 3, "page_size": 20, "order_by": "priority"})
+    assert response.status_code == 400
+    assert "limited to the first 50 results" in response.json()["error"]
+    assert executed == []
+
+    response = client.post("/search-issues", json={}, params={"page": 2, "page_size": 20, "order_by": "priority"})
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == 20
+    assert "OFFSET 0 ROWS FETCH NEXT 50 ROWS ONLY" in " ".join(executed[0].split())
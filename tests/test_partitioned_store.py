@@ -0,0 +1,70 @@
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+import partitioned_store
+import snapshot_responses
+from conftest import REGIONS, TEMPLATES, snapshot_datasets
+from partitioned_store import load_manifest, sync_partitions
+from snapshot_store import publish_update
+
+
+def _unpartitioned(reader, dataset, region=None, template=None):
+    table = snapshot_responses.slice_table(reader.table(dataset), dataset, region, template)
+    return table.to_pandas().to_json(orient="records", date_format="iso").encode("utf-8")
+
+
+def test_publish_syncs_partitions(store):
+    _, partition_dir, reader = store
+    for dataset in partitioned_store.SLICE_COLUMNS:
+        assert load_manifest(dataset, partition_dir)["version"] == reader.dataset_version(dataset)
+
+
+@pytest.mark.parametrize("dataset", sorted(partitioned_store.SLICE_COLUMNS))
+def test_scoped_slices_match_unpartitioned_order(store, dataset):
+    _, _, reader = store
+    for region in REGIONS:
+        _, encoded = snapshot_responses.get_slice(dataset, region)
+        assert encoded.bodies["identity"] == _unpartitioned(reader, dataset, region)
+        if partitioned_store.SLICE_COLUMNS[dataset][1]:
+            _, encoded = snapshot_responses.get_slice(dataset, None, TEMPLATES[0])
+            assert encoded.bodies["identity"] == _unpartitioned(reader, dataset, None, TEMPLATES[0])
+
+
+def test_update_of_one_dataset_keeps_other_partitions_current(store):
+    snapshot_dir, partition_dir, reader = store
+    users_version = reader.dataset_version("single_users")
+    users_manifest = load_manifest("single_users", partition_dir)
+
+    projects = snapshot_datasets()["projects"]
+    projects.loc[0, "Last Issue Updated"] = pd.Timestamp("2027-01-01")
+    publish_update({"projects": projects}, snapshot_dir, partition_dir=partition_dir)
+
+    assert reader.dataset_version("single_users") == users_version
+    assert load_manifest("single_users", partition_dir) == users_manifest
+    assert load_manifest("projects", partition_dir)["version"] == reader.dataset_version("projects")
+    assert reader.dataset_version("projects") == reader.current_version() != users_version
+
+
+def test_insert_and_delete_rewrite_only_their_partition(tmp_path):
+    projects = snapshot_datasets()["projects"]
+    assert sync_partitions("projects", pa.Table.from_pandas(projects), "v1", tmp_path) == (6, 0)
+    before = load_manifest("projects", tmp_path)["partitions"]
+
+    # Project keys sort ahead of every other row, as projects_builder would
+    # place them; only the NAM/SCRUM partition holds either row.
+    added = pd.DataFrame({
+        "Project Key": ["A0"],
+        "Active Project Key": ["A0"],
+        "Region": pd.Categorical(["NAM"]),
+        "Template Key": pd.Categorical(["SCRUM"]),
+        "Last Issue Updated": [pd.Timestamp("2026-06-01")],
+    })
+    changed = pd.concat([added, projects.iloc[1:]], ignore_index=True)
+    for column in ("Region", "Template Key"):
+        changed[column] = changed[column].astype("category")
+    assert sync_partitions("projects", pa.Table.from_pandas(changed), "v2", tmp_path) == (1, 0)
+
+    after = load_manifest("projects", tmp_path)["partitions"]
+    rewritten = {path for path in after if after[path]["hash"] != before[path]["hash"]}
+    assert rewritten == {"Region=NAM/Template Key=SCRUM/part.parquet"}
@@ -0,0 +1,53 @@
+import json
+import sqlite3
+
+import pytest
+
+import plan_audit
+
+
+@pytest.fixture
+def audited(jira_db):
+    conn = sqlite3.connect(jira_db)
+    yield conn, plan_audit.run_audit(conn, "sqlite", order_bys=(None, "updated"))
+    conn.close()
+
+
+def test_every_variant_explains(audited):
+    _, audit = audited
+    # Filter.py: 5 text filters + 2 date ranges; ModifiedFilter: 6 + 2.
+    assert len(audit["variants"]) == (2 ** 7 + 2 ** 8) * 2
+    assert not [variant for variant, record in audit["variants"].items() if record["error"]]
+    assert not [f for f in plan_audit.compare(None, audit) if f[0] in plan_audit.REGRESSIONS]
+
+
+def test_unchanged_plans_are_not_regressions(audited):
+    conn, audit = audited
+    rerun = plan_audit.run_audit(conn, "sqlite", order_bys=(None, "updated"))
+    assert {kind for kind, _, _ in plan_audit.compare(audit, rerun)} <= {"full_scan"}
+
+
+def test_dropped_index_is_a_regression(audited):
+    conn, audit = audited
+    conn.execute("DROP INDEX issue_updated_id")
+    findings = plan_audit.compare(audit, plan_audit.run_audit(conn, "sqlite", order_bys=(None, "updated")))
+
+    variant = "modified:updated:default"
+    kinds = {kind for kind, variant_id, _ in findings if variant_id == variant}
+    assert kinds == {"new_full_scan", "plan_changed"}
+    assert ("new_full_scan", variant, "SCAN ji") in findings
+
+
+def test_main_fails_on_regression(jira_db, tmp_path):
+    output = str(tmp_path / "plan_audit.json")
+    args = ["--sqlite", jira_db, "--router", "filter", "--output", output]
+    assert plan_audit.main(args) == 0
+    assert plan_audit.main(args) == 0
+
+    conn = sqlite3.connect(jira_db)
+    conn.execute("DROP INDEX issue_updated_id")
+    conn.commit()
+    conn.close()
+    assert plan_audit.main(args) == 1
+    with open(output, encoding="utf-8") as f:
+        assert "SCAN ji" in json.load(f)["variants"]["filter:updated:default"]["full_scans"]
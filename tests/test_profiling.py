@@ -0,0 +1,104 @@
+import threading
+import time
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+import ModifiedFilter
+import profiling
+from replicas import get_read_connection
+from conftest import connect
+
+TOKEN = "test-token"
+
+
+class SlowCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, sql, params=None):
+        time.sleep(0.3)
+        return self._cursor.execute(sql, params or {})
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class SlowConnection:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self):
+        return SlowCursor(self._conn.cursor())
+
+
+def test_async_route_samples_threadpool_worker(monkeypatch, jira_db):
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", TOKEN)
+
+    def read_connection():
+        conn = connect(jira_db)
+        try:
+            yield SlowConnection(conn)
+        finally:
+            conn.close()
+
+    app = FastAPI()
+    app.include_router(ModifiedFilter.router)
+    app.include_router(profiling.router)
+    app.dependency_overrides[get_read_connection] = read_connection
+    client = TestClient(app)
+
+    response = client.post("/search-issues", json={"project_key": "P1"}, headers={"X-Profile": TOKEN})
+    assert response.status_code == 200
+    assert len(response.json()) == 40
+
+    profile = client.get(f"/admin/profile/requests/{response.headers['X-Profile-Id']}",
+                         params={"format": "collapsed"}, headers={"X-Profile": TOKEN})
+    stacks = [line for line in profile.text.splitlines() if "ModifiedFilter.py:fetch_issues" in line]
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in stacks) >= 10
+
+
+def _spin(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def profiled_work():
+    _spin(0.4)
+
+
+def other_work():
+    _spin(0.6)
+
+
+def test_sync_route_ignores_concurrent_unprofiled_requests(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", TOKEN)
+
+    router = APIRouter(route_class=profiling.ProfiledRoute)
+
+    @router.get("/work")
+    def work(profiled: bool = False):
+        (profiled_work if profiled else other_work)()
+        return {"ok": True}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.include_router(profiling.router)
+    client = TestClient(app)
+
+    # The same endpoint runs unprofiled on another threadpool thread for the
+    # whole of the profiled request.
+    other = threading.Thread(target=client.get, args=("/work",))
+    other.start()
+    time.sleep(0.05)
+    response = client.get("/work", params={"profiled": True}, headers={"X-Profile": TOKEN})
+    other.join()
+    assert response.status_code == 200
+
+    profile = client.get(f"/admin/profile/requests/{response.headers['X-Profile-Id']}",
+                         params={"format": "collapsed"}, headers={"X-Profile": TOKEN})
+    assert "test_profiling.py:profiled_work" in profile.text
+    assert "test_profiling.py:other_work" not in profile.text
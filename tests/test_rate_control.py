@@ -0,0 +1,101 @@
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+
+import rate_control
+from rate_control import AimdLimiter, EndpointController, RateControlledSession, parse_retry_after
+
+
+def _response(status=200, **headers):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update({name.replace("_", "-"): value for name, value in headers.items()})
+    return response
+
+
+def test_parse_retry_after_seconds_and_http_dates():
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after("-3") == 0.0
+    assert parse_retry_after(formatdate(time.time() + 30, usegmt=True)) == pytest.approx(30, abs=2)
+    assert parse_retry_after(formatdate(time.time() - 30, usegmt=True)) == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def _settle(limiter, throttled):
+    limiter.acquire()
+    limiter.release(throttled)
+
+
+def test_aimd_cuts_multiplicatively_and_stops_at_the_minimum():
+    limiter = AimdLimiter(initial=8)
+    _settle(limiter, throttled=True)
+    assert limiter.limit == 8 * rate_control.DECREASE_FACTOR
+    for _ in range(10):
+        _settle(limiter, throttled=True)
+    assert limiter.limit == rate_control.MIN_CONCURRENCY
+
+
+def test_aimd_grows_by_about_one_per_window_of_successes():
+    limiter = AimdLimiter(initial=4)
+    for _ in range(4):
+        _settle(limiter, throttled=False)
+    assert 4.8 < limiter.limit < 5.0
+    for _ in range(10_000):
+        _settle(limiter, throttled=False)
+    assert limiter.limit == rate_control.MAX_CONCURRENCY
+    assert limiter.in_flight == 0
+
+
+def test_rate_limit_headers_set_the_token_bucket():
+    controller = EndpointController()
+    controller.on_response(_response(X_RateLimit_FillRate="50", X_RateLimit_Interval_Seconds="10",
+                                     X_RateLimit_Limit="20"))
+    assert controller.bucket.rate == 5.0
+    assert controller.bucket.burst == 20
+
+    # Malformed values leave the current rate alone.
+    controller.on_response(_response(X_RateLimit_FillRate="fast", X_RateLimit_Interval_Seconds="10"))
+    assert controller.bucket.rate == 5.0
+
+
+def test_empty_bucket_waits_one_token_before_the_next_call():
+    controller = EndpointController()
+    controller.on_response(_response(X_RateLimit_FillRate="2", X_RateLimit_Interval_Seconds="1",
+                                     X_RateLimit_Remaining="0"))
+    assert controller.cooldown_until - time.monotonic() == pytest.approx(0.5, abs=0.1)
+
+
+def test_throttling_honours_retry_after_else_backs_off_exponentially():
+    controller = EndpointController()
+    assert controller.on_response(_response(429, Retry_After="7"))
+    assert controller.cooldown_until - time.monotonic() == pytest.approx(7, abs=0.5)
+
+    controller = EndpointController()
+    assert controller.on_response(_response(503))
+    assert controller.backoff == 2 * rate_control.DEFAULT_BACKOFF_SECONDS
+    controller.on_response(_response(503))
+    assert controller.backoff == 4 * rate_control.DEFAULT_BACKOFF_SECONDS
+    assert not controller.on_response(_response(200))
+    assert controller.backoff == rate_control.DEFAULT_BACKOFF_SECONDS
+
+
+def test_session_retries_throttled_calls(monkeypatch):
+    client = RateControlledSession(pool_size=2)
+    responses = [_response(429, Retry_After="0"), _response(503, Retry_After="0"), _response(200)]
+    calls = []
+
+    def get(url, **kwargs):
+        calls.append(url)
+        return responses.pop(0)
+
+    monkeypatch.setattr(client.session, "get", get)
+    assert client.get("https://jira/rest/api/2/search?jql=project=P1").status_code == 200
+    assert len(calls) == 3
+
+    report = client.report()
+    assert (report["requests_sent"], report["succeeded"], report["throttled"]) == (3, 1, 2)
+    # Cut 4 -> 2 -> 1, then one success at a limit of 1 adds a whole slot.
+    assert report["endpoints"]["/rest/api/2/search"]["concurrency"] == 2
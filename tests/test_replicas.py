@@ -0,0 +1,96 @@
+import time
+from contextlib import contextmanager
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import ModifiedFilter
+import replicas
+from conftest import connect
+
+
+class DatabaseError(Exception):
+    pass
+
+
+class ProgrammingError(Exception):
+    pass
+
+
+class FailingCursor:
+    def __init__(self, error):
+        self.error = error
+        self.arraysize = 100
+
+    def execute(self, sql, params=None):
+        raise self.error
+
+    def close(self):
+        pass
+
+
+class FailingConnection:
+    def __init__(self, error):
+        self.error = error
+
+    def cursor(self):
+        return FailingCursor(self.error)
+
+
+class FakePool:
+    def __init__(self, error):
+        self.error = error
+        self.released = 0
+
+    def acquire(self):
+        return FailingConnection(self.error)
+
+    def release(self, conn):
+        self.released += 1
+
+
+@pytest.fixture
+def client(monkeypatch, jira_db):
+    @contextmanager
+    def primary():
+        conn = connect(jira_db)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    monkeypatch.setattr(replicas, "acquire_connection", primary)
+    app = FastAPI()
+    app.include_router(ModifiedFilter.router)
+    return TestClient(app)
+
+
+def _use_replica(monkeypatch, error):
+    replica = replicas.Replica("replica-0", pool=FakePool(error))
+    monkeypatch.setattr(replicas, "replica_router", replicas.ReplicaRouter([replica]))
+    return replica
+
+
+def test_replica_failing_queries_is_evicted(client, monkeypatch):
+    replica = _use_replica(monkeypatch, DatabaseError("ORA-01219: database not open"))
+
+    for _ in range(replicas.FAILURES_BEFORE_EVICTION):
+        response = client.post("/search-issues", json={"project_key": "P1"})
+        assert response.status_code == 500
+    assert replica.pool.released == replicas.FAILURES_BEFORE_EVICTION
+    assert not replica.eligible(time.monotonic())
+
+    # Reads fail over to the primary while the replica is evicted.
+    response = client.post("/search-issues", json={"project_key": "P1"})
+    assert response.status_code == 200
+    assert len(response.json()) == 40
+
+
+def test_caller_errors_do_not_count_against_replica(client, monkeypatch):
+    replica = _use_replica(monkeypatch, ProgrammingError("ORA-00904: invalid identifier"))
+
+    for _ in range(replicas.FAILURES_BEFORE_EVICTION):
+        assert client.post("/search-issues", json={"project_key": "P1"}).status_code == 500
+    assert replica.consecutive_failures == 0
+    assert replica.eligible(time.monotonic())
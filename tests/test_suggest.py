@@ -0,0 +1,51 @@
+import sqlite3
+
+import pytest
+
+import suggest
+from suggest import PrefixIndex
+
+
+def test_prefix_index_matches_later_words_and_ranks_by_count():
+    index = PrefixIndex({"John Smith": 3, "Mary Jones": 5, "Bob Brown": 9})
+    assert [s["value"] for s in index.suggest("jo")] == ["Mary Jones", "John Smith"]
+    assert index.suggest("", 1) == [{"value": "Bob Brown", "count": 9}]
+
+
+@pytest.fixture
+def db_fields(monkeypatch, read_connection):
+    monkeypatch.setattr(suggest, "acquire_read_connection", read_connection)
+    return {name: suggest.FIELDS[name] for name in ("status", "assignee")}
+
+
+def _counting(field, monkeypatch):
+    calls = []
+    load = field.load
+
+    def counted():
+        calls.append(1)
+        return load()
+
+    monkeypatch.setattr(field, "load", counted)
+    monkeypatch.setattr(field, "index", None)
+    monkeypatch.setattr(field, "fingerprint", None)
+    return calls
+
+
+@pytest.mark.parametrize("name", ["status", "assignee"])
+def test_db_fields_rescan_only_when_marker_moves(db_fields, monkeypatch, jira_db, name):
+    field = db_fields[name]
+    calls = _counting(field, monkeypatch)
+
+    assert field.refresh() is True
+    assert field.refresh() is False
+    assert len(calls) == 1
+
+    conn = sqlite3.connect(jira_db)
+    conn.execute("UPDATE jiraissue SET issuestatus = 3, assignee = 'user1', "
+                 "updated = '2030-01-01 00:00:00' WHERE id = 1")
+    conn.commit()
+    conn.close()
+
+    assert field.refresh() is True
+    assert len(calls) == 2
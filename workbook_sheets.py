@@ -0,0 +1,118 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+
+from ingest import DATA_DIR, EXCEL_ENGINE, WORKBOOKS
+
+# === CONFIGURATION START ===
+MAX_CACHED_SHEETS = 16
+# === CONFIGURATION END ===
+
+
+class WorkbookIndex:
+    """Knows a workbook's sheet names and content hash without parsing any
+    sheet; each sheet is parsed the first time it is asked for."""
+
+    def __init__(self, path):
+        self.path = path
+        self._stat = None
+        self.file_hash = None
+        self.sheet_names = []
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        stat = os.stat(self.path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if key != self._stat:
+                digest = hashlib.sha256()
+                with open(self.path, "rb") as f:
+                    for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                        digest.update(chunk)
+                with pd.ExcelFile(self.path, engine=EXCEL_ENGINE) as workbook:
+                    self.sheet_names = list(workbook.sheet_names)
+                self.file_hash = digest.hexdigest()
+                self._stat = key
+        return self
+
+
+_indexes = {}
+_sheet_cache = OrderedDict()
+_sheet_cache_lock = threading.Lock()
+
+
+def get_index(workbook):
+    if workbook not in WORKBOOKS:
+        raise HTTPException(status_code=404, detail=f"Unknown workbook {workbook}")
+    if workbook not in _indexes:
+        _indexes[workbook] = WorkbookIndex(os.path.join(DATA_DIR, WORKBOOKS[workbook]))
+    return _indexes[workbook].refresh()
+
+
+def load_sheet(index, sheet_name):
+    # Cached by file hash, so a replaced workbook never serves stale rows and
+    # an unchanged one is never parsed twice.
+    key = (index.file_hash, sheet_name)
+    with _sheet_cache_lock:
+        if key in _sheet_cache:
+            _sheet_cache.move_to_end(key)
+            return _sheet_cache[key]
+
+    frame = pd.read_excel(index.path, sheet_name=sheet_name, engine=EXCEL_ENGINE)
+    # Same shape as XLSX.utils.sheet_to_json: one object per row, blanks omitted.
+    rows = [
+        {
+            column: value.isoformat() if hasattr(value, "isoformat") else value
+            for column, value in record.items() if not pd.isna(value)
+        }
+        for record in frame.to_dict("records")
+    ]
+    with _sheet_cache_lock:
+        _sheet_cache[key] = rows
+        while len(_sheet_cache) > MAX_CACHED_SHEETS:
+            _sheet_cache.popitem(last=False)
+    return rows
+
+
+def resolve_sheet(index, sheet):
+    if sheet in index.sheet_names:
+        return sheet
+    if sheet.isdigit() and int(sheet) < len(index.sheet_names):
+        return index.sheet_names[int(sheet)]
+    raise HTTPException(status_code=404, detail=f"Unknown sheet {sheet}")
+
+
+router = APIRouter(prefix="/workbooks")
+
+@router.get("/{workbook}/sheets")
+def list_sheets(workbook: str):
+    try:
+        index = get_index(workbook)
+        return JSONResponse(content={
+            "workbook": workbook,
+            "hash": index.file_hash,
+            "sheets": [{"index": i, "name": name} for i, name in enumerate(index.sheet_names)],
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+@router.get("/{workbook}/sheets/{sheet}")
+def get_sheet(workbook: str, sheet: str):
+    try:
+        index = get_index(workbook)
+        sheet_name = resolve_sheet(index, sheet)
+        rows = load_sheet(index, sheet_name)
+        return JSONResponse(
+            content={"workbook": workbook, "sheet": sheet_name, "hash": index.file_hash, "rows": rows}
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)